@@ -1,29 +1,107 @@
+import sys
+from datetime import date
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import numpy as np
 import io
 import altair as alt
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.group_store import (LOCAL_TZ, SERVING_PATH, load_group_filtered, open_serving, read_group_summary,
+                             serving_filtered, group_head)
+from src.contribution import contribution_with_apm
+from src.bootstrap import contribution_ci, lift_ci
+from src.synergy import pair_table
+from src.pick_scoring import PickScorer
+from src import cube
+from src.prefix_index import load_prefix_index
+from src.timeline_store import FIELD_NAMES, TIMELINE_INDEX, TimelineStore
+
 st.set_page_config(page_title="LoL Group Dashboard", layout="wide")
 
 # ---------- Data loaders ----------
 @st.cache_data
-def load_group():
-    df = pd.read_parquet("data/participants_group_latest.parquet")
-    # types & time
-    df["game_creation"] = pd.to_datetime(df["game_creation"], errors="coerce", utc=True)
+def load_summary():
     try:
-        df["game_creation"] = df["game_creation"].dt.tz_convert("America/New_York")
-    except Exception:
-        pass
-    if df["win"].dtype not in ("int64", "Int64"):
-        df["win"] = df["win"].astype(bool).astype(int)
+        return read_group_summary()
+    except (FileNotFoundError, OSError):
+        return {"rows": 0}
+
+@st.cache_resource
+def load_serving(mtime_ns):
+    # memory-mapped Arrow IPC: opening is near-instant and every app process shares the pages
+    return open_serving()
+
+def serving_mtime():
+    # a rebuild replaces the file, so its mtime keys both caches
+    return SERVING_PATH.stat().st_mtime_ns if SERVING_PATH.exists() else None
+
+@st.cache_data
+def load_group(queues, start_d, end_d, group_only, mtime_ns=None):
+    if mtime_ns is not None:
+        # already typed, local-time and with hour/date derived at build time
+        return serving_filtered(load_serving(mtime_ns), queues, start_d, end_d, in_group_only=group_only)
+    # no serving file (older build): queue/month partitions and in_group/date row groups are pruned inside the scan
+    df = load_group_filtered(list(queues), start_d, end_d, in_group_only=group_only)
+    # GROUP_SCHEMA already stores local-time timestamps and int8 wins; only older builds need fixing up
+    gc = df["game_creation"]
+    if not isinstance(gc.dtype, pd.DatetimeTZDtype) or str(gc.dt.tz) != LOCAL_TZ:
+        df["game_creation"] = pd.to_datetime(gc, errors="coerce", utc=True).dt.tz_convert(LOCAL_TZ)
+    if df["win"].dtype == bool:
+        df["win"] = df["win"].astype("int8")
     df["hour"] = df["game_creation"].dt.hour
     df["date"] = df["game_creation"].dt.date
     return df
 
-df = load_group()
-if df.empty:
+@st.cache_data
+def load_synergy(queues, start_d, end_d, group_only, kind):
+    # all pairs at once from sparse team × item products; thresholds are applied on the cached table
+    return pair_table(load_group(queues, start_d, end_d, group_only, serving_mtime()), kind)
+
+@st.cache_data
+def load_lift_ci(queues, start_d, end_d, group_only, player, min_games):
+    # bootstrap intervals for one player's Pick Advisor rows; the baseline only needs that player's cells
+    cube_all, _ = load_rollups()
+    cells = cube.slice_cells(cube_all, list(queues), start_d, end_d, group_only)
+    return lift_ci(cells[cells["player_label"] == player], min_games)
+
+@st.cache_data
+def load_contribution_ci(queues, start_d, end_d, group_only, mtime_ns, players):
+    # resampled over matches for the players shown; cached per filter state
+    sub = load_group(queues, start_d, end_d, group_only, mtime_ns)
+    ci = contribution_ci(sub, players=players)
+    return ci[ci["player"].isin(players)][["player", "contribution_lo", "contribution_hi"]]
+
+@st.cache_data
+def load_rollups():
+    return cube.load_cube()
+
+@st.cache_resource
+def load_player_index():
+    # per-player prefix sums; date ranges and rolling windows are lookups into it
+    return load_prefix_index()
+
+@st.cache_resource
+def load_pick_scorer():
+    # one model load per process; the scorer rescoring itself when the artifact changes is a stat() per call
+    return PickScorer()
+
+@st.cache_resource
+def load_timelines(version):
+    # memory-mapped; curves are gathered per selection, never loaded whole
+    store = TimelineStore()
+    return store if len(store) else None
+
+def timelines_version():
+    # the index is rewritten after the frames it points at, so its mtime/size keys the cache
+    if not TIMELINE_INDEX.exists():
+        return None
+    stat = TIMELINE_INDEX.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+summary = load_summary()
+if not summary.get("rows"):
     st.error("No data found. Make sure you ran the ETL and build_group_view.py.")
     st.stop()
 
@@ -31,11 +109,11 @@ if df.empty:
 with st.sidebar:
     st.markdown("### Filters")
     scope = st.radio("Scope", ["My group only", "All players"], index=0)
-    queues_all = sorted(df["queue"].dropna().unique().tolist())
+    queues_all = summary["queues"]
     sel_queues = st.multiselect("Queues (400=Normal Draft, 420=Ranked Solo)", queues_all, default=queues_all)
 
     # Date range
-    min_d, max_d = df["date"].min(), df["date"].max()
+    min_d, max_d = date.fromisoformat(summary["min_date"]), date.fromisoformat(summary["max_date"])
     start_d, end_d = st.date_input("Date range", value=(min_d, max_d))
     if isinstance(start_d, tuple):  # rare first-render quirk
         start_d, end_d = start_d
@@ -47,23 +125,24 @@ with st.sidebar:
     min_games = st.number_input("Min games per champ", 1, 100, 5)
 
 # ---------- Apply global filters ----------
-sub = df.copy()
-if scope == "My group only":
-    sub = sub[sub["in_group"] == True]
-if sel_queues:
-    sub = sub[sub["queue"].isin(sel_queues)]
-sub = sub[(sub["date"] >= start_d) & (sub["date"] <= end_d)]
+sub = load_group(tuple(sel_queues), start_d, end_d, scope == "My group only", serving_mtime())
 
 if sub.empty:
     st.warning("No rows after filters. Try broadening the date range, queues, or scope.")
-    st.dataframe(df[["player_label", "summoner_name", "queue", "win"]].head(20))
+    st.dataframe(group_head(20, columns=["player_label", "summoner_name", "queue", "win"]))
     st.stop()
 
+# Cube cells for the same filters (overview, Pick Advisor, Champions overview)
+cube_all, match_all = load_rollups()
+cells = cube.slice_cells(cube_all, sel_queues, start_d, end_d, scope == "My group only")
+match_cells = cube.slice_cells(match_all, sel_queues, start_d, end_d)
+
 # ---------- Overview ----------
+ov = cube.overview(cells, match_cells, group_only=(scope == "My group only"))
 oc1, oc2, oc3 = st.columns(3)
-oc1.metric("Matches", f"{sub['match_id'].nunique():,}")
-oc2.metric("Player-games", f"{len(sub):,}")
-oc3.metric("Win rate", f"{100*sub['win'].mean():.1f}%")
+oc1.metric("Matches", f"{ov['matches']:,}")
+oc2.metric("Player-games", f"{ov['player_games']:,}")
+oc3.metric("Win rate", f"{100*ov['winrate']:.1f}%")
 
 # Download filtered rows
 csv_buf = io.StringIO()
@@ -73,46 +152,93 @@ st.download_button("Download filtered rows (CSV)", csv_buf.getvalue(), "filtered
 st.markdown("---")
 
 # ---------- Tabs ----------
-tab1, tab2, tab3, tab4 = st.tabs(["Player detail", "Pick Advisor", "Champions overview", "Contribution"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Player detail", "Pick Advisor", "Champions overview", "Synergy", "Contribution"])
 
 # ===== Player Detail =====
 with tab1:
     players = sorted(sub["player_label"].dropna().unique().tolist())
     p = st.selectbox("Player", players)
-    p_df = sub[sub["player_label"] == p].sort_values("game_creation")
+    series = load_player_index().player(p, sel_queues)
+    i, j = series.span(start_d, end_d) if series is not None else (0, 0)
+    tot = series.totals(i, j) if j > i else None
 
     c1, c2, c3 = st.columns(3)
-    c1.metric("Games", len(p_df))
-    c2.metric("Win rate", f"{100*p_df['win'].mean():.1f}%")
-    kda = (p_df["kills"] + p_df["assists"]) / p_df["deaths"].replace(0, 1)
-    c3.metric("Avg KDA", f"{kda.mean():.2f}")
+    c1.metric("Games", j - i)
+    c2.metric("Win rate", f"{100*tot['win']/tot['games']:.1f}%" if tot else "nan%")
+    c3.metric("Avg KDA", f"{tot['kda']/tot['games']:.2f}" if tot else "nan")
 
     # Rolling trend
-    if p_df["game_creation"].notna().sum() > 0:
-        roll = (
-            p_df.assign(win_int=p_df["win"].astype(int))
-                .set_index("game_creation")["win_int"]
-                .rolling(window, min_periods=1).mean()
-        )
-        st.line_chart(roll)
+    if tot:
+        st.line_chart(series.rolling(window, i, j))
     else:
         st.info("No timestamps available to draw a rolling chart.")
 
+    # Per-minute curves (only if the optional timeline stage has run)
+    tl = load_timelines(timelines_version())
+    if tl is not None:
+        metric = st.selectbox("Per-minute curve", FIELD_NAMES, index=0)
+        p_games = pd.DataFrame({"match_id": series.match_id[i:j], "puuid": series.puuid[i:j],
+                                "win": series.win[i:j]}) if tot else pd.DataFrame(columns=["match_id", "puuid", "win"])
+        keys, vals = tl.curves(metric, match_ids=p_games["match_id"].unique(), puuids=p_games["puuid"].unique())
+        if len(keys):
+            won = keys[["match_id", "puuid"]].merge(p_games, how="left")["win"].to_numpy()
+            with np.errstate(all="ignore"):
+                curves = pd.DataFrame({
+                    "Wins": np.nanmean(vals[won == 1], axis=0) if (won == 1).any() else np.nan,
+                    "Losses": np.nanmean(vals[won == 0], axis=0) if (won == 0).any() else np.nan,
+                })
+            curves.index.name = "minute"
+            st.caption(f"Average {metric} by minute over {len(keys)} games with timelines")
+            st.line_chart(curves)
+
 # ===== Pick Advisor (Champion Lift) =====
 with tab2:
-    base = sub.groupby("player_label")["win"].mean().rename("base")
-    champ_tbl = (
-        sub.groupby(["player_label", "champion"])
-           .agg(games=("win", "size"), winrate=("win", "mean"))
-           .reset_index()
-    ).merge(base, on="player_label")
-    champ_tbl["lift"] = champ_tbl["winrate"] - champ_tbl["base"]
-    champ_tbl = champ_tbl[champ_tbl["games"] >= int(min_games)]
-
-    pt = champ_tbl[champ_tbl["player_label"] == p].copy()
-    pt = pt.sort_values("lift", ascending=False)
+    rank_lift_ci = st.toggle("Rank by 95% CI lower bound", value=False, key="rank_lift_ci",
+                             help="Bootstrap interval of the lift; the lower bound favours champions with enough games to trust.")
+    pt = load_lift_ci(tuple(sel_queues), start_d, end_d, scope == "My group only", p, min_games).copy()
+    pt = pt.sort_values("lift_lo" if rank_lift_ci else "lift", ascending=False)
+
+    # win model: champion × role probabilities for the current patch and hour, precomputed in one batch
+    scorer = load_pick_scorer()
+    model_cols = []
+    if scorer.signature() is not None:
+        scorer.refresh()
+        mine = sub[sub["player_label"] == p]
+        played = mine["role"].astype(object).fillna(mine["lane"].astype(object)).fillna("UNKNOWN").mode()   # role_clean
+        roles = list(scorer.roles)
+        main_role = played.iloc[0] if not played.empty and played.iloc[0] in roles else roles[0]
+        role_m = st.selectbox("Role for model win probability", roles, index=roles.index(main_role), key="model_role")
+        probs = scorer.table()
+        probs = probs[probs["role"] == role_m][["champion", "win_prob"]].rename(columns={"win_prob": "model_win"})
+        pt = pt.merge(probs, on="champion", how="left")
+        model_cols = ["model_win"]
+        st.caption(f"model_win: artifacts/win_model.joblib for patch {scorer.patch}, this hour, as {role_m}.")
+        with st.expander(f"Model's top picks as {role_m}"):
+            st.dataframe(pd.DataFrame(scorer.suggest(role_m, top=10)))
+
     st.markdown("**Champion suggestions (relative to your baseline)**")
-    st.dataframe(pt[["champion", "games", "winrate", "base", "lift"]])
+    if not pt.empty:
+        order = list(pt["champion"])
+        lift_bars = alt.Chart(pt).mark_rule().encode(
+            y=alt.Y("champion:N", sort=order, title=None),
+            x=alt.X("lift_lo:Q", title="Lift (95% bootstrap CI)", axis=alt.Axis(format="%")),
+            x2="lift_hi:Q",
+        )
+        lift_points = alt.Chart(pt).mark_point(filled=True).encode(
+            y=alt.Y("champion:N", sort=order),
+            x="lift:Q",
+            color=alt.condition("datum.lift > 0", alt.value("#3b75af"), alt.value("#c0504d")),
+            tooltip=[
+                alt.Tooltip("champion:N"),
+                alt.Tooltip("games:Q"),
+                alt.Tooltip("lift:Q", format=".1%"),
+                alt.Tooltip("lift_lo:Q", format=".1%"),
+                alt.Tooltip("lift_hi:Q", format=".1%")
+            ]
+        )
+        st.altair_chart(alt.layer(lift_bars, lift_points).properties(height=max(200, 22 * len(pt)), width=900),
+                        use_container_width=True)
+    st.dataframe(pt[["champion", "games", "winrate", "base", "lift", "lift_lo", "lift_hi"] + model_cols])
 
     csv_buf2 = io.StringIO()
     pt.to_csv(csv_buf2, index=False)
@@ -120,63 +246,94 @@ with tab2:
 
 # ===== Champions overview (group-level) =====
 with tab3:
-    gtbl = (
-        sub.groupby("champion")
-           .agg(games=("win", "size"), winrate=("win", "mean"))
-           .sort_values(["games", "winrate"], ascending=[False, False])
-           .reset_index()
-    )
+    gtbl = cube.champion_overview(cells)
     st.dataframe(gtbl)
 
-# ===== Contribution (player impact on winrate) =====
+# ===== Synergy (duos / champion pairs) =====
 with tab4:
+    st.markdown("### Synergy")
+    st.caption(
+        "Pairs on the same team within current filters. Lift = win rate together − the mean of "
+        "each side's own win rate, so strong players have to beat their individual records."
+    )
+    scol1, scol2, scol3 = st.columns([2,1,1])
+    kind_label = scol1.radio("Pairs of", ["Players", "Player + champion", "Champions"], horizontal=True)
+    min_games_syn = scol2.number_input("Min games together", 1, 200, 5)
+    only_p = scol3.toggle(f"Only pairs with {p}", value=False)
+    kind = {"Players": "players", "Player + champion": "player_champions", "Champions": "champions"}[kind_label]
+
+    pairs = load_synergy(tuple(sel_queues), start_d, end_d, scope == "My group only", kind)
+    pairs = pairs[pairs["games"] >= int(min_games_syn)]
+    if only_p and kind != "champions":
+        mine = lambda col: pairs[col].astype(str).str.split(" · ").str[0] == p
+        pairs = pairs[mine("item_1") | mine("item_2")]
+
+    if pairs.empty:
+        st.info("No pairs pass the min-games threshold.")
+    else:
+        top = pd.concat([pairs.head(15), pairs.tail(15)]).drop_duplicates(["item_1", "item_2"])
+        top = top.assign(pair=top["item_1"].astype(str) + " + " + top["item_2"].astype(str))
+        syn_chart = (
+            alt.Chart(top)
+               .mark_bar()
+               .encode(
+                   x=alt.X("lift:Q", title="Lift over expected win rate", axis=alt.Axis(format="%")),
+                   y=alt.Y("pair:N", sort="-x", title=None, axis=alt.Axis(labelLimit=260)),
+                   color=alt.condition("datum.lift > 0", alt.value("#3b75af"), alt.value("#c0504d")),
+                   tooltip=[
+                       alt.Tooltip("pair:N"),
+                       alt.Tooltip("games:Q"),
+                       alt.Tooltip("winrate:Q", format=".1%"),
+                       alt.Tooltip("expected:Q", format=".1%"),
+                       alt.Tooltip("lift:Q", format=".1%")
+                   ]
+               )
+               .properties(height=max(280, 22 * len(top)), width=900)
+        )
+        st.altair_chart(syn_chart, use_container_width=True)
+        st.dataframe(pairs)
+
+        csv_buf4 = io.StringIO()
+        pairs.to_csv(csv_buf4, index=False)
+        st.download_button("Download synergy (CSV)", csv_buf4.getvalue(), f"synergy_{kind}.csv")
+
+# ===== Contribution (player impact on winrate) =====
+with tab5:
     st.markdown("### Contribution Scores")
     st.caption(
         "Winrate WITH player − winrate in games WITHOUT that player (within current filters). "
-        "Weighted score multiplies by √games to reduce small-sample noise."
+        "Weighted score multiplies by √games to reduce small-sample noise. "
+        "Error bars are 95% bootstrap intervals over resampled matches."
     )
 
     # Controls specific to this tab
-    ccol1, ccol2, ccol3 = st.columns([1,1,1])
+    ccol1, ccol2, ccol3, ccol4, ccol5 = st.columns([1,1,1,1,1])
     min_games_contrib = ccol1.number_input("Min games (contrib)", 1, 200, 5)
     use_weight = ccol2.toggle("Use weighted score (× √games)", value=True)
     show_table = ccol3.toggle("Show raw table", value=False)
+    show_apm = ccol4.toggle("Adjusted plus-minus", value=False)
+    rank_contrib_ci = ccol5.toggle("Rank by 95% CI lower bound", value=False, key="rank_contrib_ci")
 
-    # ---- Compute with/without table ----
-    scores = []
-    uniq_players = sorted(sub["player_label"].dropna().unique().tolist())
-    for pl in uniq_players:
-        with_pl = sub[sub["player_label"] == pl]
-        g = len(with_pl)
-        if g == 0:
-            continue
-
-        mids_with = set(with_pl["match_id"].unique())
-        wr_with = with_pl["win"].mean()
-
-        # Baseline: all games excluding matches containing this player
-        without_mask = ~sub["match_id"].isin(mids_with)
-        wr_without = sub.loc[without_mask, "win"].mean() if without_mask.any() else np.nan
-
-        contrib = (wr_with - wr_without) if pd.notna(wr_with) and pd.notna(wr_without) else np.nan
-        scores.append({
-            "player": pl,
-            "games": g,
-            "winrate_with": wr_with,
-            "winrate_without": wr_without,
-            "contribution": contrib,
-        })
-
-    contrib = pd.DataFrame(scores).dropna(subset=["contribution"])
+    # ---- Compute with/without table (sparse incidence, see src/contribution.py) ----
+    contrib = contribution_with_apm(sub).dropna(subset=["contribution"])
     contrib = contrib[contrib["games"] >= int(min_games_contrib)].copy()
 
     if contrib.empty:
         st.warning("No players pass the min-games threshold for contribution.")
         st.stop()
 
+    # Bootstrap intervals (resampled matches) for the players that pass the threshold
+    ci = load_contribution_ci(tuple(sel_queues), start_d, end_d, scope == "My group only", serving_mtime(),
+                              tuple(contrib["player"]))
+    contrib = contrib.merge(ci, on="player", how="left")
+
     # Weighted score + sorting
-    contrib["weighted_contribution"] = contrib["contribution"] * np.sqrt(contrib["games"])
+    w = np.sqrt(contrib["games"])
+    contrib["weighted_contribution"] = contrib["contribution"] * w
+    contrib["weighted_lo"], contrib["weighted_hi"] = contrib["contribution_lo"] * w, contrib["contribution_hi"] * w
     sort_key = "weighted_contribution" if use_weight else "contribution"
+    if rank_contrib_ci:
+        sort_key = "weighted_lo" if use_weight else "contribution_lo"
     contrib = contrib.sort_values(sort_key, ascending=False).reset_index(drop=True)
 
     # ---------- NEW: Winrate WITH vs WITHOUT (grouped bars + baseline) ----------
@@ -224,17 +381,20 @@ with tab4:
 
     # ---------- Impact chart (weighted or raw contribution) ----------
     st.markdown("#### Impact score (contribution vs baseline)")
-    chart_df = contrib[["player","games","contribution","weighted_contribution"]].copy()
+    chart_df = contrib[["player","games","contribution","weighted_contribution",
+                        "contribution_lo","contribution_hi","weighted_lo","weighted_hi"]].copy()
     chart_df["score"] = chart_df["weighted_contribution"] if use_weight else chart_df["contribution"]
+    chart_df["score_lo"] = chart_df["weighted_lo"] if use_weight else chart_df["contribution_lo"]
+    chart_df["score_hi"] = chart_df["weighted_hi"] if use_weight else chart_df["contribution_hi"]
     max_abs = float(np.nanmax(np.abs(chart_df["score"]))) or 0.0
     if max_abs == 0.0: max_abs = 1.0
 
-    impact_chart = (
+    impact_bars = (
         alt.Chart(chart_df)
            .mark_bar()
            .encode(
-               x=alt.X("score:Q", title="Impact score" + (" (weighted)" if use_weight else "")),
-               y=alt.Y("player:N", sort="-x", title=None),
+               x=alt.X("score:Q", title="Impact score" + (" (weighted)" if use_weight else "") + " with 95% CI"),
+               y=alt.Y("player:N", sort=list(contrib["player"]), title=None),
                color=alt.Color("score:Q",
                                scale=alt.Scale(domain=[-max_abs, 0, max_abs], scheme="redblue"),
                                legend=None),
@@ -242,13 +402,40 @@ with tab4:
                    alt.Tooltip("player:N"),
                    alt.Tooltip("games:Q"),
                    alt.Tooltip("contribution:Q", format=".2%"),
+                   alt.Tooltip("contribution_lo:Q", format=".2%"),
+                   alt.Tooltip("contribution_hi:Q", format=".2%"),
                    alt.Tooltip("weighted_contribution:Q", format=".3f")
                ]
            )
-           .properties(height=28 * len(chart_df), width=900)
     )
+    impact_err = (
+        alt.Chart(chart_df)
+           .mark_rule(color="black")
+           .encode(y=alt.Y("player:N", sort=list(contrib["player"])), x="score_lo:Q", x2="score_hi:Q")
+    )
+    impact_chart = alt.layer(impact_bars, impact_err).properties(height=28 * len(chart_df), width=900)
     st.altair_chart(impact_chart, use_container_width=True)
 
+    # ---------- Adjusted plus-minus (ridge over who played together/against) ----------
+    if show_apm:
+        st.markdown("#### Adjusted plus-minus")
+        st.caption(
+            "Ridge regression of match outcome on the players on each side, so a player "
+            "isn't credited for the teammates they usually queue with."
+        )
+        apm_chart = (
+            alt.Chart(contrib[["player","games","apm"]])
+               .mark_bar()
+               .encode(
+                   x=alt.X("apm:Q", title="Adjusted plus-minus"),
+                   y=alt.Y("player:N", sort="-x", title=None),
+                   color=alt.condition("datum.apm > 0", alt.value("#3b75af"), alt.value("#c0504d")),
+                   tooltip=[alt.Tooltip("player:N"), alt.Tooltip("games:Q"), alt.Tooltip("apm:Q", format=".3f")]
+               )
+               .properties(height=28 * len(contrib), width=900)
+        )
+        st.altair_chart(apm_chart, use_container_width=True)
+
     # Optional raw table + downloads
     if show_table:
         st.dataframe(contrib)
@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+benchmarks package: synthetic-data reports and timing scripts for the ETL,
+build steps and dashboard computations. Run modules with `python -m benchmarks.<name>`.
+"""
@@ -0,0 +1,119 @@
+# benchmarks/cold_start.py
+# Dashboard cold start: the partitioned-parquet loader vs the memory-mapped Arrow IPC serving file.
+#   python -m benchmarks.cold_start --rows 2000000 --repeat 3
+#
+# Every measurement is a fresh interpreter (what a new Streamlit process or a
+# cache miss pays). Times exclude imports; memory is read from
+# /proc/self/smaps_rollup, where file-backed mapped pages show up as shared
+# rather than private, i.e. they are not duplicated per process.
+
+import argparse, json, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+REPORT_PATH = Path("reports/cold_start.json")
+MODES = {
+    "parquet_dataset": "load_group_filtered + hour/date derivation (the app's loader before the serving file)",
+    "serving_open": "open_serving(): map the file, zero-copy Arrow table",
+    "serving_frame": "open_serving() + serving_filtered() to pandas (what load_group returns now)",
+}
+
+
+def _memory_mb() -> dict:
+    out = {}
+    try:
+        for line in Path("/proc/self/smaps_rollup").read_text().splitlines():
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Private_Clean", "Private_Dirty", "Shared_Clean", "Shared_Dirty"):
+                out[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {"rss_mb": round(out.get("Rss", 0), 1),
+            "private_mb": round(out.get("Private_Clean", 0) + out.get("Private_Dirty", 0), 1),
+            "shared_mb": round(out.get("Shared_Clean", 0) + out.get("Shared_Dirty", 0), 1)}
+
+
+def child(mode: str, root: Path):
+    # imports happen before the clock starts; only the load itself is timed
+    from datetime import date
+    from src.group_store import LOCAL_TZ, load_group_filtered, open_serving, read_group_summary, serving_filtered
+    summary = read_group_summary(root / "participants_group")
+    args = (summary["queues"], date.fromisoformat(summary["min_date"]), date.fromisoformat(summary["max_date"]))
+    t0 = time.perf_counter()
+    if mode == "parquet_dataset":
+        df = load_group_filtered(*args, root=root / "participants_group")
+        df["game_creation"] = df["game_creation"].dt.tz_convert(LOCAL_TZ)
+        df["hour"] = df["game_creation"].dt.hour
+        df["date"] = df["game_creation"].dt.date
+        rows = len(df)
+    elif mode == "serving_open":
+        table = open_serving(root / "participants_group.arrow")
+        rows = table.num_rows
+    else:
+        df = serving_filtered(open_serving(root / "participants_group.arrow"), *args)
+        rows = len(df)
+    print(json.dumps({"seconds": time.perf_counter() - t0, "rows": rows, **_memory_mb()}))
+
+
+def _run_child(mode: str, root: Path) -> dict:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child", mode, "--root", str(root)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(rows: int, players: int, repeat: int) -> dict:
+    from benchmarks.schema_report import legacy_frame
+    from src.group_store import write_group_dataset, write_serving_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        df = legacy_frame(rows, players)
+        t0 = time.perf_counter()
+        write_group_dataset(df, root / "participants_group")
+        t_dataset = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        write_serving_file(df, root / "participants_group.arrow")
+        t_serving = time.perf_counter() - t0
+        del df
+
+        report = {"rows": rows, "players": players, "repeat": repeat,
+                  "build_s": {"parquet_dataset": round(t_dataset, 3), "serving_file": round(t_serving, 3)},
+                  "file_mb": {"serving_file": round((root / "participants_group.arrow").stat().st_size / 2**20, 1)},
+                  "modes": {}}
+        for mode, desc in MODES.items():
+            runs = [_run_child(mode, root) for _ in range(repeat)]
+            last = runs[-1]
+            report["modes"][mode] = {
+                "what": desc,
+                "median_s": round(statistics.median(r["seconds"] for r in runs), 4),
+                "runs_s": [round(r["seconds"], 4) for r in runs],
+                **{k: last[k] for k in ("rss_mb", "private_mb", "shared_mb") if k in last},
+            }
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold-start time of the app's group loaders.")
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--players", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    ap.add_argument("--root", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child, args.root)
+        return
+
+    report = run(args.rows, args.players, args.repeat)
+    print(f"rows={report['rows']:,}  serving file {report['file_mb']['serving_file']} MB, "
+          f"built in {report['build_s']['serving_file']}s")
+    print(f"{'':18}{'median s':>10}{'RSS MB':>9}{'private MB':>12}{'shared MB':>11}")
+    for mode, r in report["modes"].items():
+        print(f"{mode:18}{r['median_s']:>10}{r.get('rss_mb', ''):>9}{r.get('private_mb', ''):>12}{r.get('shared_mb', ''):>11}")
+
+    REPORT_PATH.parent.mkdir(exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2))
+    print("Saved", REPORT_PATH)
+
+
+if __name__ == "__main__":
+    main()
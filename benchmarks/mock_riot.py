@@ -0,0 +1,275 @@
+# benchmarks/mock_riot.py
+# Local stand-in for the Riot endpoints the ETL uses (account-v1 by-riot-id, match-v5 ids/detail/timeline),
+# backed by benchmarks.synthetic, with Riot-style rate limiting and fault injection.
+#
+#   python -m benchmarks.mock_riot --port 8080 --matches 20000 --write-roster data/riot_ids.mock.yaml
+#   RIOT_API_KEY=dev RIOT_API_BASE=http://127.0.0.1:8080/{routing} \
+#       RIOT_IDS_PATH=data/riot_ids.mock.yaml python -m src.etl_http_riot
+#
+# Limits are enforced per routing region (the first path segment) with fixed
+# windows that start at the first request, like Riot's. Every response carries
+# X-App-Rate-Limit(-Count) / X-Method-Rate-Limit(-Count); over-limit requests
+# get 429 + Retry-After + X-Rate-Limit-Type.
+
+import argparse, json, math, random, re, threading, time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+import yaml
+from benchmarks.synthetic import SyntheticRiot
+
+ROUTES = [
+    ("account-by-riot-id", re.compile(r"^/riot/account/v1/accounts/by-riot-id/(?P<name>[^/]+)/(?P<tag>[^/]+)$")),
+    ("match-ids", re.compile(r"^/lol/match/v5/matches/by-puuid/(?P<puuid>[^/]+)/ids$")),
+    ("match-detail", re.compile(r"^/lol/match/v5/matches/(?P<match_id>[A-Z0-9]+_\d+)$")),
+    ("match-timeline", re.compile(r"^/lol/match/v5/matches/(?P<match_id>[A-Z0-9]+_\d+)/timeline$")),
+]
+# match IDs are minted with a platform of the cluster they were listed on, so a
+# mixed-region ETL run exercises its per-region lanes end to end
+REGION_PLATFORM = {"americas": "NA1", "europe": "EUW1", "asia": "KR", "sea": "OC1"}
+METHOD_LIMITS = {
+    "account-by-riot-id": "1000:60",
+    "match-ids": "2000:10",
+    "match-detail": "2000:10",
+    "match-timeline": "2000:10",
+}
+
+
+class FixedWindows:
+    """Riot-style counters: each window opens on its first request and resets after `seconds`."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.windows = []
+        for part in spec.split(","):
+            limit, seconds = part.split(":")
+            self.windows.append({"limit": int(limit), "seconds": float(seconds), "start": None, "count": 0})
+
+    def try_take(self, now: float) -> float:
+        """0 if the request fits (and is counted), else seconds until the blocking window resets."""
+        wait = 0.0
+        for w in self.windows:
+            if w["start"] is None or now >= w["start"] + w["seconds"]:
+                w["start"], w["count"] = now, 0
+            if w["count"] >= w["limit"]:
+                wait = max(wait, w["start"] + w["seconds"] - now)
+        if wait > 0:
+            return wait
+        for w in self.windows:
+            w["count"] += 1
+        return 0.0
+
+    def counts(self) -> str:
+        return ",".join(f"{w['count']}:{int(w['seconds'])}" for w in self.windows)
+
+
+class MockRiot:
+    def __init__(self, world: SyntheticRiot, n_matches: int, app_limits: str, method_limits: dict,
+                 error_rate: float = 0.0, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.world = world
+        self.n_matches = n_matches
+        self.app_limits = app_limits
+        self.method_limits = method_limits
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.buckets: dict[tuple[str, str], FixedWindows] = {}
+        self.stats = Counter()
+        self.started = time.monotonic()
+
+        # puuid -> newest-first match indices, built once from the cheap lineups
+        self.by_puuid: dict[str, list[int]] = {}
+        for i in range(n_matches):
+            for p in world.lineup(i):
+                self.by_puuid.setdefault(p.puuid, []).append(i)
+        for ids in self.by_puuid.values():
+            ids.reverse()
+        self.by_name = {(p.game_name.lower(), p.tag_line.lower()): p for p in world.roster + world.population}
+
+    # ---------- limits ----------
+    def _bucket(self, region: str, scope: str, spec: str) -> FixedWindows:
+        key = (region, scope)
+        if key not in self.buckets:
+            self.buckets[key] = FixedWindows(spec)
+        return self.buckets[key]
+
+    def admit(self, region: str, method: str) -> tuple[float, str, dict]:
+        """(retry_after, limit_type, headers) for one request."""
+        with self.lock:
+            now = time.monotonic()
+            app = self._bucket(region, "app", self.app_limits)
+            meth = self._bucket(region, method, self.method_limits[method])
+            wait_app = app.try_take(now)
+            wait_meth = meth.try_take(now) if wait_app == 0 else 0.0
+            if wait_app == 0 and wait_meth > 0:
+                # method rejected: give the app slot back
+                for w in app.windows:
+                    w["count"] -= 1
+            headers = {
+                "X-App-Rate-Limit": app.spec, "X-App-Rate-Limit-Count": app.counts(),
+                "X-Method-Rate-Limit": meth.spec, "X-Method-Rate-Limit-Count": meth.counts(),
+            }
+        if wait_app > 0:
+            return wait_app, "application", headers
+        if wait_meth > 0:
+            return wait_meth, "method", headers
+        return 0.0, "", headers
+
+    # ---------- endpoints ----------
+    def handle(self, method: str, params: dict, query: dict, region: str = "default"):
+        w = self.world
+        if method == "account-by-riot-id":
+            p = self.by_name.get((unquote(params["name"]).lower(), unquote(params["tag"]).lower()))
+            if p is None:
+                return 404, {"status": {"message": "Data not found", "status_code": 404}}
+            return 200, {"puuid": p.puuid, "gameName": p.game_name, "tagLine": p.tag_line}
+        if method == "match-ids":
+            ids = self.by_puuid.get(params["puuid"], [])
+            queue = query.get("queue", [None])[0]
+            if queue is not None:
+                ids = [i for i in ids if w.queue(i) == int(queue)]
+            start = int(query.get("start", ["0"])[0])
+            count = min(100, int(query.get("count", ["20"])[0]))
+            platform = REGION_PLATFORM.get(region, w.platform)
+            return 200, [f"{platform}_{w.match_id(i).split('_', 1)[1]}" for i in ids[start:start + count]]
+        if method in ("match-detail", "match-timeline"):
+            mid = params["match_id"]
+            i = w.match_index(mid)
+            platform = mid.split("_", 1)[0]
+            if not (0 <= i < self.n_matches) or REGION_PLATFORM.get(region, platform) != platform:
+                return 404, {"status": {"message": "Data not found", "status_code": 404}}
+            payload = w.match(i)
+            if method == "match-timeline":
+                payload = w.timeline(i, payload)
+            else:
+                payload["info"]["platformId"] = platform
+            payload["metadata"]["matchId"] = mid
+            return 200, payload
+        return 404, {}
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        with self.lock:
+            stats = dict(self.stats)
+        served = stats.get("200", 0)
+        return {"elapsed_s": round(elapsed, 1), "requests": stats.get("total", 0),
+                "ok_per_s": round(served / elapsed, 2) if elapsed else 0.0, "by_status": stats}
+
+
+def make_handler(mock: MockRiot):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body, headers: dict | None = None):
+            blob = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(blob)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(blob)
+            with mock.lock:
+                mock.stats["total"] += 1
+                mock.stats[str(status)] += 1
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_stats":
+                return self._send(200, mock.snapshot())
+            path, region = url.path, "default"
+            m = re.match(r"^/(americas|europe|asia|sea)(/.*)$", path)
+            if m:
+                region, path = m.group(1), m.group(2)
+            for method, pattern in ROUTES:
+                hit = pattern.match(path)
+                if hit:
+                    break
+            else:
+                return self._send(404, {"status": {"message": "Not found", "status_code": 404}})
+
+            if mock.latency_ms or mock.jitter_ms:
+                time.sleep(max(0.0, mock.latency_ms + mock.rng.uniform(-mock.jitter_ms, mock.jitter_ms)) / 1000)
+            retry_after, kind, headers = mock.admit(region, method)
+            if retry_after > 0:
+                headers.update({"Retry-After": str(math.ceil(retry_after)), "X-Rate-Limit-Type": kind})
+                return self._send(429, {"status": {"message": "Rate limit exceeded", "status_code": 429}}, headers)
+            if mock.error_rate and mock.rng.random() < mock.error_rate:
+                return self._send(503, {"status": {"message": "Service unavailable", "status_code": 503}}, headers)
+            status, body = mock.handle(method, hit.groupdict(), parse_qs(url.query), region)
+            self._send(status, body, headers)
+
+    return Handler
+
+
+def serve(mock: MockRiot, host: str, port: int, report_every: float = 10.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def _reporter():
+        last = 0
+        while True:
+            time.sleep(report_every)
+            snap = mock.snapshot()
+            recent = (snap["by_status"].get("200", 0) - last) / report_every
+            last = snap["by_status"].get("200", 0)
+            print(f"[mock] last {report_every:g}s: {recent:.1f} ok/s | {snap}", flush=True)
+
+    if report_every > 0:
+        threading.Thread(target=_reporter, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local Riot API stand-in for ETL load/backoff testing.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--matches", type=int, default=10_000)
+    ap.add_argument("--roster", type=int, default=14)
+    ap.add_argument("--population", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--app-limit", default="20:1,100:120", help="Riot dev-key default")
+    ap.add_argument("--method-limit", action="append", default=[], metavar="METHOD=SPEC",
+                    help=f"override, e.g. match-detail=500:10 (methods: {list(METHOD_LIMITS)})")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of admitted requests answered 503")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--report-every", type=float, default=10.0, help="seconds between stats lines (0 = off)")
+    ap.add_argument("--write-roster", type=Path, help="write a riot_ids.yaml for the synthetic roster here")
+    args = ap.parse_args()
+
+    limits = dict(METHOD_LIMITS)
+    for item in args.method_limit:
+        name, spec = item.split("=", 1)
+        limits[name] = spec
+
+    world = SyntheticRiot(roster_size=args.roster, population=args.population, seed=args.seed)
+    if args.write_roster:
+        args.write_roster.parent.mkdir(parents=True, exist_ok=True)
+        args.write_roster.write_text(yaml.safe_dump({"players": [p.riot_id for p in world.roster]}))
+        print(f"[mock] roster -> {args.write_roster}")
+
+    mock = MockRiot(world, args.matches, args.app_limit, limits,
+                    error_rate=args.error_rate, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+    server = serve(mock, args.host, args.port, args.report_every)
+    print(f"[mock] serving {args.matches:,} matches on http://{args.host}:{args.port}/{{routing}} "
+          f"(app limit {args.app_limit})", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"[mock] final {mock.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
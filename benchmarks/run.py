@@ -0,0 +1,225 @@
+# benchmarks/run.py
+# Stage-by-stage throughput + peak memory on synthetic match-v5 data.
+#   python -m benchmarks.run --sizes 1000,10000 --roster 14
+#   python -m benchmarks.run --sizes 1000000 --stages generate,flatten,group_view
+#
+# Every stage runs in its own spawned process inside a scratch working
+# directory (the src modules use relative data/ paths), so peak RSS is
+# per stage. Results are appended to reports/benchmarks.jsonl, one JSON
+# object per run, for comparison across commits.
+
+import argparse, json, multiprocessing as mp, os, platform, queue, resource, signal, subprocess, tempfile, time
+from pathlib import Path
+
+RESULTS_PATH = Path("reports/benchmarks.jsonl")
+POLL_S = 1.0   # how often a waiting parent checks that the stage process is still alive
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if platform.system() == "Darwin" else 2**10)
+
+# ---------- stages ----------
+# Each returns the number of items processed, or (items, seconds) when only
+# part of the stage should be timed.
+def stage_generate(n_matches: int, roster: int, seed: int) -> int:
+    """Synthetic payloads -> raw cache (data/raw) + roster.csv, like a fresh ETL pull."""
+    import pandas as pd
+    from benchmarks.synthetic import SyntheticRiot
+    from src.raw_store import RawMatchStore
+    from src import tables
+    world = SyntheticRiot(roster_size=roster, seed=seed)
+    store = RawMatchStore()
+    for mj in world.matches(n_matches):
+        store.put(mj["metadata"]["matchId"], mj)
+    pd.DataFrame({"riot_id": [p.riot_id for p in world.roster],
+                  "puuid": [p.puuid for p in world.roster]}).to_csv(tables.ROSTER, index=False)
+    return n_matches
+
+
+def stage_flatten(*_) -> int:
+    """Raw cache -> data/*_latest.parquet through the streaming, process-pool replay."""
+    from src.flatten import replay_store
+    from src.raw_store import RawMatchStore
+    from src import tables
+    n_matches, _ = replay_store(RawMatchStore(), tables.MATCHES_LATEST, tables.PARTICIPANTS_LATEST)
+    return n_matches
+
+
+def stage_flatten_inmem(*_):
+    """flatten_matches() on a list of payloads (capped at 20k: it holds everything in memory)."""
+    from src.flatten import flatten_matches
+    from src.raw_store import RawMatchStore
+    store = RawMatchStore()
+    payloads = list(store.iter_payloads(store.ids()[:20_000]))
+    t0 = time.perf_counter()
+    flatten_matches(payloads)
+    return len(payloads), time.perf_counter() - t0
+
+
+def stage_group_view(*_) -> int:
+    from src import build_group_view
+    from src.tables import load_merged, load_roster
+    df = build_group_view.build_group_view(load_merged(), load_roster())
+    build_group_view.write_group_view(df)
+    return len(df)
+
+
+def stage_contribution(*_) -> int:
+    """With/without + APM over every player ("All players" scope)."""
+    import pandas as pd
+    from src.build_group_view import GROUP_LATEST
+    from src.contribution import contribution_with_apm
+    sub = pd.read_parquet(GROUP_LATEST, columns=["match_id", "player_label", "win"])
+    contribution_with_apm(sub)
+    return len(sub)
+
+
+def stage_form(*_) -> int:
+    """Rolling per-player form from scratch (the incremental path only touches new games)."""
+    from src import features
+    from src.tables import load_merged
+    table, _ = features.update_form(load_merged(), rebuild=True)
+    return len(table)
+
+
+def stage_features(*_) -> int:
+    from src import features
+    from src.tables import load_merged
+    out = features.build_model_table(load_merged(), features.load_form())
+    out.to_parquet(features.MODEL_TABLE, index=False)
+    return len(out)
+
+
+def stage_train(*_) -> int:
+    import pandas as pd
+    from src import features, train_win_model
+    df = pd.read_parquet(features.MODEL_TABLE)
+    train_win_model.train(df)
+    return len(df)
+
+
+# order matters: later stages read what earlier ones wrote
+STAGES = {
+    "generate": stage_generate,
+    "flatten": stage_flatten,
+    "flatten_inmem": stage_flatten_inmem,
+    "group_view": stage_group_view,
+    "contribution": stage_contribution,
+    "form": stage_form,
+    "features": stage_features,
+    "train": stage_train,
+}
+
+# ---------- harness ----------
+def _child(name: str, workdir: str, args: tuple, repo: str, q):
+    import sys
+    os.chdir(workdir)
+    sys.path.insert(0, repo)
+    base = _rss_mb()
+    t0 = time.perf_counter()
+    try:
+        items = STAGES[name](*args)
+        seconds = time.perf_counter() - t0
+        if isinstance(items, tuple):
+            items, seconds = items
+        q.put({"ok": True, "items": items, "seconds": seconds,
+               "peak_rss_mb": _rss_mb(), "base_rss_mb": base})
+    except Exception as e:  # report and keep benchmarking the other stages
+        q.put({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+
+def _exit_reason(code: int | None) -> str:
+    if code is not None and code < 0:
+        sig = signal.Signals(-code).name
+        hint = " (likely the OOM killer)" if sig == "SIGKILL" else ""
+        return f"stage process killed by {sig}{hint}"
+    return f"stage process exited with code {code} without reporting a result"
+
+
+def run_stage(name: str, workdir: Path, args: tuple) -> dict:
+    ctx = mp.get_context("spawn")
+    q = ctx.Queue()
+    repo = str(Path(__file__).resolve().parents[1])
+    proc = ctx.Process(target=_child, args=(name, str(workdir), args, repo, q))
+    proc.start()
+    while True:
+        try:
+            res = q.get(timeout=POLL_S)
+            break
+        except queue.Empty:
+            if proc.is_alive():
+                continue
+            # died without reporting (OOM killer, segfault, kill): one last look, then record the failure
+            try:
+                res = q.get(timeout=POLL_S)
+            except queue.Empty:
+                res = {"ok": False, "error": _exit_reason(proc.exitcode)}
+            break
+    proc.join()
+    out = {"stage": name, **res}
+    if res.get("ok"):
+        out["seconds"] = round(res["seconds"], 4)
+        out["items_per_s"] = round(res["items"] / res["seconds"], 1) if res["seconds"] > 0 else None
+        out["peak_rss_mb"] = round(res["peak_rss_mb"], 1)
+        out["base_rss_mb"] = round(res["base_rss_mb"], 1)
+    return out
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list[int], roster: int, seed: int, stages: list[str]) -> list[dict]:
+    runs = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory(prefix="lol-bench-") as workdir:
+            results = []
+            for name in stages:
+                r = run_stage(name, Path(workdir), (n, roster, seed))
+                results.append(r)
+                if r.get("ok"):
+                    print(f"[{n:>9,}] {name:<14} {r['seconds']:>9.3f}s  {r['items_per_s'] or 0:>12,.0f}/s  "
+                          f"peak {r['peak_rss_mb']:>8.1f} MB")
+                else:
+                    print(f"[{n:>9,}] {name:<14} FAILED {r['error']}")
+        runs.append({
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "matches": n, "roster": roster, "seed": seed,
+            "stages": results,
+        })
+    return runs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic Riot data.")
+    ap.add_argument("--sizes", default="1000,10000", help="comma-separated match counts (1k..1M)")
+    ap.add_argument("--roster", type=int, default=14)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--stages", default=",".join(STAGES), help=f"subset of {list(STAGES)}")
+    ap.add_argument("--out", type=Path, default=RESULTS_PATH)
+    args = ap.parse_args()
+
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stage(s): {sorted(unknown)}")
+    stages = [s for s in STAGES if s in stages]   # keep dependency order
+
+    runs = run([int(s) for s in args.sizes.split(",")], args.roster, args.seed, stages)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "a", encoding="utf-8") as f:
+        for r in runs:
+            f.write(json.dumps(r) + "\n")
+    print("Appended", len(runs), "run(s) to", args.out)
+
+
+if __name__ == "__main__":
+    main()
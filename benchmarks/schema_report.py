@@ -0,0 +1,139 @@
+# benchmarks/schema_report.py
+# Memory + cold-load comparison of the legacy participants_group layout vs GROUP_SCHEMA.
+#   python -m benchmarks.schema_report --rows 2000000
+
+import argparse, json, tempfile, time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from src.build_group_view import choose_label
+from src.group_store import LOCAL_TZ, group_table
+
+REPORT_PATH = Path("reports/schema_report.json")
+
+
+def legacy_frame(rows: int, players: int = 50_000, seed: int = 7) -> pd.DataFrame:
+    """Group view as the old build_group_view wrote it: object strings, int64 counters, UTC ns timestamps."""
+    rng = np.random.default_rng(seed)
+    champs = np.array([f"Champion{i}" for i in range(170)], dtype=object)
+    names = np.array([f"Summoner{i}" for i in range(players)], dtype=object)
+    puuids = np.array([f"{i:078d}" for i in range(players)], dtype=object)
+    pidx = rng.integers(0, players, rows)
+    riot_id = np.where(pidx < 14, names[pidx] + "#NA1", None).astype(object)
+    label = np.where(riot_id != None, riot_id, names[pidx])  # noqa: E711
+    start = pd.Timestamp("2024-01-01", tz="UTC").value
+    return pd.DataFrame({
+        "match_id": np.char.add("NA1_", (np.arange(rows) // 10).astype(str)).astype(object),
+        "puuid": puuids[pidx],
+        "riot_id": riot_id,
+        "player_label": label,
+        "in_group": riot_id != None,  # noqa: E711
+        "summoner_name": names[pidx],
+        "champion": champs[rng.integers(0, len(champs), rows)],
+        "role": rng.choice(np.array(["SOLO", "DUO", "CARRY", "SUPPORT", "NONE"], dtype=object), rows),
+        "lane": rng.choice(np.array(["TOP", "JUNGLE", "MIDDLE", "BOTTOM"], dtype=object), rows),
+        "win": rng.integers(0, 2, rows).astype("int64"),
+        "kills": rng.integers(0, 20, rows).astype("int64"),
+        "deaths": rng.integers(0, 15, rows).astype("int64"),
+        "assists": rng.integers(0, 25, rows).astype("int64"),
+        "cs": rng.integers(0, 350, rows).astype("int64"),
+        "gold": rng.integers(4000, 20000, rows).astype("int64"),
+        "vision_score": rng.integers(0, 90, rows).astype("int64"),
+        "damage_dealt": rng.integers(2000, 60000, rows).astype("int64"),
+        "time_ccing": rng.integers(0, 120, rows).astype("int64"),
+        "game_creation": pd.to_datetime(start + rng.integers(0, 365 * 86400, rows) * 10**9, utc=True),
+        "game_version": rng.choice(np.array([f"14.{i}.1" for i in range(1, 25)], dtype=object), rows),
+        "queue": rng.choice([400, 420], rows).astype("int64"),
+    })
+
+
+def legacy_load(path) -> pd.DataFrame:
+    # what app.load_group() did on every cold start before GROUP_SCHEMA
+    df = pd.read_parquet(path)
+    df["game_creation"] = pd.to_datetime(df["game_creation"], errors="coerce", utc=True)
+    df["game_creation"] = df["game_creation"].dt.tz_convert(LOCAL_TZ)
+    if df["win"].dtype not in ("int64", "Int64"):
+        df["win"] = df["win"].astype(bool).astype(int)
+    df["hour"] = df["game_creation"].dt.hour
+    df["date"] = df["game_creation"].dt.date
+    return df
+
+
+def compact_load(path) -> pd.DataFrame:
+    df = pd.read_parquet(path)
+    df["hour"] = df["game_creation"].dt.hour
+    df["date"] = df["game_creation"].dt.date
+    return df
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def run(rows: int, players: int) -> dict:
+    legacy = legacy_frame(rows, players)
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path, new_path = Path(tmp) / "legacy.parquet", Path(tmp) / "compact.parquet"
+        legacy.to_parquet(old_path, index=False)
+        table, t_convert = _timed(group_table, legacy)
+        pq.write_table(table, new_path)
+        del table
+
+        old_df, t_old = _timed(legacy_load, old_path)
+        new_df, t_new = _timed(compact_load, new_path)
+        report = {
+            "rows": rows,
+            "players": players,
+            "legacy": {
+                "memory_mb": round(old_df.memory_usage(deep=True).sum() / 2**20, 1),
+                "file_mb": round(old_path.stat().st_size / 2**20, 1),
+                "load_s": round(t_old, 3),
+            },
+            "compact": {
+                "memory_mb": round(new_df.memory_usage(deep=True).sum() / 2**20, 1),
+                "file_mb": round(new_path.stat().st_size / 2**20, 1),
+                "load_s": round(t_new, 3),
+                "convert_s": round(t_convert, 3),
+            },
+        }
+
+    # label resolution: old row-wise apply vs vectorized (on a slice, apply is slow)
+    sample = legacy.head(min(rows, 200_000))
+    def _apply_label(row):
+        rid, sname = row.get("riot_id"), row.get("summoner_name")
+        if isinstance(rid, str) and len(rid.strip()) > 0:
+            return rid
+        if isinstance(sname, str) and len(sname.strip()) > 0:
+            return sname
+        return "(unknown)"
+    _, t_apply = _timed(sample.apply, _apply_label, 1)
+    _, t_vec = _timed(choose_label, sample["riot_id"], sample["summoner_name"])
+    report["label_resolution"] = {"rows": len(sample), "apply_s": round(t_apply, 3), "vectorized_s": round(t_vec, 4)}
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare legacy vs compact participants_group layouts.")
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--players", type=int, default=50_000)
+    args = ap.parse_args()
+    report = run(args.rows, args.players)
+
+    print(f"rows={report['rows']:,}  players={report['players']:,}")
+    print(f"{'':10}{'memory MB':>12}{'file MB':>10}{'load s':>9}")
+    for name in ("legacy", "compact"):
+        r = report[name]
+        print(f"{name:10}{r['memory_mb']:>12}{r['file_mb']:>10}{r['load_s']:>9}")
+    lr = report["label_resolution"]
+    print(f"player_label on {lr['rows']:,} rows: apply {lr['apply_s']}s vs vectorized {lr['vectorized_s']}s")
+
+    REPORT_PATH.parent.mkdir(exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2))
+    print("Saved", REPORT_PATH)
+
+
+if __name__ == "__main__":
+    main()
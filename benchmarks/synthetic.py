@@ -0,0 +1,239 @@
+# benchmarks/synthetic.py
+# Seeded generator of realistic Riot match-v5 payloads for benchmarks and the local API stand-in.
+#
+# The roster plays as premades (1-5 roster players on one side), everyone else
+# is drawn from a larger population, each player has a small champion pool, and
+# roster skill nudges the win probability so contribution/lift have signal.
+
+from dataclasses import dataclass
+import numpy as np
+
+CHAMPIONS = [
+    "Aatrox", "Ahri", "Akali", "Akshan", "Alistar", "Amumu", "Anivia", "Annie", "Aphelios", "Ashe",
+    "AurelionSol", "Azir", "Bard", "Belveth", "Blitzcrank", "Brand", "Braum", "Briar", "Caitlyn", "Camille",
+    "Cassiopeia", "Chogath", "Corki", "Darius", "Diana", "Draven", "DrMundo", "Ekko", "Elise", "Evelynn",
+    "Ezreal", "Fiddlesticks", "Fiora", "Fizz", "Galio", "Gangplank", "Garen", "Gnar", "Gragas", "Graves",
+    "Gwen", "Hecarim", "Heimerdinger", "Hwei", "Illaoi", "Irelia", "Ivern", "Janna", "JarvanIV", "Jax",
+    "Jayce", "Jhin", "Jinx", "Kaisa", "Kalista", "Karma", "Karthus", "Kassadin", "Katarina", "Kayle",
+    "Kayn", "Kennen", "Khazix", "Kindred", "Kled", "KogMaw", "KSante", "Leblanc", "LeeSin", "Leona",
+    "Lillia", "Lissandra", "Lucian", "Lulu", "Lux", "Malphite", "Malzahar", "Maokai", "MasterYi", "Milio",
+    "MissFortune", "Mordekaiser", "Morgana", "Naafiri", "Nami", "Nasus", "Nautilus", "Neeko", "Nidalee", "Nilah",
+    "Nocturne", "Nunu", "Olaf", "Orianna", "Ornn", "Pantheon", "Poppy", "Pyke", "Qiyana", "Quinn",
+    "Rakan", "Rammus", "RekSai", "Rell", "Renata", "Renekton", "Rengar", "Riven", "Rumble", "Ryze",
+    "Samira", "Sejuani", "Senna", "Seraphine", "Sett", "Shaco", "Shen", "Shyvana", "Singed", "Sion",
+    "Sivir", "Skarner", "Smolder", "Sona", "Soraka", "Swain", "Sylas", "Syndra", "TahmKench", "Taliyah",
+    "Talon", "Taric", "Teemo", "Thresh", "Tristana", "Trundle", "Tryndamere", "TwistedFate", "Twitch", "Udyr",
+    "Urgot", "Varus", "Vayne", "Veigar", "Velkoz", "Vex", "Vi", "Viego", "Viktor", "Vladimir",
+    "Volibear", "Warwick", "MonkeyKing", "Xayah", "Xerath", "XinZhao", "Yasuo", "Yone", "Yorick", "Yuumi",
+    "Zac", "Zed", "Zeri", "Ziggs", "Zilean", "Zoe", "Zyra",
+]
+POSITIONS = [("TOP", "SOLO"), ("JUNGLE", "NONE"), ("MIDDLE", "SOLO"), ("BOTTOM", "CARRY"), ("BOTTOM", "SUPPORT")]
+QUEUES = [400, 420]
+
+
+@dataclass
+class Player:
+    puuid: str
+    game_name: str
+    tag_line: str
+    skill: float
+    pool: np.ndarray    # champion indices this player mostly picks
+
+    @property
+    def riot_id(self) -> str:
+        return f"{self.game_name}#{self.tag_line}"
+
+
+def make_players(n: int, prefix: str, rng: np.random.Generator) -> list[Player]:
+    out = []
+    for i in range(n):
+        # 78-char PUUIDs like the real ones
+        puuid = (f"{prefix}{i:08d}" + rng.bytes(40).hex())[:78]
+        out.append(Player(
+            puuid=puuid, game_name=f"{prefix}{i}", tag_line="NA1",
+            skill=float(rng.normal(0, 0.35)),
+            pool=rng.choice(len(CHAMPIONS), size=int(rng.integers(3, 12)), replace=False),
+        ))
+    return out
+
+
+class SyntheticRiot:
+    """
+    Deterministic world of players and matches.
+
+    `matches(n)` yields payloads lazily, so 1M matches never sit in memory;
+    `match(i)` regenerates any single match by index (used by the API stand-in).
+    """
+
+    def __init__(self, roster_size: int = 14, population: int = 20_000, seed: int = 0,
+                 platform: str = "NA1", start_ms: int = 1_704_067_200_000, spacing_ms: int = 240_000):
+        rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.platform = platform
+        self.start_ms = start_ms
+        self.spacing_ms = spacing_ms
+        self.roster = make_players(roster_size, "Roster", rng)
+        self.population = make_players(population, "Player", rng)
+        self.by_puuid = {p.puuid: p for p in self.roster + self.population}
+
+    def match_id(self, i: int) -> str:
+        return f"{self.platform}_{5_000_000_000 + i}"
+
+    def match_index(self, match_id: str) -> int:
+        return int(match_id.split("_", 1)[1]) - 5_000_000_000
+
+    def lineup(self, i: int) -> list[Player]:
+        """The 10 players of match i (blue side first); cheap, no payload built."""
+        rng = np.random.default_rng([self.seed, i, 0])
+        n_roster = int(min(len(self.roster), rng.choice([0, 1, 1, 2, 2, 3, 5])))
+        premade = rng.permutation(len(self.roster))[:n_roster] if n_roster else []
+        others = set()
+        while len(others) < 10 - n_roster:
+            others.add(int(rng.integers(0, len(self.population))))
+        # premade always on blue side so they share an outcome
+        return [self.roster[j] for j in premade] + [self.population[j] for j in sorted(others)]
+
+    def queue(self, i: int) -> int:
+        return int(np.random.default_rng([self.seed, i, 2]).choice(QUEUES))
+
+    def match(self, i: int) -> dict:
+        rng = np.random.default_rng([self.seed, i, 1])
+        players = self.lineup(i)
+        blue, red = players[:5], players[5:]
+        edge = sum(p.skill for p in blue) - sum(p.skill for p in red)
+        blue_wins = rng.random() < 1.0 / (1.0 + np.exp(-edge))
+
+        start = self.start_ms + i * self.spacing_ms + int(rng.integers(0, self.spacing_ms))
+        duration = int(rng.integers(15 * 60, 45 * 60))
+        patch = (start - self.start_ms) // (14 * 86_400_000)   # a new patch every two weeks
+        version = f"{14 + patch // 24}.{1 + patch % 24}.{int(rng.integers(100, 700))}.{int(rng.integers(1000, 9999))}"
+
+        participants = []
+        used = set()
+        for slot, p in enumerate(players):
+            team = 100 if slot < 5 else 200
+            lane, role = POSITIONS[slot % 5]
+            champ = int(rng.choice(p.pool)) if rng.random() < 0.85 else int(rng.integers(0, len(CHAMPIONS)))
+            while champ in used:
+                champ = int(rng.integers(0, len(CHAMPIONS)))
+            used.add(champ)
+            win = bool(blue_wins) == (team == 100)
+            minutes = duration / 60
+            participants.append({
+                "participantId": slot + 1,
+                "puuid": p.puuid,
+                "riotIdGameName": p.game_name,
+                "riotIdTagline": p.tag_line,
+                "summonerName": p.game_name,
+                "teamId": team,
+                "championName": CHAMPIONS[champ],
+                "championId": champ + 1,
+                "teamPosition": lane,
+                "lane": lane,
+                "role": role,
+                "win": win,
+                "kills": int(rng.poisson(6 if win else 4)),
+                "deaths": int(rng.poisson(4 if win else 6)),
+                "assists": int(rng.poisson(9 if win else 6)),
+                "totalMinionsKilled": int(rng.normal(6.5, 1.5) * minutes) if lane != "JUNGLE" else int(rng.normal(1.2, 0.5) * minutes),
+                "neutralMinionsKilled": int(rng.normal(5.0, 1.0) * minutes) if lane == "JUNGLE" else int(rng.integers(0, 12)),
+                "goldEarned": int(rng.normal(420 if win else 370, 40) * minutes),
+                "visionScore": int(rng.normal(1.0, 0.3) * minutes),
+                "totalDamageDealtToChampions": int(rng.normal(800, 200) * minutes),
+                "timeCCingOthers": int(rng.integers(0, 60)),
+                "champLevel": int(rng.integers(11, 19)),
+                "item0": int(rng.integers(1000, 7000)), "item1": int(rng.integers(1000, 7000)),
+                "item2": int(rng.integers(1000, 7000)), "item3": int(rng.integers(1000, 7000)),
+                "summoner1Id": 4, "summoner2Id": int(rng.choice([7, 11, 12, 14])),
+            })
+
+        return {
+            "metadata": {
+                "dataVersion": "2",
+                "matchId": self.match_id(i),
+                "participants": [p["puuid"] for p in participants],
+            },
+            "info": {
+                "gameCreation": start - 60_000,
+                "gameStartTimestamp": start,
+                "gameEndTimestamp": start + duration * 1000,
+                "gameDuration": duration,
+                "gameId": 5_000_000_000 + i,
+                "gameMode": "CLASSIC",
+                "gameType": "MATCHED_GAME",
+                "gameVersion": version,
+                "mapId": 11,
+                "platformId": self.platform,
+                "queueId": self.queue(i),
+                "participants": participants,
+                "teams": [
+                    {"teamId": 100, "win": bool(blue_wins)},
+                    {"teamId": 200, "win": not blue_wins},
+                ],
+            },
+        }
+
+    def timeline(self, i: int, match: dict | None = None) -> dict:
+        """match-v5 timeline for match i: a frame per minute whose curves end at the match totals."""
+        mj = match or self.match(i)
+        info = mj["info"]
+        rng = np.random.default_rng([self.seed, i, 3])
+        minutes = info["gameDuration"] // 60
+        t = np.arange(minutes + 1) / max(minutes, 1)
+        frames = []
+        parts = info["participants"]
+        # each curve is a noisy, increasing path from the start value to the final stat
+        shape = {p["participantId"]: np.maximum.accumulate(
+            np.clip(t ** rng.uniform(0.9, 1.3) + rng.normal(0, 0.01, len(t)), 0, 1)) for p in parts}
+        for m in range(minutes + 1):
+            pframes = {}
+            for p in parts:
+                f = shape[p["participantId"]][m]
+                gold = 500 + int(f * (p["goldEarned"] - 500))
+                pframes[str(p["participantId"])] = {
+                    "participantId": p["participantId"],
+                    "totalGold": gold,
+                    "currentGold": int(rng.integers(0, 1500)) if m else 500,
+                    "goldPerSecond": 0,
+                    "xp": int(f * 18_000 * p["champLevel"] / 18),
+                    "level": max(1, int(round(f * p["champLevel"]))),
+                    "minionsKilled": int(f * p["totalMinionsKilled"]),
+                    "jungleMinionsKilled": int(f * p["neutralMinionsKilled"]),
+                    "timeEnemySpentControlled": int(f * p["timeCCingOthers"] * 1000),
+                    "position": {"x": int(rng.integers(0, 15000)), "y": int(rng.integers(0, 15000))},
+                    "championStats": {k: int(rng.integers(0, 500)) for k in (
+                        "abilityHaste", "abilityPower", "armor", "attackDamage", "attackSpeed", "health",
+                        "healthMax", "healthRegen", "magicResist", "movementSpeed", "power", "powerMax")},
+                    "damageStats": {
+                        "totalDamageDoneToChampions": int(f * p["totalDamageDealtToChampions"]),
+                        "magicDamageDoneToChampions": int(f * p["totalDamageDealtToChampions"] * 0.4),
+                        "physicalDamageDoneToChampions": int(f * p["totalDamageDealtToChampions"] * 0.5),
+                        "trueDamageDoneToChampions": int(f * p["totalDamageDealtToChampions"] * 0.1),
+                        "totalDamageTaken": int(f * rng.integers(10_000, 40_000)),
+                    },
+                }
+            # the events are most of a real timeline's bytes; we only need them to be there
+            events = [{"type": "ITEM_PURCHASED", "timestamp": m * 60_000 + int(rng.integers(0, 60_000)),
+                       "participantId": int(rng.integers(1, 11)), "itemId": int(rng.integers(1000, 7000))}
+                      for _ in range(int(rng.integers(10, 40)))]
+            frames.append({"timestamp": m * 60_000, "participantFrames": pframes, "events": events})
+        return {
+            "metadata": {"dataVersion": "2", "matchId": mj["metadata"]["matchId"],
+                         "participants": mj["metadata"]["participants"]},
+            "info": {
+                "frameInterval": 60_000,
+                "gameId": info["gameId"],
+                "participants": [{"participantId": p["participantId"], "puuid": p["puuid"]} for p in parts],
+                "frames": frames,
+            },
+        }
+
+    def matches(self, n: int, start: int = 0):
+        for i in range(start, start + n):
+            yield self.match(i)
+
+    def match_ids_for(self, puuid: str, n_matches: int) -> list[str]:
+        """Newest-first IDs of `puuid`'s games among the first n_matches (scans lineups only)."""
+        ids = [self.match_id(i) for i in range(n_matches)
+               if any(p.puuid == puuid for p in self.lineup(i))]
+        return ids[::-1]
@@ -1,8 +1,10 @@
 import pandas as pd
 from pathlib import Path
+from src.snapshot_log import SnapshotLog
 
-pm = pd.read_parquet("data/matches_latest.parquet")
-pp = pd.read_parquet("data/participants_latest.parquet")
+log = SnapshotLog()   # current version; pass version= / as_of= to look at an earlier one
+pm = log.read("matches")
+pp = log.read("participants")
 
 # Basic derived metrics
 pp["kda"] = (pp["kills"] + pp["assists"]) / pp["deaths"].replace(0, 1)
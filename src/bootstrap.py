@@ -0,0 +1,116 @@
+# src/bootstrap.py
+# Bootstrap confidence intervals for Pick Advisor lift and Contribution scores.
+# Thousands of resamples as batched NumPy draws / sparse products, never a Python loop per resample.
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from src import cube
+from src.contribution import Incidence, contribution_table
+
+N_BOOT = 2000
+ALPHA = 0.05          # 95% intervals
+CHUNK_ELEMS = 4_000_000   # resamples × columns held at once
+
+
+def _interval(samples: np.ndarray, alpha: float = ALPHA) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile interval per column of a [resample, column] array, ignoring NaN
+    resamples (e.g. a champion that drew zero games). Sorting puts NaN last,
+    so the quantile rows are read off each column's valid prefix.
+    """
+    s = np.sort(samples, axis=0)
+    last = np.maximum((~np.isnan(samples)).sum(axis=0) - 1, 0)
+    cols = np.arange(s.shape[1])
+
+    def q(p):
+        # linear interpolation between order statistics, as np.quantile does
+        pos = p * last
+        i = np.floor(pos).astype(int)
+        j = np.minimum(i + 1, last)
+        return s[i, cols] + (s[j, cols] - s[i, cols]) * (pos - i)
+
+    return q(alpha / 2), q(1 - alpha / 2)
+
+# ---------- Pick Advisor lift ----------
+def lift_ci(cells: pd.DataFrame, min_games: int = 1, n_boot: int = N_BOOT, alpha: float = ALPHA,
+            seed: int = 0) -> pd.DataFrame:
+    """
+    pick_table() plus lift_lo / lift_hi.
+
+    Poisson bootstrap over the player's games: each game is drawn Poisson(1)
+    times, so a resample's wins and losses on the champion and on everything
+    else are four independent Poisson counts with the observed totals as
+    means. Every (player, champion) row is then a column of four draws per
+    resample instead of an index gather over the player's games.
+    """
+    tbl = cube.pick_table(cells, min_games)
+    if tbl.empty:
+        return tbl.assign(lift_lo=pd.Series(dtype=float), lift_hi=pd.Series(dtype=float))
+    per_player = cells.groupby("player_label", observed=True)[["games", "wins"]].sum()
+    n = per_player["games"].reindex(tbl["player_label"]).to_numpy(np.float64)
+    w_all = per_player["wins"].reindex(tbl["player_label"]).to_numpy(np.float64)
+    g = tbl["games"].to_numpy(np.float64)
+    w = np.rint(tbl["winrate"].to_numpy() * g)
+    means = np.stack([w, g - w, w_all - w, (n - w_all) - (g - w)])    # champ W/L, rest W/L
+
+    rng = np.random.default_rng(seed)
+    lo, hi = np.empty(len(tbl)), np.empty(len(tbl))
+    step = max(1, CHUNK_ELEMS // n_boot)
+    for s in range(0, len(tbl), step):
+        wc, lc, wr, lr = (rng.poisson(m[s:s + step], size=(n_boot, len(m[s:s + step]))) for m in means)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lift = wc / (wc + lc) - (wc + wr) / (wc + lc + wr + lr)
+        lo[s:s + step], hi[s:s + step] = _interval(lift, alpha)
+    return tbl.assign(lift_lo=lo, lift_hi=hi)
+
+# ---------- Contribution ----------
+def contribution_ci(sub: pd.DataFrame, players=None, n_boot: int = N_BOOT, alpha: float = ALPHA,
+                    seed: int = 0) -> pd.DataFrame:
+    """
+    contribution_table() plus contribution_lo / contribution_hi for `players`
+    (default: all). Each resample is a row of match indices drawn with
+    replacement; one bincount turns a block of them into a [match, resample]
+    count matrix, and every resampled with/without total is a sparse product
+    of the incidence matrix with that block.
+    """
+    inc = Incidence(sub)
+    out = contribution_table(sub, inc)
+    cols = np.arange(len(inc.players)) if players is None else np.flatnonzero(np.isin(inc.players, list(players)))
+    lo = np.full(len(out), np.nan)
+    hi = np.full(len(out), np.nan)
+    if len(cols) == 0 or inc.A.shape[0] == 0:
+        return out.assign(contribution_lo=lo, contribution_hi=hi)
+
+    n_m = inc.A.shape[0]
+    A = inc.A[:, cols]
+    # wins of the player's own rows per match (teammates share `win`, but keep it row-exact)
+    Aw = sparse.csr_matrix((inc.win[inc.labelled], (inc.m_codes[inc.labelled], inc.p_codes[inc.labelled])),
+                           shape=inc.A.shape)[:, cols]
+    present = A.copy()
+    present.data[:] = 1.0
+    k_p = len(cols)
+    # one stacked operator: games, wins, rows/wins of the player's matches, then the two overall totals
+    M = sparse.vstack([
+        A.T, Aw.T,
+        present.T @ sparse.diags(inc.match_rows), present.T @ sparse.diags(inc.match_wins),
+        sparse.csr_matrix(inc.match_rows[None, :]), sparse.csr_matrix(inc.match_wins[None, :]),
+    ]).tocsr().astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    samples = np.empty((n_boot, k_p), dtype=np.float32)
+    step = max(1, CHUNK_ELEMS // n_m)
+    for s in range(0, n_boot, step):
+        k = min(step, n_boot - s)
+        # flat position match * k + resample, so the counts come out as a C-ordered [match, resample] block
+        idx = rng.integers(0, n_m, size=(k, n_m), dtype=np.int64) * k + np.arange(k)[:, None]
+        Wt = np.bincount(idx.ravel(), minlength=n_m * k).reshape(n_m, k).astype(np.float32)
+        R = M @ Wt
+        games, wins = R[:k_p], R[k_p:2 * k_p]
+        rows_in, wins_in = R[2 * k_p:3 * k_p], R[3 * k_p:4 * k_p]
+        rows_out, wins_out = R[-2] - rows_in, R[-1] - wins_in
+        with np.errstate(invalid="ignore", divide="ignore"):
+            c = wins / games - np.where(rows_out > 0, wins_out / rows_out, np.nan)
+        samples[s:s + k] = c.T
+    lo[cols], hi[cols] = _interval(samples, alpha)
+    return out.assign(contribution_lo=lo, contribution_hi=hi)
@@ -1,45 +1,63 @@
 # src/build_group_view.py
 
 import pandas as pd
-from pathlib import Path
+import pyarrow.parquet as pq
+from src.group_store import (GROUP_DIR, SERVING_PATH, compact_group_frame, group_table, write_group_dataset,
+                             write_serving_file)
+from src.cube import write_cube
+from src.prefix_index import write_prefix_index
+from src.tables import DATA, load_merged, load_roster
 
-DATA = Path("data")
+GROUP_LATEST = DATA / "participants_group_latest.parquet"
 
-# Load
-pp = pd.read_parquet(DATA / "participants_latest.parquet")
-pm = pd.read_parquet(DATA / "matches_latest.parquet")[["match_id","game_creation","queue","game_version"]]
-roster = pd.read_csv(DATA / "roster.csv")  # columns: riot_id, puuid (and maybe platform)
-
-# Merge PUUID → Riot ID
-df = pp.merge(pm, on="match_id", how="left").merge(roster[["puuid","riot_id"]], on="puuid", how="left")
-
-# Pick a stable display label:
-# Prefer your roster Riot ID (e.g., "Ikkyro#NA1") if present; otherwise fall back to API summoner_name
-def choose_label(row):
-    rid = row.get("riot_id")
-    sname = row.get("summoner_name")
-    if isinstance(rid, str) and len(rid.strip()) > 0:
-        return rid
-    if isinstance(sname, str) and len(sname.strip()) > 0:
-        return sname
-    return "(unknown)"
-
-df["player_label"] = df.apply(choose_label, axis=1)
-
-# Mark whether the row is one of "your group" (came from roster)
-df["in_group"] = df["riot_id"].notna()
-
-# Type fixes
-df["game_creation"] = pd.to_datetime(df["game_creation"], errors="coerce", utc=True)
-if df["win"].dtype != "int64" and df["win"].dtype != "Int64":
-    df["win"] = df["win"].astype(bool).astype(int)
-
-# Save an enriched version for the app
-out_cols = [
+OUT_COLS = [
     "match_id","puuid","riot_id","player_label","in_group","summoner_name","champion","role","lane","win",
     "kills","deaths","assists","cs","gold","vision_score","damage_dealt","time_ccing",
     "game_creation","game_version","queue"
 ]
-df[out_cols].to_parquet(DATA / "participants_group_latest.parquet", index=False)
-print("Saved:", DATA / "participants_group_latest.parquet", "rows:", len(df))
 
+# Pick a stable display label:
+# Prefer your roster Riot ID (e.g., "Ikkyro#NA1") if present; otherwise fall back to API summoner_name
+def choose_label(riot_id: pd.Series, summoner_name: pd.Series) -> pd.Series:
+    def usable(s):
+        # non-blank strings only; NaN and non-str values drop out via the .str accessor
+        return s.where(s.astype("object").str.strip().str.len() > 0)
+    return usable(riot_id).fillna(usable(summoner_name)).fillna("(unknown)")
+
+def build_group_view(merged: pd.DataFrame, roster: pd.DataFrame) -> pd.DataFrame:
+    """participants⋈matches frame + roster -> compact enriched rows for the app (input is not modified)."""
+    # Merge PUUID → Riot ID
+    df = merged.merge(roster[["puuid","riot_id"]], on="puuid", how="left")
+
+    df["player_label"] = choose_label(df["riot_id"], df["summoner_name"])
+
+    # Mark whether the row is one of "your group" (came from roster)
+    df["in_group"] = df["riot_id"].notna()
+
+    # Typed layout (categoricals, narrow ints, local-time timestamps), see GROUP_SCHEMA
+    return compact_group_frame(df[OUT_COLS])
+
+def write_group_view(df: pd.DataFrame):
+    # Save an enriched version for the app
+    pq.write_table(group_table(df), GROUP_LATEST)
+    print("Saved:", GROUP_LATEST, "rows:", len(df))
+
+    # Partitioned copy (queue=/month=) that the app reads with filter pushdown
+    summary = write_group_dataset(df)
+    print("Saved:", GROUP_DIR, summary)
+
+    # Typed, pre-derived Arrow IPC copy the app memory-maps
+    n = write_serving_file(df)
+    print("Saved:", SERVING_PATH, "rows:", n)
+
+    # Rollups the dashboard answers most tabs from
+    write_cube(df)
+
+    # Per-player prefix sums for Player detail (date ranges and rolling windows as lookups)
+    write_prefix_index(df)
+
+def main():
+    write_group_view(build_group_view(load_merged(), load_roster()))
+
+if __name__ == "__main__":
+    main()
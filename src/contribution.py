@@ -0,0 +1,97 @@
+# src/contribution.py
+# Player impact from a sparse match × player incidence matrix:
+# with/without win rates and a ridge "adjusted plus-minus", no per-player loops.
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+
+
+class Incidence:
+    """
+    Row-level codes + the matrices every contribution metric is built from.
+
+    A[m, p] = number of rows player p has in match m (normally 0/1). Rows whose
+    player_label is missing still count towards match totals, exactly like the
+    old per-player loop that masked on match_id.
+    """
+
+    def __init__(self, sub: pd.DataFrame, player_col: str = "player_label"):
+        self.m_codes, self.match_ids = pd.factorize(sub["match_id"])
+        p_codes, players = pd.factorize(sub[player_col], sort=True)
+        self.players = np.asarray(players)
+        self.win = sub["win"].to_numpy(dtype=np.float64)
+        n_m, n_p = len(self.match_ids), len(self.players)
+
+        labelled = p_codes >= 0
+        self.p_codes = p_codes
+        self.labelled = labelled
+        self.A = sparse.csr_matrix(
+            (np.ones(labelled.sum()), (self.m_codes[labelled], p_codes[labelled])), shape=(n_m, n_p)
+        )
+        self.match_rows = np.bincount(self.m_codes, minlength=n_m).astype(np.float64)
+        self.match_wins = np.bincount(self.m_codes, weights=self.win, minlength=n_m)
+
+
+def contribution_table(sub: pd.DataFrame, inc: Incidence | None = None) -> pd.DataFrame:
+    """
+    Per player: games, win rate WITH them, win rate over all rows from matches
+    WITHOUT them, and the difference. Same numbers as filtering `sub` once per
+    player, in a handful of sparse products.
+    """
+    inc = inc or Incidence(sub)
+    n_p = len(inc.players)
+    if n_p == 0:
+        return pd.DataFrame(columns=["player", "games", "winrate_with", "winrate_without", "contribution"])
+
+    p = inc.p_codes[inc.labelled]
+    games = np.bincount(p, minlength=n_p).astype(np.float64)
+    wins = np.bincount(p, weights=inc.win[inc.labelled], minlength=n_p)
+
+    B = inc.A.copy()
+    B.data[:] = 1.0                              # "player appears in match"
+    rows_in = B.T @ inc.match_rows               # rows in the player's matches
+    wins_in = B.T @ inc.match_wins
+    rows_out = inc.match_rows.sum() - rows_in
+    wins_out = inc.match_wins.sum() - wins_in
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        wr_with = wins / games
+        wr_without = np.where(rows_out > 0, wins_out / rows_out, np.nan)
+
+    return pd.DataFrame({
+        "player": inc.players,
+        "games": games.astype(int),
+        "winrate_with": wr_with,
+        "winrate_without": wr_without,
+        "contribution": wr_with - wr_without,
+    })
+
+
+def adjusted_plus_minus(sub: pd.DataFrame, alpha: float = 25.0, inc: Incidence | None = None) -> pd.Series:
+    """
+    Ridge regression of match outcome on who played on which side.
+
+    One equation per match: +1 for every labelled player on the winning side,
+    -1 for the losing side, target 1. Teammates share `win`, so sides come
+    straight from the win flag. `alpha` shrinks low-sample players toward 0;
+    coefficients are in "outcome margin" units, comparable across players.
+    """
+    inc = inc or Incidence(sub)
+    n_m, n_p = inc.A.shape
+    if n_m == 0 or n_p == 0:
+        return pd.Series(dtype=float, name="apm")
+    sign = 2.0 * inc.win[inc.labelled] - 1.0
+    X = sparse.csr_matrix((sign, (inc.m_codes[inc.labelled], inc.p_codes[inc.labelled])), shape=(n_m, n_p))
+    y = np.ones(n_m)
+    coef = lsqr(X, y, damp=np.sqrt(alpha))[0]
+    return pd.Series(coef, index=inc.players, name="apm")
+
+
+def contribution_with_apm(sub: pd.DataFrame, alpha: float = 25.0) -> pd.DataFrame:
+    """contribution_table + an `apm` column, sharing one incidence build."""
+    inc = Incidence(sub)
+    out = contribution_table(sub, inc)
+    out["apm"] = adjusted_plus_minus(sub, alpha, inc).reindex(out["player"]).to_numpy()
+    return out
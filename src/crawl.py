@@ -0,0 +1,261 @@
+# src/crawl.py
+# Optional crawl past the roster: roster matches -> teammates/opponents -> their matches, depth- and budget-bounded
+#
+#   python -m src.crawl --depth 2 --budget 5000           # fetch up to 5,000 new matches, then publish a snapshot
+#   python -m src.crawl --budget 20000                     # resumes from where the last run stopped
+#   python -m src.crawl --status
+#
+# All crawl state lives in one SQLite file (data/crawl/crawl.sqlite): the
+# priority frontier of players still to expand, the seen-sets of players
+# and match IDs, and the fetched matches not published yet. Python only holds
+# the batch in flight (the raw store runs without its in-memory index and
+# publishing goes in chunks), so memory stays flat at hundreds of thousands of
+# matches, and a run stopped at any point resumes from its last committed batch.
+
+import argparse, os, sqlite3, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import pandas as pd
+from src.raw_store import RawMatchStore
+from src.riot_client import routing_for_match
+from src.telemetry import REPORTS
+
+CRAWL_DB = Path("data/crawl/crawl.sqlite")
+MAX_DEPTH = 2                 # roster = 0, their teammates/opponents = 1, ...
+MATCHES_PER_PLAYER = 20       # newest match IDs listed per expanded player
+BATCH_PLAYERS = 32            # players expanded per committed batch
+SEED_PRIORITY = 1e9           # roster players always go first
+PUBLISH_CHUNK = 50_000        # fetched matches appended to the snapshot log per version
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    puuid    TEXT PRIMARY KEY,
+    priority REAL NOT NULL,
+    depth    INTEGER NOT NULL,
+    routing  TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS frontier_priority ON frontier (priority DESC);
+CREATE TABLE IF NOT EXISTS seen_players (
+    puuid    TEXT PRIMARY KEY,
+    depth    INTEGER NOT NULL,
+    expanded INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seen_matches (
+    match_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unpublished (
+    match_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+class CrawlState:
+    """
+    Frontier + seen-sets on disk.
+
+    A player's priority is the sum of 0.5**depth over every crawled match
+    they appeared in, so players who keep showing up near the roster are
+    expanded before one-off opponents further out.
+    """
+
+    def __init__(self, path: Path = CRAWL_DB):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.db.execute("PRAGMA journal_mode=WAL")
+
+    def seed(self, puuids, routing: str):
+        for puuid in puuids:
+            self.push(puuid, 0, routing, SEED_PRIORITY)
+        self.db.commit()
+
+    def push(self, puuid: str, depth: int, routing: str, weight: float):
+        """Count one sighting; players already expanded never re-enter the frontier."""
+        self.db.execute("INSERT INTO seen_players (puuid, depth) VALUES (?, ?) "
+                        "ON CONFLICT(puuid) DO UPDATE SET depth = MIN(depth, excluded.depth)", (puuid, depth))
+        (expanded,) = self.db.execute("SELECT expanded FROM seen_players WHERE puuid = ?", (puuid,)).fetchone()
+        if expanded:
+            return
+        self.db.execute("INSERT INTO frontier (puuid, priority, depth, routing) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(puuid) DO UPDATE SET priority = priority + excluded.priority, "
+                        "depth = MIN(depth, excluded.depth)", (puuid, weight, depth, routing))
+
+    def pop(self, n: int, max_depth: int) -> list[tuple[str, float, int, str]]:
+        """Take the `n` best players; uncommitted, so an interrupted batch is back in the frontier."""
+        rows = self.db.execute("SELECT puuid, priority, depth, routing FROM frontier WHERE depth <= ? "
+                               "ORDER BY priority DESC LIMIT ?", (max_depth, n)).fetchall()
+        self.db.executemany("DELETE FROM frontier WHERE puuid = ?", [(r[0],) for r in rows])
+        return rows
+
+    def requeue(self, puuid: str, priority: float, depth: int, routing: str):
+        self.push(puuid, depth, routing, priority)
+
+    def mark_expanded(self, puuid: str):
+        self.db.execute("UPDATE seen_players SET expanded = 1 WHERE puuid = ?", (puuid,))
+
+    def claim_match(self, match_id: str) -> bool:
+        """True the first time a match ID is seen by any crawl run."""
+        return self.db.execute("INSERT OR IGNORE INTO seen_matches (match_id) VALUES (?)", (match_id,)).rowcount == 1
+
+    def unclaim_match(self, match_id: str):
+        self.db.execute("DELETE FROM seen_matches WHERE match_id = ?", (match_id,))
+
+    def mark_fetched(self, match_id: str):
+        self.db.execute("INSERT OR IGNORE INTO unpublished (match_id) VALUES (?)", (match_id,))
+
+    def unpublished(self, n: int) -> list[str]:
+        return [r[0] for r in self.db.execute("SELECT match_id FROM unpublished LIMIT ?", (n,))]
+
+    def mark_published(self, match_ids: list[str]):
+        self.db.executemany("DELETE FROM unpublished WHERE match_id = ?", [(m,) for m in match_ids])
+        self.db.commit()
+
+    def commit(self):
+        self.db.commit()
+
+    def status(self) -> dict:
+        q = lambda sql: self.db.execute(sql).fetchone()[0]
+        return {
+            "frontier": q("SELECT COUNT(*) FROM frontier"),
+            "players_seen": q("SELECT COUNT(*) FROM seen_players"),
+            "players_expanded": q("SELECT COUNT(*) FROM seen_players WHERE expanded = 1"),
+            "matches_seen": q("SELECT COUNT(*) FROM seen_matches"),
+            "unpublished": q("SELECT COUNT(*) FROM unpublished"),
+            "frontier_by_depth": dict(self.db.execute("SELECT depth, COUNT(*) FROM frontier GROUP BY depth").fetchall()),
+        }
+
+# ---------- crawl ----------
+def _participants(store: RawMatchStore, match_id: str) -> list[str]:
+    """PUUIDs of a match, fetching (and caching) the payload if it isn't stored yet."""
+    from src import etl_http_riot as etl
+    if match_id in store:
+        payload = store.get(match_id)
+    else:
+        payload = etl.get_match_detail(match_id)
+        store.put(match_id, payload)
+    return payload.get("metadata", {}).get("participants", [])
+
+
+def crawl(state: CrawlState, store: RawMatchStore, budget: int, max_depth: int = MAX_DEPTH,
+          per_player: int = MATCHES_PER_PLAYER, batch: int = BATCH_PLAYERS) -> dict:
+    """Expand the frontier until `budget` new matches were fetched or nothing within `max_depth` is left."""
+    from src import etl_http_riot as etl     # needs RIOT_API_KEY; --status works without it
+    stats = {"expanded": 0, "fetched": 0, "cached_reads": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=etl.MAX_WORKERS, thread_name_prefix="crawl") as pool:
+        while stats["fetched"] < budget:
+            players = state.pop(batch, max_depth)
+            if not players:
+                break
+            # 1) match IDs of every player in the batch, on their own routing cluster
+            futs = {pool.submit(etl.get_match_ids, row[0], per_player, etl.QUEUE, etl.get_client(row[3])): row
+                    for row in players}
+            todo, fetch_new = {}, 0
+            for fut in as_completed(futs):
+                puuid, priority, depth, routing = futs[fut]
+                try:
+                    ids = fut.result()
+                except Exception as e:
+                    print(f"[warn] ids failed for {puuid[:12]}…: {e}")
+                    stats["failed"] += 1
+                    state.requeue(puuid, priority, depth, routing)
+                    continue
+                complete = True
+                for mid in ids:
+                    if mid in todo:
+                        continue
+                    # the budget caps payloads actually downloaded; a player cut short stays in the frontier
+                    if mid not in store and stats["fetched"] + fetch_new >= budget:
+                        complete = False
+                        break
+                    if not state.claim_match(mid):        # seen-set lookup on disk
+                        continue
+                    fetch_new += mid not in store
+                    todo[mid] = depth
+                if complete:
+                    state.mark_expanded(puuid)
+                    stats["expanded"] += 1
+                else:
+                    state.requeue(puuid, priority, depth, routing)
+
+            # 2) payloads (new ones fetched, cached ones read) -> teammates/opponents one level deeper
+            futs = {pool.submit(_participants, store, mid): (mid, mid in store) for mid in todo}
+            for fut in as_completed(futs):
+                mid, cached = futs[fut]
+                try:
+                    puuids = fut.result()
+                except Exception as e:
+                    print(f"[warn] match {mid} failed: {e}")
+                    stats["failed"] += 1
+                    state.unclaim_match(mid)      # the next player listing it retries
+                    continue
+                stats["cached_reads" if cached else "fetched"] += 1
+                if not cached:
+                    state.mark_fetched(mid)
+                depth = todo[mid] + 1
+                if depth > max_depth:
+                    continue
+                routing = routing_for_match(mid, etl.ROUTING)
+                for puuid in puuids:
+                    state.push(puuid, depth, routing, 0.5 ** depth)
+            state.commit()
+            print(f"[crawl] expanded {stats['expanded']}, fetched {stats['fetched']}/{budget}, "
+                  f"frontier {state.status()['frontier']}")
+    return stats
+
+
+def publish(state: CrawlState, store: RawMatchStore, chunk: int = PUBLISH_CHUNK) -> list[dict]:
+    """
+    Append the fetched matches to the snapshot log, `chunk` IDs at a time. A
+    chunk is marked published after its version is committed; one interrupted
+    in between is re-offered and skipped as already logged.
+    """
+    from src import etl_http_riot as etl
+    versions = []
+    while ids := state.unpublished(chunk):
+        versions += etl.publish_snapshot(store, ids, chunk)
+        state.mark_published(ids)
+    return versions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Crawl teammates/opponents of the roster, bounded by depth and budget.")
+    ap.add_argument("--depth", type=int, default=MAX_DEPTH, help="max hops from the roster")
+    ap.add_argument("--budget", type=int, default=int(os.getenv("CRAWL_BUDGET", "1000")),
+                    help="new match payloads to download this run")
+    ap.add_argument("--per-player", type=int, default=MATCHES_PER_PLAYER)
+    ap.add_argument("--status", action="store_true", help="print the frontier/seen-set sizes and exit")
+    args = ap.parse_args()
+
+    state = CrawlState()
+    if args.status:
+        print(state.status())
+        return
+
+    from src import etl_http_riot as etl
+    store = RawMatchStore(index=False)
+    roster_path = etl.DATA_DIR / "roster.csv"
+    if not roster_path.exists():
+        raise FileNotFoundError(f"{roster_path} not found: run the ETL first, the crawl starts from the roster")
+    roster = pd.read_csv(roster_path).dropna(subset=["puuid"])
+    if "routing" not in roster:
+        roster["routing"] = etl.ROUTING
+    # roster players are listed on their own lane; seeding again is a no-op once they are expanded
+    for routing, grp in roster.groupby("routing"):
+        state.seed(grp["puuid"], routing)
+
+    t0 = time.perf_counter()
+    with etl.telemetry.stage("crawl"):
+        stats = crawl(state, store, args.budget, args.depth, args.per_player)
+    print(f"[crawl] {stats} in {time.perf_counter() - t0:.1f}s | {state.status()}")
+
+    versions = publish(state, store)
+    for k, v in stats.items():
+        etl.telemetry.count(f"crawl_{k}", v)
+    etl.telemetry.write(REPORTS / "crawl_run.json", REPORTS / "crawl.prom", history_path=None,
+                        depth=args.depth, budget=args.budget, state=state.status(),
+                        snapshot_versions=[v["version"] for v in versions])
+    print(f"[telemetry] {etl.telemetry.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# src/cube.py
+# Pre-aggregated rollups of participants_group so dashboard tabs sum cells instead of scanning rows.
+#   cube:         player_label × champion × queue × date × in_group -> games, wins, kills, deaths, assists
+#   match rollup: queue × date -> matches, group_matches  (distinct matches are additive at this grain)
+
+import pandas as pd
+from src.group_store import LOCAL_TZ
+from src.tables import DATA
+
+CUBE_PATH = DATA / "group_cube.parquet"
+MATCH_ROLLUP_PATH = DATA / "group_match_rollup.parquet"
+
+KEYS = ["player_label", "champion", "queue", "date", "in_group"]
+MEASURES = ["games", "wins", "kills", "deaths", "assists"]
+
+# ---------- build ----------
+def _local_date(gc: pd.Series) -> pd.Series:
+    return pd.to_datetime(gc, utc=True).dt.tz_convert(LOCAL_TZ).dt.date
+
+
+def build_cube(group: pd.DataFrame) -> pd.DataFrame:
+    df = group.assign(date=_local_date(group["game_creation"]), games=1)
+    cube = (
+        df.groupby(KEYS, dropna=False, observed=True)
+          .agg(games=("games", "sum"), wins=("win", "sum"),
+               kills=("kills", "sum"), deaths=("deaths", "sum"), assists=("assists", "sum"))
+          .reset_index()
+    )
+    return cube
+
+
+def build_match_rollup(group: pd.DataFrame) -> pd.DataFrame:
+    per_match = (
+        group.assign(date=_local_date(group["game_creation"]))
+             .groupby("match_id", dropna=False, observed=True)
+             .agg(queue=("queue", "first"), date=("date", "first"), has_group=("in_group", "any"))
+    )
+    return (
+        per_match.groupby(["queue", "date"], dropna=False)
+                 .agg(matches=("has_group", "size"), group_matches=("has_group", "sum"))
+                 .reset_index()
+    )
+
+
+def write_cube(group: pd.DataFrame):
+    cube = build_cube(group)
+    cube.to_parquet(CUBE_PATH, index=False)
+    rollup = build_match_rollup(group)
+    rollup.to_parquet(MATCH_ROLLUP_PATH, index=False)
+    print("Saved:", CUBE_PATH, "cells:", len(cube), "|", MATCH_ROLLUP_PATH, "cells:", len(rollup))
+
+# ---------- query ----------
+def load_cube() -> tuple[pd.DataFrame, pd.DataFrame]:
+    return pd.read_parquet(CUBE_PATH), pd.read_parquet(MATCH_ROLLUP_PATH)
+
+
+def slice_cells(cells: pd.DataFrame, queues=None, start=None, end=None, group_only: bool = False) -> pd.DataFrame:
+    """Same filters as the app sidebar, applied to cube or rollup cells."""
+    mask = pd.Series(True, index=cells.index)
+    if queues:
+        mask &= cells["queue"].isin(list(queues))
+    if start is not None:
+        mask &= cells["date"] >= start
+    if end is not None:
+        mask &= cells["date"] <= end
+    if group_only and "in_group" in cells:
+        mask &= cells["in_group"]
+    return cells[mask]
+
+
+def overview(cells: pd.DataFrame, match_cells: pd.DataFrame, group_only: bool = False) -> dict:
+    games = int(cells["games"].sum())
+    return {
+        "matches": int(match_cells["group_matches" if group_only else "matches"].sum()),
+        "player_games": games,
+        "winrate": float(cells["wins"].sum() / games) if games else float("nan"),
+    }
+
+
+def pick_table(cells: pd.DataFrame, min_games: int = 1) -> pd.DataFrame:
+    """Champion win rate vs the player's baseline (the Pick Advisor table)."""
+    per_player = cells.groupby("player_label", observed=True)[["games", "wins"]].sum()
+    base = (per_player["wins"] / per_player["games"]).rename("base")
+    tbl = (
+        cells.dropna(subset=["champion"])
+             .groupby(["player_label", "champion"], observed=True)[["games", "wins"]].sum()
+             .reset_index()
+    )
+    tbl["winrate"] = tbl["wins"] / tbl["games"]
+    tbl = tbl.merge(base, on="player_label")
+    tbl["lift"] = tbl["winrate"] - tbl["base"]
+    return tbl[tbl["games"] >= int(min_games)].drop(columns="wins")
+
+
+def champion_overview(cells: pd.DataFrame) -> pd.DataFrame:
+    tbl = cells.groupby("champion", observed=True)[["games", "wins"]].sum()
+    tbl["winrate"] = tbl["wins"] / tbl["games"]
+    return (
+        tbl.drop(columns="wins")
+           .sort_values(["games", "winrate"], ascending=[False, False])
+           .reset_index()
+    )
@@ -1,19 +1,36 @@
 # src/etl_http_riot.py
-# Direct Riot REST ETL: Riot ID -> PUUID -> Match IDs -> Match details -> Parquet
+# Direct Riot REST ETL: Riot ID -> PUUID -> Match IDs -> Match details -> versioned Parquet (src/snapshot_log.py)
 
-import os, time, math
+import os, threading
+from itertools import islice
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
 import requests
 import pandas as pd
 import yaml
 from dotenv import load_dotenv
+from src.riot_client import (RiotClient, RateLimiter, DEFAULT_API_BASE, DEFAULT_APP_LIMITS, ACCOUNT_ROUTING,
+                              routing_for_match, routing_for_platform)
+from src.raw_store import RawMatchStore
+from src.snapshot_log import SnapshotLog
+from src.flatten import replay_store
+from src.telemetry import Telemetry
 
 load_dotenv()
 API_KEY = os.getenv("RIOT_API_KEY")
-ROUTING = os.getenv("MATCH_ROUTING", "americas").lower()   
+# routing for players listed without a platform; entries with one get their own regional lane
+ROUTING = os.getenv("MATCH_ROUTING", "americas").lower()
 MAX_MATCHES = int(os.getenv("MAX_MATCHES_PER_PLAYER", "100"))
 QUEUE = 400  # Draft Norms
+MAX_WORKERS = int(os.getenv("RIOT_MAX_WORKERS", "8"))   # per regional lane
+# set ETL_BACKFILL=1 to page past cached matches (e.g. after raising MAX_MATCHES_PER_PLAYER)
+BACKFILL = os.getenv("ETL_BACKFILL", "0") == "1"
+# production keys have larger budgets; the headers correct this after the first call anyway
+APP_RATE_LIMIT = os.getenv("RIOT_APP_RATE_LIMIT", DEFAULT_APP_LIMITS)
+API_BASE = os.getenv("RIOT_API_BASE", DEFAULT_API_BASE)
+RIOT_IDS_PATH = Path(os.getenv("RIOT_IDS_PATH", "riot_ids.yaml"))
+PUBLISH_CHUNK = 50_000   # cached matches checked against the snapshot log (and appended) at a time
 
 if not API_KEY:
     raise RuntimeError("Missing RIOT_API_KEY in .env")
@@ -22,163 +39,231 @@ DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 # ---------- HTTP helpers ----------
-def riot_get(url, params=None, max_retries=5):
-    """GET with Riot API key + 429 backoff."""
-    headers = {"X-Riot-Token": API_KEY}
-    for attempt in range(max_retries):
-        r = requests.get(url, headers=headers, params=params, timeout=20)
-        if r.status_code == 200:
-            return r.json()
-        if r.status_code == 429:
-            wait = int(r.headers.get("Retry-After", "2"))
-            time.sleep(wait)
-            continue
-        if 500 <= r.status_code < 600:
-            # transient
-            time.sleep(1.5 * (attempt + 1))
-            continue
-        # hard error
-        raise RuntimeError(f"GET {url} -> {r.status_code} {r.text}")
-    raise RuntimeError(f"GET {url} failed after {max_retries} retries")
+_clients: dict[str, RiotClient] = {}
+_clients_lock = threading.Lock()
+telemetry = Telemetry()   # written to reports/etl_run.json + reports/etl.prom at the end of main()
 
-def resolve_puuid(game_name: str, tag_line: str) -> str:
-    url = f"https://{ROUTING}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{requests.utils.quote(game_name)}/{requests.utils.quote(tag_line)}"
-    data = riot_get(url)
+def get_client(routing: str = ROUTING) -> RiotClient:
+    """One client per routing cluster: every worker of a region shares its connection pool and rate budget."""
+    with _clients_lock:
+        if routing not in _clients:
+            limiter = RateLimiter(app_limits=APP_RATE_LIMIT)
+            _clients[routing] = RiotClient(API_KEY, routing, limiter=limiter, pool_size=MAX_WORKERS,
+                                           base_url=API_BASE, telemetry=telemetry)
+        return _clients[routing]
+
+def resolve_puuid(game_name: str, tag_line: str, client: RiotClient | None = None) -> str:
+    client = client or get_client(ACCOUNT_ROUTING.get(ROUTING, ROUTING))
+    path = f"/riot/account/v1/accounts/by-riot-id/{requests.utils.quote(game_name)}/{requests.utils.quote(tag_line)}"
+    data = client.get(path, "account-by-riot-id")
     return data["puuid"]
 
-def get_match_ids(puuid: str, count: int, queue: int) -> list[str]:
+def get_match_ids(puuid: str, count: int, queue: int, client: RiotClient | None = None,
+                  until: str | None = None) -> list[str]:
+    """
+    Newest-first match IDs; with `until` (the player's watermark: newest ID
+    fully fetched for them last run), paging stops just before it.
+    """
+    client = client or get_client()
     # Pull in batches of up to 100 (API limit)
     ids = []
     start = 0
     while len(ids) < count:
         need = min(100, count - len(ids))
-        url = f"https://{ROUTING}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids"
+        path = f"/lol/match/v5/matches/by-puuid/{puuid}/ids"
         params = {"start": start, "count": need, "queue": queue}
-        batch = riot_get(url, params=params)
+        batch = client.get(path, "match-ids", params=params)
         if not batch:
             break
+        if until is not None and until in batch:
+            # IDs come newest first, so everything from here on was listed for this player before
+            ids.extend(batch[:batch.index(until)])
+            break
         ids.extend(batch)
         if len(batch) < need:
             break
         start += need
     return ids
 
-def get_match_detail(match_id: str) -> dict:
-    url = f"https://{ROUTING}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-    return riot_get(url)
-
-# ---------- flattening ----------
-def flatten_matches(match_jsons: list[dict]) -> tuple[pd.DataFrame, pd.DataFrame]:
-    m_rows, p_rows = [], []
-    for mj in match_jsons:
-        info = mj.get("info", {})
-        meta = mj.get("metadata", {})
-        match_id = meta.get("matchId")
-        if not match_id:
-            continue
-        m_rows.append({
-            "match_id": match_id,
-            "game_version": info.get("gameVersion"),
-            "game_creation": pd.to_datetime(info.get("gameStartTimestamp"), unit="ms", utc=True) if info.get("gameStartTimestamp") else None,
-            "game_duration_s": info.get("gameDuration"),
-            "queue": info.get("queueId"),
-            "map_id": info.get("mapId"),
-            "game_mode": info.get("gameMode"),
-            "game_type": info.get("gameType"),
-        })
-        for p in info.get("participants", []):
-            p_rows.append({
-                "match_id": match_id,
-                "puuid": p.get("puuid"),
-                "summoner_name": p.get("summonerName"),
-                "team_id": p.get("teamId"),
-                "champion": p.get("championName"),
-                "role": p.get("role"),
-                "lane": p.get("lane"),
-                "win": bool(p.get("win")),
-                "kills": p.get("kills"),
-                "deaths": p.get("deaths"),
-                "assists": p.get("assists"),
-                "total_minions_killed": p.get("totalMinionsKilled"),
-                "neutral_minions_killed": p.get("neutralMinionsKilled"),
-                "cs": (p.get("totalMinionsKilled") or 0) + (p.get("neutralMinionsKilled") or 0),
-                "gold": p.get("goldEarned"),
-                "vision_score": p.get("visionScore"),
-                "damage_dealt": p.get("totalDamageDealtToChampions"),
-                "time_ccing": p.get("timeCCingOthers"),
-            })
-    df_m = pd.DataFrame(m_rows).drop_duplicates("match_id")
-    df_p = pd.DataFrame(p_rows)
-    return df_m, df_p
+def get_match_detail(match_id: str, client: RiotClient | None = None) -> dict:
+    # the match lives on its own platform's cluster, whichever lane found it
+    client = client or get_client(routing_for_match(match_id, ROUTING))
+    return client.get(f"/lol/match/v5/matches/{match_id}", "match-detail")
+
+def fetch_into_store(store: RawMatchStore, match_id: str, client: RiotClient | None = None):
+    # the payload goes straight to disk and is dropped; nothing accumulates in the pool
+    store.put(match_id, get_match_detail(match_id, client))
+
+# ---------- lanes ----------
+class Claims:
+    """Match IDs already taken by some lane, so two regions never fetch the same payload."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = set()
+
+    def take(self, match_id: str) -> bool:
+        with self._lock:
+            if match_id in self._ids:
+                return False
+            self._ids.add(match_id)
+            return True
+
+def run_lane(routing: str, players: list[dict], store: RawMatchStore, claims: Claims) -> dict:
+    """Resolve -> match IDs -> details for one routing cluster on its own pool and rate budget."""
+    client = get_client(routing)
+    account_client = get_client(ACCOUNT_ROUTING.get(routing, routing))
+    resolved, ids_by_player, owner, fetched = {}, {}, {}, set()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=f"riot-{routing}") as pool:
+        # Resolve PUUIDs
+        futs = {}
+        with telemetry.stage(f"{routing}.resolve"):
+            for p in players:
+                name, tag = p["id"].split("#", 1)
+                print(f"[resolve] {name}#{tag} ({routing})")
+                futs[pool.submit(resolve_puuid, name.strip(), tag.strip(), account_client)] = p["id"]
+            for fut in as_completed(futs):
+                rid = futs[fut]
+                try:
+                    resolved[rid] = fut.result()
+                except Exception as e:
+                    print(f"[warn] failed to resolve {rid}: {e}")
+
+        # Fetch new match ids for every player of the lane at once. The stop point
+        # is the player's own watermark, not the shared cache: a premade game
+        # cached by another lane (or the crawl) must not cut this player's list short.
+        marks = {} if BACKFILL else store.watermarks()
+        futs = {}
+        with telemetry.stage(f"{routing}.match_ids"):
+            for p in players:
+                if p["id"] not in resolved:
+                    continue
+                print(f"[fetch-ids] {p['id']} last {MAX_MATCHES} (queue {QUEUE})")
+                puuid = resolved[p["id"]]
+                futs[pool.submit(get_match_ids, puuid, MAX_MATCHES, QUEUE, client, marks.get(puuid))] = p["id"]
+            for fut in as_completed(futs):
+                try:
+                    ids_by_player[futs[fut]] = fut.result()
+                except Exception as e:
+                    print(f"[warn] ids failed for {futs[fut]}: {e}")
+
+        # Dedupe in roster order against the cache and the other lanes, then pull only the delta
+        for p in players:
+            for mid in ids_by_player.get(p["id"], []):
+                if mid not in store and mid not in owner and claims.take(mid):
+                    owner[mid] = p["id"]
+        with telemetry.stage(f"{routing}.match_details"):
+            futs = {pool.submit(fetch_into_store, store, mid): mid for mid in owner}
+            for fut in as_completed(futs):
+                mid = futs[fut]
+                try:
+                    fut.result()
+                    fetched.add(mid)
+                except Exception as e:
+                    print(f"[warn] match {mid} failed: {e}")
+
+    # advance a player's watermark only once every listed match is cached; the
+    # other lanes' claims are fetched by now or retried next run from the old mark
+    store.set_watermarks({resolved[rid]: ids[0] for rid, ids in ids_by_player.items()
+                          if ids and all(mid in store for mid in ids)})
+    return {"resolved": resolved, "ids_by_player": ids_by_player, "owner": owner, "fetched": fetched}
+
+def publish_snapshot(store: RawMatchStore, match_ids=None, chunk: int = PUBLISH_CHUNK) -> list[dict]:
+    """
+    Append the cached matches (default: the whole cache) the snapshot log
+    doesn't have yet, one version per `chunk` IDs. Each chunk is checked
+    against the log with a filtered scan, so no run holds every logged ID.
+    """
+    log = SnapshotLog()
+    ids = iter(store.ids() if match_ids is None else match_ids)
+    versions = []
+    with telemetry.stage("flatten"):
+        while batch := list(islice(ids, chunk)):
+            logged = log.logged(batch)
+            delta = [mid for mid in batch if mid not in logged]
+            if not delta:
+                continue
+            version = log.append(lambda m_path, p_path: replay_store(store, m_path, p_path, match_ids=delta))
+            if version:
+                versions.append(version)
+                print(f"[saved] v{version['version']}: +{version['added']['matches']} matches "
+                      f"+{version['added']['participants']} participants -> {log.root} "
+                      f"({version['rows']['matches']} matches total)")
+    if not versions:
+        print(f"[saved] nothing new; {log.root} stays at v{log.current}")
+    return versions
 
 # ---------- main ----------
 def main():
-    ypath = Path("riot_ids.yaml")
+    ypath = RIOT_IDS_PATH
     if not ypath.exists():
-        raise FileNotFoundError("riot_ids.yaml not found.")
+        raise FileNotFoundError(f"{ypath} not found.")
     conf = yaml.safe_load(ypath.read_text())
     raw_players = conf.get("players", [])
-    # support both plain strings "Name#Tag" and dicts {"id": "...", "platform": "..."} (platform unused in HTTP path)
+    # support both plain strings "Name#Tag" (MATCH_ROUTING lane) and dicts {"id": "...", "platform": "EUW1"}
     players = []
     for entry in raw_players:
         if isinstance(entry, str):
-            players.append({"id": entry})
-        elif isinstance(entry, dict) and "id" in entry:
-            players.append(entry)
-        else:
+            entry = {"id": entry}
+        elif not (isinstance(entry, dict) and "id" in entry):
             continue
+        if "#" not in entry["id"]:
+            print(f"[skip] Not a Riot ID (expect 'name#tag'): {entry['id']}")
+            continue
+        players.append({**entry, "routing": routing_for_platform(entry.get("platform"), ROUTING)})
 
-    roster = []
-    all_match_ids = set()
-
-    # Resolve PUUIDs
+    lanes: dict[str, list[dict]] = {}
     for p in players:
-        rid = p["id"]
-        if "#" not in rid:
-            print(f"[skip] Not a Riot ID (expect 'name#tag'): {rid}")
-            continue
-        name, tag = rid.split("#", 1)
-        print(f"[resolve] {name}#{tag}")
-        try:
-            puuid = resolve_puuid(name.strip(), tag.strip())
-            roster.append({"riot_id": rid, "puuid": puuid})
-        except Exception as e:
-            print(f"[warn] failed to resolve {rid}: {e}")
-
-    # Fetch match ids and details
-    match_jsons = []
-    for r in roster:
-        print(f"[fetch-ids] {r['riot_id']} last {MAX_MATCHES} (queue {QUEUE})")
-        try:
-            ids = get_match_ids(r["puuid"], MAX_MATCHES, QUEUE)
-        except Exception as e:
-            print(f"[warn] ids failed for {r['riot_id']}: {e}")
-            continue
-        pulled = 0
-        for mid in ids:
-            if mid in all_match_ids:
-                continue
+        lanes.setdefault(p["routing"], []).append(p)
+    print("[lanes] " + ", ".join(f"{r}: {len(ps)} player(s)" for r, ps in lanes.items()))
+
+    # Regions are rate-limited independently, so lanes run side by side and the
+    # run takes as long as the slowest region rather than the sum of them.
+    store = RawMatchStore()
+    claims = Claims()
+    results = {}
+    with telemetry.stage("lanes"), ThreadPoolExecutor(max_workers=max(1, len(lanes))) as lane_pool:
+        futs = {lane_pool.submit(run_lane, r, ps, store, claims): r for r, ps in lanes.items()}
+        for fut in as_completed(futs):
+            routing = futs[fut]
             try:
-                mj = get_match_detail(mid)
-                match_jsons.append(mj)
-                all_match_ids.add(mid)
-                pulled += 1
+                results[routing] = fut.result()
             except Exception as e:
-                print(f"[warn] match {mid} failed: {e}")
-        print(f"[done-ids] {r['riot_id']} unique pulled: {pulled}")
+                print(f"[warn] lane {routing} failed: {e}")
+
+    resolved, ids_by_player, owner, fetched = {}, {}, {}, set()
+    for res in results.values():
+        resolved.update(res["resolved"])
+        ids_by_player.update(res["ids_by_player"])
+        owner.update(res["owner"])
+        fetched |= res["fetched"]
+    roster = [{"riot_id": p["id"], "puuid": resolved[p["id"]], "routing": p["routing"]}
+              for p in players if p["id"] in resolved]
 
-    print(f"[dedupe] unique matches collected: {len(match_jsons)}")
+    pulled = Counter(owner[mid] for mid in fetched)
+    for r in roster:
+        if r["riot_id"] in ids_by_player:
+            print(f"[done-ids] {r['riot_id']} new matches pulled: {pulled[r['riot_id']]}")
 
-    df_m, df_p = flatten_matches(match_jsons)
-    ts = datetime.now().strftime("%Y%m%d_%H%M")
+    cached = len(store)
+    print(f"[cache] new matches: {len(fetched)}  cached total: {cached}")
 
+    # Output is versioned: the run appends a delta of the cached matches not in
+    # the snapshot log yet (the whole cache on the first run) as new versions (one per 50k matches).
+    # Payloads are streamed from disk in chunks; no run holds every JSON at once.
     pd.DataFrame(roster).to_csv(DATA_DIR / "roster.csv", index=False)
-    df_m.to_parquet(DATA_DIR / f"matches_{ts}.parquet", index=False)
-    df_p.to_parquet(DATA_DIR / f"participants_{ts}.parquet", index=False)
-    df_m.to_parquet(DATA_DIR / "matches_latest.parquet", index=False)
-    df_p.to_parquet(DATA_DIR / "participants_latest.parquet", index=False)
+    versions = publish_snapshot(store)
 
-    print(f"[saved] matches={len(df_m)} participants={len(df_p)} -> data/*.parquet")
+    telemetry.count("players", len(roster))
+    telemetry.count("new_matches", len(fetched))
+    telemetry.count("failed_matches", len(owner) - len(fetched))
+    telemetry.count("cached_matches", cached)
+    telemetry.count("appended_matches", sum(v["added"]["matches"] for v in versions))
+    telemetry.write(lanes={r: len(ps) for r, ps in lanes.items()}, default_routing=ROUTING,
+                    api_base=API_BASE, workers_per_lane=MAX_WORKERS, max_matches=MAX_MATCHES)
+    print(f"[telemetry] {telemetry.summary()}")
+    print("[telemetry] -> reports/etl_run.json, reports/etl.prom")
 
 if __name__ == "__main__":
     main()
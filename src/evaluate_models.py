@@ -0,0 +1,153 @@
+# src/evaluate_models.py
+# k-fold CV + regularization grid for the win model over a cached sparse design matrix
+#   python -m src.evaluate_models                          # 5 folds, C in 0.01..10
+#   python -m src.evaluate_models --folds 10 --C 0.03,0.3,3 --workers 8
+#
+# The one-hot design matrix is built once per model table and kept in
+# data/cache/, keyed by a hash of the table's content and the encoding, so
+# re-running the search (or adding candidates) skips the encoding entirely.
+# Every (candidate, fold) fit is one task on a process pool; workers load the
+# matrix once each.
+
+import argparse, hashlib, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+from src.features import MODEL_TABLE
+from src.train_win_model import FEATURES, make_model, metrics
+
+CACHE_DIR = Path("data/cache")
+REPORT_PATH = Path("reports/model_search.json")
+ENCODING = repr(make_model().named_steps["prep"])   # part of the cache key: a changed encoder re-encodes
+DEFAULT_C = [0.01, 0.1, 1.0, 10.0]
+
+# ---------- design matrix ----------
+def table_key(path: Path = MODEL_TABLE) -> str:
+    h = hashlib.sha256(ENCODING.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def encode(df: pd.DataFrame):
+    """make_model()'s own preprocessing step, fitted once on the whole table."""
+    df = df[df["champion"].notna()]
+    pre = make_model().named_steps["prep"].set_params(sparse_threshold=1.0)
+    X = sp.csr_matrix(pre.fit_transform(df[FEATURES]), dtype=np.float64)
+    return X, df["win"].astype(np.int8).to_numpy(), list(pre.get_feature_names_out())
+
+
+def load_design(path: Path = MODEL_TABLE, cache_dir: Path = CACHE_DIR) -> tuple[Path, Path, bool]:
+    """(matrix path, labels path, cache hit) for the table at `path`, encoding it on a miss."""
+    key = table_key(path)
+    x_path, y_path = cache_dir / f"design_{key}.npz", cache_dir / f"design_{key}.labels.npy"
+    if x_path.exists() and y_path.exists():
+        return x_path, y_path, True
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    X, y, names = encode(pd.read_parquet(path, columns=FEATURES + ["win"]))
+    sp.save_npz(x_path, X)
+    np.save(y_path, y)
+    (cache_dir / f"design_{key}.json").write_text(json.dumps({"table": str(path), "encoding": ENCODING,
+                                                              "shape": list(X.shape), "features": names}))
+    return x_path, y_path, False
+
+# ---------- workers ----------
+_X = _y = None
+
+def _init_worker(x_path: str, y_path: str):
+    global _X, _y
+    _X, _y = sp.load_npz(x_path).tocsr(), np.load(y_path)
+
+
+def _fit_fold(params: dict, train_idx: np.ndarray, test_idx: np.ndarray) -> dict:
+    t0 = time.perf_counter()
+    # one BLAS thread per process; the pool already uses every core
+    with threadpool_limits(1):
+        clf = LogisticRegression(max_iter=600, **params)
+        clf.fit(_X[train_idx], _y[train_idx])
+        probs = clf.predict_proba(_X[test_idx])[:, 1]
+    out = metrics(_y[test_idx], probs)
+    out["fit_s"] = time.perf_counter() - t0
+    return out
+
+# ---------- search ----------
+def search(grid: list[dict], folds: int = 5, workers: int | None = None, path: Path = MODEL_TABLE,
+           seed: int = 42) -> dict:
+    t0 = time.perf_counter()
+    x_path, y_path, hit = load_design(path)
+    t_design = time.perf_counter() - t0
+    y = np.load(y_path)
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(np.zeros(len(y)), y))
+
+    results = {i: [] for i in range(len(grid))}
+    finished = {i: None for i in range(len(grid))}
+    workers = workers or os.cpu_count()
+    t_search = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(x_path), str(y_path))) as pool:
+        futs = {}
+        for i, params in enumerate(grid):
+            for tr, te in splits:
+                futs[pool.submit(_fit_fold, params, tr, te)] = i
+        for fut in as_completed(futs):
+            i = futs[fut]
+            results[i].append(fut.result())
+            finished[i] = time.perf_counter() - t_search
+    wall = time.perf_counter() - t_search
+
+    candidates = []
+    for i, params in enumerate(grid):
+        fr = pd.DataFrame(results[i])
+        row = {"params": params}
+        for m in ("auc", "acc@0.5", "brier"):
+            vals = fr[m].astype(float)
+            row[m] = {"mean": float(vals.mean()), "std": float(vals.std(ddof=1)) if len(vals) > 1 else 0.0,
+                      "folds": [round(v, 5) for v in vals]}
+        row["fit_s"] = {"total": round(float(fr["fit_s"].sum()), 3), "mean": round(float(fr["fit_s"].mean()), 3)}
+        row["done_at_s"] = round(finished[i], 3)
+        candidates.append(row)
+    best = max(candidates, key=lambda c: c["auc"]["mean"])
+    return {
+        "table": str(path),
+        "design": {"path": str(x_path), "cache_hit": hit, "seconds": round(t_design, 3),
+                   "rows": int(len(y))},
+        "folds": folds,
+        "workers": workers,
+        "wall_s": round(wall, 3),
+        "best": best["params"],
+        "candidates": candidates,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cross-validate the win model over a regularization grid.")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--C", default=",".join(str(c) for c in DEFAULT_C), help="comma-separated inverse regularization")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    args = ap.parse_args()
+
+    grid = [{"C": float(c)} for c in args.C.split(",") if c]
+    report = search(grid, folds=args.folds, workers=args.workers)
+    d = report["design"]
+    print(f"design {d['rows']:,} rows ({'cached' if d['cache_hit'] else 'encoded'} in {d['seconds']}s), "
+          f"{report['folds']} folds x {len(grid)} candidates on {report['workers']} workers: {report['wall_s']}s")
+    print(f"{'params':<16}{'auc':>16}{'acc@0.5':>16}{'brier':>16}{'fit s':>9}")
+    for c in report["candidates"]:
+        cell = lambda m: f"{c[m]['mean']:.4f}±{c[m]['std']:.4f}"
+        print(f"{json.dumps(c['params']):<16}{cell('auc'):>16}{cell('acc@0.5'):>16}{cell('brier'):>16}"
+              f"{c['fit_s']['total']:>9.2f}")
+    print("best:", report["best"])
+
+    REPORT_PATH.parent.mkdir(exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2))
+    print("Saved", REPORT_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,198 @@
 # src/features.py
 
+import os, shutil
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from src.group_store import LOCAL_TZ
+from src.tables import DATA, load_merged
 
-pp = pd.read_parquet("data/participants_latest.parquet")
-pm = pd.read_parquet("data/matches_latest.parquet")[["match_id","game_creation","game_version","queue"]]
+MODEL_TABLE = DATA / "model_table_simple.parquet"
 
-df = pp.merge(pm, on="match_id", how="left")
-df["game_creation"] = pd.to_datetime(df["game_creation"], utc=True)
-df["hour"] = df["game_creation"].dt.tz_convert("America/New_York").dt.hour
-# patch minor (safe parse)
-ver = df["game_version"].fillna("0.0")
-df["patch_minor"] = pd.to_numeric(ver.str.split(".").str[1], errors="coerce").fillna(0).astype(int)
-df["role_clean"] = df["role"].fillna(df["lane"]).fillna("UNKNOWN")
-df["win"] = df["win"].astype(int)
+# Per-player form, kept as append-only parquet parts (a later part's row for a
+# (match_id, puuid) supersedes earlier ones; compacted once there are many).
+FORM_DIR = DATA / "form_features"
+FORM_WINDOWS = (5, 20)          # rolling win rate / KDA over the player's previous N games
+FORM_MAX_PARTS = 16
+FORM_KEYS = ["match_id", "puuid"]
+_FORM_RAW = ["match_id", "puuid", "game_creation", "champion", "win", "kills", "deaths", "assists"]
+FORM_COLS = (["games_before", "champ_games_before", "days_since_last"]
+             + [f"form_{m}_{n}" for n in FORM_WINDOWS for m in ("winrate", "kda")])
 
-cols = ["match_id","summoner_name","win","champion","role_clean","patch_minor","hour","queue"]
-out = df[cols].dropna(subset=["champion"])
+# ---------- player form ----------
+def _form_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Form of every row from the same player's earlier rows in `df` only, so no
+    game sees itself or anything after it. Rolling sums over the previous N
+    games are differences of exclusive prefix sums: O(rows), no per-group loop.
+    """
+    df = df.sort_values(["puuid", "game_creation", "match_id"], kind="stable").reset_index(drop=True)
+    by = df["puuid"]
+    out = df[_FORM_RAW].copy()
+    n = df.groupby(by, sort=False).cumcount()
+    out["games_before"] = n
+    out["champ_games_before"] = df.groupby([by, df["champion"]], sort=False, dropna=False).cumcount()
+    prev = df.groupby(by, sort=False)["game_creation"].shift(1)
+    out["days_since_last"] = (df["game_creation"] - prev).dt.total_seconds() / 86400
 
-out.to_parquet("data/model_table_simple.parquet", index=False)
-print("Saved data/model_table_simple.parquet", out.shape)
+    before = {}
+    for c in ("win", "kills", "deaths", "assists"):
+        v = df[c].astype("int64")
+        before[c] = v.groupby(by, sort=False).cumsum() - v          # sum over all earlier games
+    for N in FORM_WINDOWS:
+        last = {c: e - e.groupby(by, sort=False).shift(N, fill_value=0) for c, e in before.items()}
+        cnt = np.minimum(n, N).replace(0, np.nan)
+        out[f"form_winrate_{N}"] = last["win"] / cnt
+        out[f"form_kda_{N}"] = ((last["kills"] + last["assists"]) / last["deaths"].clip(lower=1)).where(n > 0)
+    return out
+
+
+def _form_parts() -> list:
+    return sorted(FORM_DIR.glob("part-*.parquet"))
+
+
+def load_form(columns=None) -> pd.DataFrame:
+    """Current form table: every part, later parts winning on (match_id, puuid)."""
+    parts = _form_parts()
+    if not parts:
+        return pd.DataFrame(columns=_FORM_RAW + FORM_COLS)
+    frames = [pq.read_table(p, columns=columns and list(dict.fromkeys(FORM_KEYS + list(columns)))).to_pandas()
+              for p in parts]
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if len(frames) > 1:
+        df = df.drop_duplicates(FORM_KEYS, keep="last").reset_index(drop=True)
+    return df
+
+
+def _write_part(df: pd.DataFrame):
+    FORM_DIR.mkdir(parents=True, exist_ok=True)
+    parts = _form_parts()
+    seq = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+    tmp = FORM_DIR / f".part-{seq:05d}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, FORM_DIR / f"part-{seq:05d}.parquet")
+
+
+def compact_form():
+    """Fold all parts into one (same content, fewer files to read)."""
+    parts = _form_parts()
+    if len(parts) <= 1:
+        return
+    full = load_form()
+    _write_part(full)
+    for p in parts:
+        p.unlink()
+
+
+def update_form(merged: pd.DataFrame, rebuild: bool = False) -> tuple[pd.DataFrame, dict]:
+    """
+    Bring the form table up to date with `merged` and return it.
+
+    Only (match_id, puuid) rows not stored yet are computed. A player whose new
+    games are all later than their stored ones gets just those rows, with their
+    last max(FORM_WINDOWS) stored games as context; a player with an older game
+    arriving late (e.g. a backfill) has their whole history recomputed.
+    """
+    cur = merged[_FORM_RAW].dropna(subset=["puuid", "game_creation"])
+    cur = cur.assign(game_creation=pd.to_datetime(cur["game_creation"], utc=True))
+    if rebuild and FORM_DIR.exists():
+        shutil.rmtree(FORM_DIR)
+    old = load_form()
+    stats = {"new_rows": 0, "appended_players": 0, "recomputed_players": 0}
+    if old.empty:
+        table = _form_columns(cur)
+        _write_part(table)
+        stats.update(new_rows=len(table), recomputed_players=int(table["puuid"].nunique()))
+        return table, stats
+
+    seen = pd.MultiIndex.from_frame(old[FORM_KEYS])
+    new = cur[~pd.MultiIndex.from_frame(cur[FORM_KEYS]).isin(seen)]
+    if new.empty:
+        return old, stats
+
+    # late arrivals: a new game not after the player's latest stored one
+    latest = old.sort_values(["game_creation", "match_id"]).groupby("puuid").tail(1).set_index("puuid")
+    first_new = new.sort_values(["game_creation", "match_id"]).groupby("puuid").head(1).set_index("puuid")
+    both = first_new.index.intersection(latest.index)
+    fn, la = first_new.loc[both], latest.loc[both]
+    late = both[(fn["game_creation"] < la["game_creation"])
+                | ((fn["game_creation"] == la["game_creation"]) & (fn["match_id"] < la["match_id"]))]
+
+    parts = []
+    if len(late):
+        hist = pd.concat([old.loc[old["puuid"].isin(late), _FORM_RAW], new[new["puuid"].isin(late)]])
+        parts.append(_form_columns(hist))
+
+    app = new[~new["puuid"].isin(late)]
+    if len(app):
+        ctx = (old[old["puuid"].isin(app["puuid"].unique())]
+               .sort_values(["puuid", "game_creation", "match_id"])
+               .groupby("puuid").tail(max(FORM_WINDOWS)))
+        calc = _form_columns(pd.concat([ctx[_FORM_RAW], app], ignore_index=True))
+        calc = calc.merge(app[FORM_KEYS], on=FORM_KEYS)            # keep only the new rows
+        # counters continue from the full stored history, not just the context tail
+        n_old = old.groupby("puuid").size()
+        c_old = old.groupby(["puuid", "champion"], dropna=False).size()
+        calc = calc.sort_values(["puuid", "game_creation", "match_id"], kind="stable").reset_index(drop=True)
+        calc["games_before"] = (calc["puuid"].map(n_old).fillna(0).astype(int)
+                                + calc.groupby("puuid").cumcount())
+        pc = pd.MultiIndex.from_frame(calc[["puuid", "champion"]])
+        calc["champ_games_before"] = (pd.Series(c_old.reindex(pc).fillna(0).to_numpy(int), index=calc.index)
+                                      + calc.groupby(["puuid", "champion"], dropna=False).cumcount())
+        parts.append(calc)
+
+    delta = pd.concat(parts, ignore_index=True)
+    _write_part(delta)
+    stats.update(new_rows=len(new), appended_players=int(app["puuid"].nunique()), recomputed_players=len(late))
+    if len(_form_parts()) > FORM_MAX_PARTS:
+        compact_form()
+    table = pd.concat([old, delta], ignore_index=True).drop_duplicates(FORM_KEYS, keep="last")
+    return table.reset_index(drop=True), stats
+
+
+def build_model_table(merged: pd.DataFrame, form: pd.DataFrame | None = None) -> pd.DataFrame:
+    """participants⋈matches frame -> one row per player-game with model features (input is not modified)."""
+    df = merged.assign(game_creation=pd.to_datetime(merged["game_creation"], utc=True))
+    df["hour"] = df["game_creation"].dt.tz_convert(LOCAL_TZ).dt.hour
+    # patch minor (safe parse)
+    ver = df["game_version"].fillna("0.0")
+    df["patch_minor"] = pd.to_numeric(ver.str.split(".").str[1], errors="coerce").fillna(0).astype(int)
+    df["role_clean"] = df["role"].fillna(df["lane"]).fillna("UNKNOWN")
+    df["win"] = df["win"].astype(int)
+
+    cols = ["match_id","puuid","summoner_name","win","champion","role_clean","patch_minor","hour","queue","game_creation"]
+    out = df[cols].dropna(subset=["champion"])
+    if form is not None:
+        out = out.merge(form[FORM_KEYS + FORM_COLS], on=FORM_KEYS, how="left")
+    # oldest first: the incremental trainer streams the table in this order
+    return out.sort_values("game_creation", kind="stable")
+
+def timeline_features(keys: pd.DataFrame, minutes=(10, 15), metrics=("total_gold", "xp", "cs"), store=None) -> pd.DataFrame:
+    """
+    Per-minute snapshots (e.g. total_gold_at_10) for the (match_id, puuid)
+    pairs in `keys`, read from the timeline store; NaN where no timeline was
+    ingested. In-game values, so keep them out of the pre-game pick model.
+    """
+    from src.timeline_store import TimelineStore
+    store = store or TimelineStore()
+    out = keys[["match_id", "puuid"]].drop_duplicates()
+    mids = out["match_id"].unique()
+    snaps = None
+    for metric in metrics:
+        idx, vals = store.curves(metric, match_ids=mids, minutes=max(minutes) + 1)
+        if snaps is None:
+            snaps = idx[["match_id", "puuid"]].copy()
+        for m in minutes:
+            snaps[f"{metric}_at_{m}"] = vals[:, m] if len(vals) else np.nan
+    return out.merge(snaps, on=["match_id", "puuid"], how="left")
+
+def main():
+    merged = load_merged()
+    form, stats = update_form(merged)
+    print(f"Form features: {stats}")
+    out = build_model_table(merged, form)
+    out.to_parquet(MODEL_TABLE, index=False)
+    print(f"Saved {MODEL_TABLE}", out.shape)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# src/flatten.py
+# match-v5 JSON -> typed Arrow record batches, streamed straight into parquet
+
+import gzip, json, os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MATCH_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("game_version", pa.string()),
+    ("game_creation", pa.timestamp("ms", tz="UTC")),
+    ("game_duration_s", pa.int32()),
+    ("queue", pa.int32()),
+    ("map_id", pa.int32()),
+    ("game_mode", pa.string()),
+    ("game_type", pa.string()),
+])
+
+PARTICIPANT_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("puuid", pa.string()),
+    ("summoner_name", pa.string()),
+    ("team_id", pa.int32()),
+    ("champion", pa.string()),
+    ("role", pa.string()),
+    ("lane", pa.string()),
+    ("win", pa.bool_()),
+    ("kills", pa.int32()),
+    ("deaths", pa.int32()),
+    ("assists", pa.int32()),
+    ("total_minions_killed", pa.int32()),
+    ("neutral_minions_killed", pa.int32()),
+    ("cs", pa.int32()),
+    ("gold", pa.int32()),
+    ("vision_score", pa.int32()),
+    ("damage_dealt", pa.int32()),
+    ("time_ccing", pa.int32()),
+])
+
+# (output column, participant JSON key) for the straight copies
+_PARTICIPANT_FIELDS = [
+    ("puuid", "puuid"), ("summoner_name", "summonerName"), ("team_id", "teamId"),
+    ("champion", "championName"), ("role", "role"), ("lane", "lane"),
+    ("kills", "kills"), ("deaths", "deaths"), ("assists", "assists"),
+    ("total_minions_killed", "totalMinionsKilled"), ("neutral_minions_killed", "neutralMinionsKilled"),
+    ("gold", "goldEarned"), ("vision_score", "visionScore"),
+    ("damage_dealt", "totalDamageDealtToChampions"), ("time_ccing", "timeCCingOthers"),
+]
+
+# ---------- columnar accumulation ----------
+class ColumnBuffer:
+    """Column lists for a batch of matches; turned into record batches when full."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.m = {name: [] for name in MATCH_SCHEMA.names}
+        self.p = {name: [] for name in PARTICIPANT_SCHEMA.names}
+
+    def __len__(self) -> int:
+        return len(self.m["match_id"])
+
+    def add(self, mj: dict) -> bool:
+        """Append one match payload; False if it has no match ID."""
+        info = mj.get("info", {})
+        meta = mj.get("metadata", {})
+        match_id = meta.get("matchId")
+        if not match_id:
+            return False
+        m = self.m
+        m["match_id"].append(match_id)
+        m["game_version"].append(info.get("gameVersion"))
+        m["game_creation"].append(info.get("gameStartTimestamp") or None)
+        m["game_duration_s"].append(info.get("gameDuration"))
+        m["queue"].append(info.get("queueId"))
+        m["map_id"].append(info.get("mapId"))
+        m["game_mode"].append(info.get("gameMode"))
+        m["game_type"].append(info.get("gameType"))
+
+        p = self.p
+        for part in info.get("participants", []):
+            p["match_id"].append(match_id)
+            for col, key in _PARTICIPANT_FIELDS:
+                p[col].append(part.get(key))
+            p["win"].append(bool(part.get("win")))
+            p["cs"].append((part.get("totalMinionsKilled") or 0) + (part.get("neutralMinionsKilled") or 0))
+        return True
+
+    def flush(self) -> tuple[pa.RecordBatch, pa.RecordBatch]:
+        mb = pa.RecordBatch.from_pydict(self.m, schema=MATCH_SCHEMA)
+        pb = pa.RecordBatch.from_pydict(self.p, schema=PARTICIPANT_SCHEMA)
+        self._reset()
+        return mb, pb
+
+
+def flatten_batches(match_jsons) -> tuple[pa.RecordBatch, pa.RecordBatch]:
+    buf = ColumnBuffer()
+    for mj in match_jsons:
+        buf.add(mj)
+    return buf.flush()
+
+
+def flatten_matches(match_jsons: list[dict]):
+    """In-memory convenience wrapper: payloads -> (matches, participants) DataFrames."""
+    mb, pb = flatten_batches(match_jsons)
+    df_m = mb.to_pandas().drop_duplicates("match_id")
+    df_p = pb.to_pandas()
+    return df_m, df_p
+
+# ---------- streaming writer ----------
+class FlattenWriter:
+    """
+    Feed payloads one at a time; rows are written as record batches every
+    `batch_matches` matches, so memory is bounded by one batch, not the run.
+    Match IDs are not deduplicated here: callers pass each match once (the
+    RawMatchStore/manifest IDs already are unique).
+    """
+
+    def __init__(self, matches_path, participants_path, batch_matches: int = 500):
+        self.batch_matches = batch_matches
+        self._buf = ColumnBuffer()
+        self._mw = pq.ParquetWriter(matches_path, MATCH_SCHEMA)
+        self._pw = pq.ParquetWriter(participants_path, PARTICIPANT_SCHEMA)
+        self.n_matches = 0
+        self.n_participants = 0
+
+    def add(self, mj: dict):
+        mid = mj.get("metadata", {}).get("matchId")
+        if not mid:
+            return
+        self._buf.add(mj)
+        if len(self._buf) >= self.batch_matches:
+            self.write_batches(*self._buf.flush())
+
+    def write_batches(self, mb: pa.RecordBatch, pb: pa.RecordBatch):
+        if mb.num_rows:
+            self._mw.write_batch(mb)
+            self.n_matches += mb.num_rows
+        if pb.num_rows:
+            self._pw.write_batch(pb)
+            self.n_participants += pb.num_rows
+
+    def close(self):
+        if len(self._buf):
+            self.write_batches(*self._buf.flush())
+        self._mw.close()
+        self._pw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ---------- archive replay ----------
+def _flatten_files(paths: list[str]) -> tuple[pa.RecordBatch, pa.RecordBatch]:
+    # runs in a worker process: decompress + flatten one chunk of cached payloads
+    buf = ColumnBuffer()
+    for path in paths:
+        try:
+            buf.add(json.loads(gzip.decompress(Path(path).read_bytes())))
+        except FileNotFoundError:
+            continue
+    return buf.flush()
+
+
+def replay_store(store, matches_path, participants_path, match_ids=None,
+                 workers: int | None = None, chunk: int = 256) -> tuple[int, int]:
+    """
+    Rebuild matches/participants parquet from a RawMatchStore.
+
+    Chunks of cached files are decompressed and flattened in a process pool;
+    at most 2 x workers chunks are in flight, so memory stays bounded no matter
+    how large the archive is. workers=0 flattens inline.
+    """
+    # store.ids() is unique; an explicit list is deduplicated once here, order kept
+    ids = list(dict.fromkeys(match_ids)) if match_ids is not None else store.ids()
+    chunks = [[str(store.path(mid)) for mid in ids[i:i + chunk]] for i in range(0, len(ids), chunk)]
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(chunks)) if len(chunks) > 1 else 0
+
+    with FlattenWriter(matches_path, participants_path) as writer:
+        if workers <= 0:
+            for paths in chunks:
+                writer.write_batches(*_flatten_files(paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = []
+                for paths in chunks:
+                    pending.append(pool.submit(_flatten_files, paths))
+                    if len(pending) >= 2 * workers:
+                        writer.write_batches(*pending.pop(0).result())
+                for fut in pending:
+                    writer.write_batches(*fut.result())
+    return writer.n_matches, writer.n_participants
@@ -0,0 +1,223 @@
+# src/group_store.py
+# participants_group as a Hive-partitioned parquet dataset (queue=/month=) with pushdown reads
+
+import json, os, shutil
+from datetime import date, timedelta
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+GROUP_DIR = Path("data/participants_group")
+LOCAL_TZ = "America/New_York"   # local day/hour everywhere: app filters, cube, prefix index, model `hour`
+PARTITIONING = ds.partitioning(pa.schema([("queue", pa.int16()), ("month", pa.string())]), flavor="hive")
+SUMMARY_FILE = "_summary.json"  # leading underscore: ignored by dataset discovery
+SERVING_PATH = Path("data/participants_group.arrow")
+
+# ---------- schema ----------
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+# Compact on-disk/in-memory layout of participants_group: dictionary-encoded
+# low-cardinality strings, narrow counters, timestamps already in local time.
+GROUP_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("puuid", pa.string()),
+    ("riot_id", _DICT),
+    ("player_label", _DICT),
+    ("in_group", pa.bool_()),
+    ("summoner_name", _DICT),
+    ("champion", _DICT),
+    ("role", _DICT),
+    ("lane", _DICT),
+    ("win", pa.int8()),
+    ("kills", pa.int16()),
+    ("deaths", pa.int16()),
+    ("assists", pa.int16()),
+    ("cs", pa.int16()),
+    ("gold", pa.int32()),
+    ("vision_score", pa.int16()),
+    ("damage_dealt", pa.int32()),
+    ("time_ccing", pa.int16()),
+    ("game_creation", pa.timestamp("ms", tz=LOCAL_TZ)),
+    ("game_version", _DICT),
+    ("queue", pa.int16()),
+])
+
+
+# What the app works on: GROUP_SCHEMA plus the columns it used to derive on every load
+SERVING_SCHEMA = GROUP_SCHEMA.append(pa.field("hour", pa.int8())).append(pa.field("date", pa.date32()))
+
+
+def compact_group_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast a group frame to GROUP_SCHEMA's pandas equivalents (categoricals, narrow ints, local tz)."""
+    out = {}
+    for f in GROUP_SCHEMA:
+        col = df[f.name]
+        if pa.types.is_dictionary(f.type):
+            out[f.name] = col.astype("category")
+        elif pa.types.is_timestamp(f.type):
+            out[f.name] = pd.to_datetime(col, errors="coerce", utc=True).dt.tz_convert(LOCAL_TZ).astype(f"datetime64[ms, {LOCAL_TZ}]")
+        elif pa.types.is_boolean(f.type):
+            out[f.name] = col.fillna(False).astype(bool)
+        elif pa.types.is_integer(f.type):
+            out[f.name] = col.fillna(0).astype(f.type.to_pandas_dtype())
+        else:
+            out[f.name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+def group_table(df: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(compact_group_frame(df), schema=GROUP_SCHEMA, preserve_index=False)
+
+# ---------- write ----------
+def write_group_dataset(df: pd.DataFrame, root: Path = GROUP_DIR):
+    """
+    Rewrite the dataset from a full group frame.
+
+    Rows are sorted by in_group then game_creation inside each partition so
+    parquet row-group statistics can skip whole groups for the scope and
+    date filters, not just whole files.
+    """
+    root = Path(root)
+    df = compact_group_frame(df)
+    local = df["game_creation"]
+    month = local.dt.strftime("%Y-%m").fillna("unknown")
+    out = pa.Table.from_pandas(df, schema=GROUP_SCHEMA, preserve_index=False)
+    out = out.append_column("month", pa.array(month.to_numpy(), pa.string()))
+    out = out.sort_by([("queue", "ascending"), ("month", "ascending"),
+                       ("in_group", "ascending"), ("game_creation", "ascending")])
+
+    tmp, old = root.with_name(root.name + ".tmp"), root.with_name(root.name + ".old")
+    if old.exists():
+        # left by a write that crashed mid-swap: put it back if nothing replaced it
+        shutil.rmtree(old) if root.exists() else old.rename(root)
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    ds.write_dataset(
+        out, tmp, format="parquet",
+        partitioning=PARTITIONING, max_rows_per_group=64_000, min_rows_per_group=8_000,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    summary = {
+        "rows": int(out.num_rows),
+        "queues": sorted(int(q) for q in df["queue"].unique()),
+        "min_date": str(local.min().date()) if local.notna().any() else None,
+        "max_date": str(local.max().date()) if local.notna().any() else None,
+    }
+    (tmp / SUMMARY_FILE).write_text(json.dumps(summary, indent=2))
+    # move the old dataset aside before renaming the new one in, so a crash
+    # at any point leaves a complete dataset at `root` or `old`
+    if root.exists():
+        root.rename(old)
+    tmp.rename(root)
+    if old.exists():
+        shutil.rmtree(old)
+    return summary
+
+# ---------- serving file ----------
+def write_serving_file(df: pd.DataFrame, path: Path = SERVING_PATH, chunk_rows: int = 64_000) -> int:
+    """
+    Uncompressed Arrow IPC file of the whole group view, typed and with
+    hour/date already derived, so opening it is a memory map rather than a
+    parse. Written aside and renamed: running apps keep their old mapping.
+    """
+    path = Path(path)
+    df = compact_group_frame(df)
+    local = df["game_creation"]
+    df = df.assign(hour=local.dt.hour.astype("int8"), date=local.dt.date)
+    table = pa.Table.from_pandas(df, schema=SERVING_SCHEMA, preserve_index=False)
+    # one dictionary per column for the whole file (the IPC file format can't replace them mid-stream)
+    table = table.sort_by([("in_group", "ascending"), ("game_creation", "ascending")]).combine_chunks()
+    tmp = path.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, SERVING_SCHEMA) as writer:
+        writer.write_table(table, max_chunksize=chunk_rows)
+    os.replace(tmp, path)
+    return table.num_rows
+
+
+def open_serving(path: Path = SERVING_PATH) -> pa.Table:
+    """The serving file as a zero-copy table over a read-only memory map (pages shared between processes)."""
+    return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def serving_filtered(table: pa.Table, queues=None, start: date | None = None, end: date | None = None,
+                     in_group_only: bool = False) -> pd.DataFrame:
+    """Same filters as load_group_filtered(), evaluated on the mapped columns; only matching rows are copied."""
+    mask = None
+
+    def _and(m):
+        return m if mask is None else pc.and_(mask, m)
+
+    if queues:
+        mask = _and(pc.is_in(table["queue"], value_set=pa.array([int(q) for q in queues], pa.int16())))
+    if start is not None:
+        mask = _and(pc.greater_equal(table["date"], pa.scalar(start, pa.date32())))
+    if end is not None:
+        mask = _and(pc.less_equal(table["date"], pa.scalar(end, pa.date32())))
+    if in_group_only:
+        mask = _and(table["in_group"])
+    return (table if mask is None else table.filter(mask)).to_pandas()
+
+# ---------- read ----------
+def group_dataset(root: Path = GROUP_DIR) -> ds.Dataset:
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def read_group_summary(root: Path = GROUP_DIR) -> dict:
+    """Queues and date bounds for the sidebar, without scanning any rows."""
+    path = Path(root) / SUMMARY_FILE
+    if path.exists():
+        return json.loads(path.read_text())
+    gc = group_dataset(root).to_table(columns=["game_creation", "queue"]).to_pandas()
+    local = gc["game_creation"].dt.tz_convert(LOCAL_TZ)
+    return {
+        "rows": int(len(gc)),
+        "queues": sorted(int(q) for q in gc["queue"].unique()),
+        "min_date": str(local.min().date()) if len(gc) else None,
+        "max_date": str(local.max().date()) if len(gc) else None,
+    }
+
+
+def _local_midnight(d: date) -> pa.Scalar:
+    # Arrow only compares timestamps of identical type, so build the bound in the column's type
+    ts = pd.Timestamp(d).tz_localize(LOCAL_TZ)
+    return pa.scalar(ts.to_pydatetime(), type=GROUP_SCHEMA.field("game_creation").type)
+
+
+def group_filter(queues=None, start: date | None = None, end: date | None = None,
+                 in_group_only: bool = False):
+    """
+    Dataset expression for the dashboard filters. queue/month hit partition
+    directories; game_creation/in_group are checked against row-group stats.
+    """
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if queues:
+        expr = _and(ds.field("queue").isin([int(q) for q in queues]))
+    if start is not None and end is not None:
+        months = pd.period_range(start, end, freq="M").strftime("%Y-%m").tolist()
+        expr = _and(ds.field("month").isin(months))
+    if start is not None:
+        expr = _and(ds.field("game_creation") >= _local_midnight(start))
+    if end is not None:
+        expr = _and(ds.field("game_creation") < _local_midnight(end + timedelta(days=1)))
+    if in_group_only:
+        expr = _and(ds.field("in_group") == True)  # noqa: E712 (dataset expression, not a Python bool)
+    return expr
+
+
+def load_group_filtered(queues=None, start: date | None = None, end: date | None = None,
+                        in_group_only: bool = False, columns=None, root: Path = GROUP_DIR) -> pd.DataFrame:
+    """Read only the partitions/row groups that can match the filters."""
+    table = group_dataset(root).to_table(
+        filter=group_filter(queues, start, end, in_group_only), columns=columns
+    )
+    return table.to_pandas()
+
+
+def group_head(n: int = 20, columns=None, root: Path = GROUP_DIR) -> pd.DataFrame:
+    return group_dataset(root).head(n, columns=columns).to_pandas()
@@ -0,0 +1,236 @@
+# src/pick_scoring.py
+# Pick suggestions from artifacts/win_model.joblib: every champion × role scored in one batch, then served from a lookup
+#
+#   python -m src.pick_scoring --role SUPPORT --top 10         # print suggestions for the current patch/hour
+#   python -m src.pick_scoring --serve --port 8766             # GET /picks?role=SUPPORT&top=10&exclude=Lulu,Zed
+#
+# The model only sees champion, role, patch and hour, so for one patch the
+# whole answer space is champions × roles × 24 hours. That grid is one
+# predict_proba call (a few ms); every request afterwards is an array lookup
+# and a sort. The grid is rebuilt when the model artifact is replaced
+# (mtime/size change) or a newer patch shows up in the model table.
+
+import argparse, json, os, threading, time
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from src.features import MODEL_TABLE
+from src.group_store import LOCAL_TZ
+from src.train_win_model import FEATURES, MODEL_PATH
+
+HOURS = np.arange(24)
+PORT = 8766
+
+
+def current_patch(path: Path = MODEL_TABLE) -> int:
+    """patch_minor of the newest game; the model table is sorted oldest first, so only its last row group is read."""
+    f = pq.ParquetFile(path)
+    col = f.read_row_group(f.num_row_groups - 1, columns=["patch_minor"]).column(0)
+    return int(col[len(col) - 1].as_py())
+
+
+def current_hour() -> int:
+    return pd.Timestamp.now(tz=LOCAL_TZ).hour
+
+
+@dataclass(frozen=True)
+class Scores:
+    """One scoring pass: grid[hour, champion, role] = P(win), with the labels it was built with."""
+    champions: np.ndarray
+    roles: np.ndarray
+    grid: np.ndarray
+    patch: int | None = None
+    built_at: float | None = None
+
+
+class PickScorer:
+    """
+    Loads the model once and keeps the Scores of one patch. Thread-safe: a
+    refresh publishes a new Scores in one assignment and every reader takes
+    that reference once, so a lookup never mixes a new grid with old labels.
+    table()/suggest() check the artifact's (mtime, size) on each call, which
+    is a single stat().
+    """
+
+    def __init__(self, model_path: Path = MODEL_PATH, table_path: Path = MODEL_TABLE):
+        self.model_path = Path(model_path)
+        self.table_path = Path(table_path)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._model = None
+        self.scores = Scores(np.array([], dtype=object), np.array([], dtype=object), np.empty((24, 0, 0)))
+
+    # the current snapshot's fields, for callers that only read one of them
+    champions = property(lambda self: self.scores.champions)
+    roles = property(lambda self: self.scores.roles)
+    patch = property(lambda self: self.scores.patch)
+
+    def signature(self) -> tuple[int, int, int | None] | None:
+        if not self.model_path.exists():
+            return None
+        st = self.model_path.stat()
+        tbl = self.table_path.stat().st_mtime_ns if self.table_path.exists() else None
+        return st.st_mtime_ns, st.st_size, tbl
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload + rescore if the artifact (or model table) changed. True if the grid was rebuilt."""
+        sig = self.signature()
+        if sig is None:
+            raise FileNotFoundError(f"{self.model_path} not found: run python -m src.train_win_model first")
+        if sig == self._signature and not force:
+            return False
+        with self._lock:
+            if sig == self._signature and not force:
+                return False
+            if self._model is None or sig[:2] != (self._signature or (None, None))[:2]:
+                self._model = joblib.load(self.model_path)
+            champions, roles = self._vocabulary()
+            patch = current_patch(self.table_path) if self.table_path.exists() else 0
+            self.scores = Scores(champions, roles, self._score(champions, roles, patch), patch, time.time())
+            self._signature = sig
+        return True
+
+    def _vocabulary(self) -> tuple[np.ndarray, np.ndarray]:
+        # what the one-hot encoder was fitted on; anything else would score as the intercept
+        try:
+            enc = self._model.named_steps["prep"].named_transformers_["cat"]
+            cats = dict(zip(enc.feature_names_in_, enc.categories_))
+            return np.asarray(cats["champion"], dtype=object), np.asarray(cats["role_clean"], dtype=object)
+        except (AttributeError, KeyError):
+            t = pd.read_parquet(self.table_path, columns=["champion", "role_clean"])
+            return (np.sort(t["champion"].dropna().unique()).astype(object),
+                    np.sort(t["role_clean"].dropna().unique()).astype(object))
+
+    def _score(self, champions: np.ndarray, roles: np.ndarray, patch: int) -> np.ndarray:
+        """One predict_proba over hour × champion × role (C order), reshaped into the lookup grid."""
+        n_c, n_r = len(champions), len(roles)
+        X = pd.DataFrame({
+            "champion": np.tile(np.repeat(champions, n_r), len(HOURS)),
+            "role_clean": np.tile(roles, len(HOURS) * n_c),
+            "patch_minor": np.full(len(HOURS) * n_c * n_r, patch),
+            "hour": np.repeat(HOURS, n_c * n_r),
+        })[FEATURES]
+        return self._model.predict_proba(X)[:, 1].reshape(len(HOURS), n_c, n_r)
+
+    # ---------- lookups ----------
+    def table(self, hour: int | None = None) -> pd.DataFrame:
+        """champion × role win probabilities at `hour` (default: now), long format."""
+        self.refresh()
+        sc = self.scores
+        h = current_hour() if hour is None else int(hour) % 24
+        return pd.DataFrame({
+            "champion": np.repeat(sc.champions, len(sc.roles)),
+            "role": np.tile(sc.roles, len(sc.champions)),
+            "win_prob": sc.grid[h].ravel(),
+        })
+
+    def suggest(self, role: str | None = None, top: int = 10, hour: int | None = None, exclude=()) -> list[dict]:
+        """Best champions for `role` (or best champion/role pairs) by predicted win probability."""
+        if int(top) < 0:
+            raise ValueError(f"top must be >= 0, got {top}")
+        self.refresh()
+        sc = self.scores
+        h = current_hour() if hour is None else int(hour) % 24
+        g = sc.grid[h]
+        if role is not None:
+            hit = np.flatnonzero(sc.roles == role)
+            if not len(hit):
+                raise ValueError(f"unknown role {role!r} (model knows {list(sc.roles)})")
+            probs, c_idx, r_idx = g[:, hit[0]], np.arange(len(sc.champions)), np.full(len(sc.champions), hit[0])
+        else:
+            probs = g.ravel()
+            c_idx, r_idx = np.divmod(np.arange(probs.size), len(sc.roles))
+        if exclude:
+            keep = ~np.isin(sc.champions[c_idx], list(exclude))
+            probs, c_idx, r_idx = probs[keep], c_idx[keep], r_idx[keep]
+        k = min(int(top), len(probs))
+        best = np.argpartition(-probs, k - 1)[:k] if k else np.array([], dtype=int)
+        best = best[np.argsort(-probs[best], kind="stable")]
+        return [{"champion": sc.champions[c_idx[i]], "role": sc.roles[r_idx[i]], "win_prob": round(float(probs[i]), 4)}
+                for i in best]
+
+    def info(self) -> dict:
+        sc = self.scores
+        return {"model": str(self.model_path), "patch_minor": sc.patch, "champions": len(sc.champions),
+                "roles": list(sc.roles),
+                "built_at": datetime.fromtimestamp(sc.built_at).isoformat(timespec="seconds") if sc.built_at else None}
+
+# ---------- HTTP ----------
+def make_handler(scorer: PickScorer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body):
+            blob = json.dumps(body, separators=(",", ":")).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            self.send_header("Content-Length", str(len(blob)))
+            self.end_headers()
+            self.wfile.write(blob)
+
+        def do_GET(self):
+            t0 = time.perf_counter()
+            url = urlparse(self.path)
+            q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == "/health":
+                return self._send(200, scorer.info())
+            if url.path != "/picks":
+                return self._send(404, {"error": "not found; use /picks or /health"})
+            try:
+                hour = int(q["hour"]) if "hour" in q else current_hour()
+                exclude = [c for c in q.get("exclude", "").split(",") if c]
+                picks = scorer.suggest(q.get("role"), int(q.get("top", 10)), hour, exclude)
+            except ValueError as e:
+                return self._send(400, {"error": str(e)})
+            except FileNotFoundError as e:
+                return self._send(503, {"error": str(e)})
+            self._send(200, {"patch_minor": scorer.patch, "hour": hour, "role": q.get("role"), "picks": picks,
+                             "ms": round((time.perf_counter() - t0) * 1000, 3)})
+
+    return Handler
+
+
+def serve(scorer: PickScorer, host: str = "127.0.0.1", port: int = PORT) -> ThreadingHTTPServer:
+    scorer.suggest(top=1)     # pay the model load, scoring and tz setup before the first request
+    server = ThreadingHTTPServer((host, port), make_handler(scorer))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ranked pick suggestions from the win model.")
+    ap.add_argument("--role", default=None)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--hour", type=int, default=None, help=f"hour in {LOCAL_TZ} (default: now)")
+    ap.add_argument("--serve", action="store_true", help="run the local HTTP endpoint")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.getenv("PICKS_PORT", PORT)))
+    args = ap.parse_args()
+
+    scorer = PickScorer()
+    t0 = time.perf_counter()
+    scorer.refresh()
+    print(f"[scorer] {scorer.info()} scored in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if args.serve:
+        server = serve(scorer, args.host, args.port)
+        print(f"[serve] http://{args.host}:{args.port}/picks?role=...&top=10&exclude=...  (Ctrl-C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+        return
+    for r in scorer.suggest(args.role, args.top, args.hour):
+        print(f"{r['champion']:<16}{r['role']:<10}{100 * r['win_prob']:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
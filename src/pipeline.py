@@ -0,0 +1,192 @@
+# src/pipeline.py
+# Incremental runner for everything after the ETL:
+#   python -m src.pipeline                 # run stale stages
+#   python -m src.pipeline features --force
+#   python -m src.pipeline --list
+
+import argparse, hashlib, importlib, inspect, json, time
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+from src import tables, build_group_view, cube, features, prefix_index, train_win_model
+
+STATE_PATH = tables.DATA / ".pipeline_state.json"
+
+
+class Context:
+    """State shared by the stages of one run; the merged frame is read and joined once."""
+
+    @cached_property
+    def merged(self):
+        return tables.load_merged()
+
+    @cached_property
+    def roster(self):
+        return tables.load_roster()
+
+    @cached_property
+    def form(self):
+        return features.load_form()
+
+    @cached_property
+    def model_table(self):
+        return pd.read_parquet(features.MODEL_TABLE)
+
+# ---------- stages ----------
+def _group_view(ctx: Context):
+    build_group_view.write_group_view(build_group_view.build_group_view(ctx.merged, ctx.roster))
+
+def _form(ctx: Context):
+    # appends rows for new games only; see features.update_form
+    ctx.form, stats = features.update_form(ctx.merged)
+    print(f"Form features: {stats}")
+
+def _features(ctx: Context):
+    out = features.build_model_table(ctx.merged, ctx.form)
+    out.to_parquet(features.MODEL_TABLE, index=False)
+    print(f"Saved {features.MODEL_TABLE}", out.shape)
+    ctx.model_table = out  # hand the frame to `train` without a re-read
+
+def _train(ctx: Context):
+    clf, metrics = train_win_model.train(ctx.model_table)
+    print(metrics)
+    train_win_model.save(clf, metrics)
+
+
+def _train_online(ctx: Context):
+    # streams the table and learns only rows the saved model hasn't seen (late older games included)
+    model, n_new = train_win_model.train_incremental()
+    print(f"{n_new} new rows", model.metrics())
+    train_win_model.save_online(model)
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[Context], None]
+    inputs: list[Path]
+    outputs: list[Path]
+    code: list[str] = field(default_factory=list)   # modules whose source is part of the fingerprint
+
+
+def stages() -> list[Stage]:
+    return [
+        Stage("group_view", _group_view,
+              inputs=[tables.SNAPSHOT_MANIFEST, tables.ROSTER],
+              outputs=[build_group_view.GROUP_LATEST, build_group_view.GROUP_DIR, build_group_view.SERVING_PATH,
+                       cube.CUBE_PATH, cube.MATCH_ROLLUP_PATH, prefix_index.PREFIX_INDEX_PATH],
+              code=["src.tables", "src.build_group_view", "src.group_store", "src.cube", "src.prefix_index"]),
+        Stage("form", _form,
+              inputs=[tables.SNAPSHOT_MANIFEST],
+              outputs=[features.FORM_DIR],
+              code=["src.tables", "src.features"]),
+        Stage("features", _features,
+              inputs=[tables.SNAPSHOT_MANIFEST, features.FORM_DIR],
+              outputs=[features.MODEL_TABLE],
+              code=["src.tables", "src.features"]),
+        Stage("train", _train,
+              inputs=[features.MODEL_TABLE],
+              outputs=[train_win_model.MODEL_PATH, train_win_model.METRICS_PATH],
+              code=["src.train_win_model"]),
+        Stage("train_online", _train_online,
+              inputs=[features.MODEL_TABLE],
+              outputs=[train_win_model.ONLINE_MODEL_PATH, train_win_model.ONLINE_METRICS_PATH],
+              code=["src.train_win_model"]),
+    ]
+
+# ---------- fingerprints ----------
+def _files(path: Path) -> list[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file())
+    return [path] if path.exists() else []
+
+
+class Hasher:
+    """Content hashes, memoised on (size, mtime) so unchanged files aren't re-read."""
+
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def file(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path)
+        hit = self.cache.get(key)
+        if hit and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+            return hit["sha"]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.cache[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha": h.hexdigest()}
+        return h.hexdigest()
+
+    def stage(self, stage: Stage) -> str:
+        h = hashlib.sha256()
+        for path in stage.inputs:
+            files = _files(Path(path))
+            if not files:
+                h.update(f"{path}:missing".encode())
+            for p in files:
+                h.update(f"{p}:{self.file(p)}".encode())
+        for mod in stage.code:
+            h.update(inspect.getsource(importlib.import_module(mod)).encode())
+        return h.hexdigest()
+
+
+def _load_state() -> dict:
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text())
+    return {"stages": {}, "files": {}}
+
+# ---------- runner ----------
+def run(selected: list[str] | None = None, force: bool = False) -> list[dict]:
+    state = _load_state()
+    hasher = Hasher(state.setdefault("files", {}))
+    ctx = Context()
+    report = []
+    for stage in stages():
+        if selected and stage.name not in selected:
+            continue
+        fp = hasher.stage(stage)
+        prev = state["stages"].get(stage.name, {})
+        outputs_ok = all(Path(p).exists() for p in stage.outputs)
+        if not force and outputs_ok and prev.get("fingerprint") == fp:
+            print(f"[skip] {stage.name} (inputs and code unchanged)")
+            report.append({"stage": stage.name, "status": "skipped", "seconds": 0.0})
+            continue
+
+        print(f"[run] {stage.name}")
+        t0 = time.perf_counter()
+        stage.run(ctx)
+        secs = time.perf_counter() - t0
+        state["stages"][stage.name] = {"fingerprint": fp, "seconds": round(secs, 3), "finished_at": int(time.time())}
+        STATE_PATH.write_text(json.dumps(state, indent=2))
+        report.append({"stage": stage.name, "status": "ran", "seconds": round(secs, 3)})
+
+    print("\nstage         status     seconds")
+    for r in report:
+        print(f"{r['stage']:<13} {r['status']:<10} {r['seconds']:>7.2f}")
+    return report
+
+
+def main():
+    names = [s.name for s in stages()]
+    ap = argparse.ArgumentParser(description="Run the post-ETL build stages, skipping unchanged ones.")
+    ap.add_argument("stages", nargs="*", metavar="stage", help=f"subset of {names}")
+    ap.add_argument("--force", action="store_true", help="run even if the fingerprint is unchanged")
+    ap.add_argument("--list", action="store_true", help="list stages and exit")
+    args = ap.parse_args()
+    unknown = set(args.stages) - set(names)
+    if unknown:
+        ap.error(f"unknown stage(s): {sorted(unknown)}")
+    if args.list:
+        for s in stages():
+            print(f"{s.name}: {[str(p) for p in s.inputs]} -> {[str(p) for p in s.outputs]}")
+        return
+    run(args.stages or None, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# src/prefix_index.py
+# Per-player prefix sums over games in time order, so Player detail answers any
+# date range or rolling window with array lookups instead of masking and .rolling().
+#
+#   one segment per (player_label, queue) plus one per player over all queues (queue = -1)
+#   cum_*: running totals over the whole file; a range [i, j) sums to cum[j] - cum[i]
+#   day:   local calendar day, so a date range is two searchsorted calls inside a segment
+
+from datetime import date
+import numpy as np
+import pandas as pd
+from src.group_store import LOCAL_TZ
+from src.tables import DATA
+
+PREFIX_INDEX_PATH = DATA / "group_prefix.parquet"
+ALL_QUEUES = -1
+MEASURES = ["win", "kills", "deaths", "assists", "kda"]
+_EPOCH = date(1970, 1, 1)
+
+# ---------- build ----------
+def build_prefix_index(group: pd.DataFrame) -> pd.DataFrame:
+    df = group[["player_label", "match_id", "puuid", "queue", "game_creation",
+                "win", "kills", "deaths", "assists"]].dropna(subset=["player_label", "game_creation"])
+    df = df.assign(player_label=df["player_label"].astype(str),
+                   game_creation=pd.to_datetime(df["game_creation"], utc=True).dt.tz_convert(LOCAL_TZ))
+    df["queue"] = df["queue"].astype("int16")
+    both = pd.concat([df, df.assign(queue=np.int16(ALL_QUEUES))], ignore_index=True)
+    both = both.sort_values(["player_label", "queue", "game_creation", "match_id"], kind="stable")
+
+    local_day = both["game_creation"].dt.tz_localize(None).dt.normalize()
+    out = both[["player_label", "queue", "match_id", "puuid", "game_creation"]].reset_index(drop=True)
+    out["day"] = ((local_day - pd.Timestamp(_EPOCH)).dt.days).to_numpy("int32")
+    out["win"] = both["win"].to_numpy("int8")
+    kda = (both["kills"] + both["assists"]) / both["deaths"].clip(lower=1)
+    for c, v in (("win", both["win"]), ("kills", both["kills"]), ("deaths", both["deaths"]),
+                 ("assists", both["assists"])):
+        out[f"cum_{c}"] = np.cumsum(v.to_numpy("int64"))
+    out["cum_kda"] = np.cumsum(kda.to_numpy("float64"))
+    return out
+
+
+def write_prefix_index(group: pd.DataFrame):
+    idx = build_prefix_index(group)
+    idx.to_parquet(PREFIX_INDEX_PATH, index=False)
+    print("Saved:", PREFIX_INDEX_PATH, "rows:", len(idx))
+
+# ---------- query ----------
+class PlayerSeries:
+    """One player's games in time order for a queue selection, with prefix sums (length n + 1)."""
+
+    def __init__(self, t, day, match_id, puuid, win, cum: dict):
+        self.t, self.day, self.match_id, self.puuid, self.win, self.cum = t, day, match_id, puuid, win, cum
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def span(self, start: date | None = None, end: date | None = None) -> tuple[int, int]:
+        """[i, j) of the games played between start and end (inclusive local days)."""
+        i = 0 if start is None else int(np.searchsorted(self.day, (start - _EPOCH).days, side="left"))
+        j = len(self) if end is None else int(np.searchsorted(self.day, (end - _EPOCH).days, side="right"))
+        return i, max(i, j)
+
+    def totals(self, i: int, j: int) -> dict:
+        out = {"games": j - i}
+        out.update({m: self.cum[m][j] - self.cum[m][i] for m in MEASURES})
+        return out
+
+    def rolling(self, window: int, i: int, j: int, measure: str = "win") -> pd.Series:
+        """Mean of `measure` over the last `window` games (fewer at the start of the range) at each game in [i, j)."""
+        k = np.arange(i, j)
+        lo = np.maximum(i, k - window + 1)
+        c = self.cum[measure]
+        return pd.Series((c[k + 1] - c[lo]) / (k + 1 - lo), index=pd.Index(self.t[i:j], name="game_creation"))
+
+
+class PrefixIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.queues = sorted(int(q) for q in df["queue"].unique() if q != ALL_QUEUES)
+        self.t = df["game_creation"].dt.tz_localize(None).to_numpy()   # local wall time, for chart axes
+        self.day = df["day"].to_numpy()
+        self.match_id, self.puuid, self.win = (df[c].to_numpy() for c in ("match_id", "puuid", "win"))
+        # leading 0 so that rows [i, j) of the file sum to cum[j] - cum[i]
+        self.cum = {m: np.concatenate([[0], df[f"cum_{m}"].to_numpy()]) for m in MEASURES}
+        keys = df[["player_label", "queue"]]
+        starts = np.flatnonzero(keys.ne(keys.shift()).any(axis=1).to_numpy())
+        ends = np.append(starts[1:], len(df))
+        self.segments = {(keys.iat[s, 0], int(keys.iat[s, 1])): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    def _segment(self, s: int, e: int) -> PlayerSeries:
+        # slices are views; differences inside the segment are unaffected by the offset
+        return PlayerSeries(self.t[s:e], self.day[s:e], self.match_id[s:e], self.puuid[s:e], self.win[s:e],
+                            {m: c[s:e + 1] for m, c in self.cum.items()})
+
+    def player(self, player_label: str, queues=None) -> PlayerSeries | None:
+        queues = sorted({int(q) for q in queues}) if queues else self.queues
+        if set(self.queues) <= set(queues):
+            queues = [ALL_QUEUES]
+        segs = [self.segments[(player_label, q)] for q in queues if (player_label, q) in self.segments]
+        if not segs:
+            return None
+        if len(segs) == 1:
+            return self._segment(*segs[0])
+        # uncommon multi-queue subset: interleave the queue segments by time and re-accumulate
+        rows = np.concatenate([np.arange(s, e) for s, e in segs])
+        rows = rows[np.argsort(self.t[rows], kind="stable")]
+        cum = {m: np.concatenate([[0], np.cumsum(c[rows + 1] - c[rows])]) for m, c in self.cum.items()}
+        return PlayerSeries(self.t[rows], self.day[rows], self.match_id[rows], self.puuid[rows], self.win[rows], cum)
+
+
+def load_prefix_index() -> PrefixIndex:
+    return PrefixIndex(pd.read_parquet(PREFIX_INDEX_PATH))
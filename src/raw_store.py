@@ -0,0 +1,122 @@
+# src/raw_store.py
+# On-disk cache of raw match-v5 payloads: one gzip JSON per match + a manifest index
+
+import gzip, json, os, threading, time
+from pathlib import Path
+
+RAW_DIR = Path("data/raw")
+
+
+class RawMatchStore:
+    """
+    Finished matches never change, so each payload is fetched once and kept.
+
+    Layout:
+        data/raw/manifest.jsonl            one line per cached match (append-only)
+        data/raw/matches/<shard>/<id>.json.gz
+        data/raw/watermarks.json           newest match ID fully fetched per roster puuid
+    """
+
+    def __init__(self, root: Path = RAW_DIR, index: bool = True):
+        self.root = Path(root)
+        self.match_dir = self.root / "matches"
+        self.manifest_path = self.root / "manifest.jsonl"
+        self.watermarks_path = self.root / "watermarks.json"
+        self.match_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # index=False (the crawl) keeps nothing per match in memory: membership is
+        # a stat() of the payload file and the manifest is only streamed on demand
+        self._index = {e["match_id"]: e for e in self._iter_manifest()} if index else None
+        self._count = None    # index=False: manifest entries, counted on first len() and kept up by put()
+
+    def _iter_manifest(self):
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+
+    def __contains__(self, match_id: str) -> bool:
+        if self._index is None:
+            return self.path(match_id).exists()
+        return match_id in self._index
+
+    def __len__(self) -> int:
+        if self._index is not None:
+            return len(self._index)
+        with self._lock:
+            if self._count is None:
+                self._count = sum(1 for _ in self._iter_manifest())
+            return self._count
+
+    def ids(self) -> list[str]:
+        if self._index is None:
+            return list(dict.fromkeys(e["match_id"] for e in self._iter_manifest()))
+        return list(self._index)
+
+    def entry(self, match_id: str) -> dict | None:
+        if self._index is None:
+            return next((e for e in self._iter_manifest() if e["match_id"] == match_id), None)
+        return self._index.get(match_id)
+
+    def path(self, match_id: str) -> Path:
+        # shard on the trailing digits so directories stay small
+        return self.match_dir / match_id[-2:] / f"{match_id}.json.gz"
+
+    def put(self, match_id: str, payload: dict):
+        """Write one payload atomically, then record it in the manifest."""
+        path = self.path(match_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        blob = gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), compresslevel=6)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+
+        info = payload.get("info", {})
+        entry = {
+            "match_id": match_id,
+            "queue": info.get("queueId"),
+            "game_start": info.get("gameStartTimestamp"),
+            "bytes": len(blob),
+            "fetched_at": int(time.time()),
+        }
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            if self._index is not None:
+                self._index[match_id] = entry
+            elif self._count is not None:
+                self._count += 1
+
+    # ---------- per-player watermarks ----------
+    def watermarks(self) -> dict[str, str]:
+        if not self.watermarks_path.exists():
+            return {}
+        return json.loads(self.watermarks_path.read_text())
+
+    def set_watermarks(self, updates: dict[str, str]):
+        """Merge puuid -> newest-fetched match ID (lanes call this concurrently)."""
+        if not updates:
+            return
+        with self._lock:
+            marks = {**self.watermarks(), **updates}
+            tmp = self.watermarks_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(marks, indent=1))
+            os.replace(tmp, self.watermarks_path)
+
+    def get(self, match_id: str) -> dict:
+        return json.loads(gzip.decompress(self.path(match_id).read_bytes()))
+
+    def iter_payloads(self, match_ids=None):
+        """Yield cached payloads one at a time (all of them by default)."""
+        for mid in (match_ids if match_ids is not None else self.ids()):
+            try:
+                yield self.get(mid)
+            except FileNotFoundError:
+                print(f"[warn] manifest lists {mid} but its payload is missing")
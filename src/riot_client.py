@@ -0,0 +1,244 @@
+# src/riot_client.py
+# Pooled Riot REST client + rate-limit scheduler shared by concurrent ETL workers
+
+import threading, time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+# Development-key defaults. Both get replaced by the X-App-Rate-Limit /
+# X-Method-Rate-Limit headers as soon as the first response comes back.
+DEFAULT_APP_LIMITS = "20:1,100:120"
+DEFAULT_METHOD_LIMITS = {
+    "account-by-riot-id": "1000:60",
+    "match-ids": "2000:10",
+    "match-detail": "2000:10",
+    "match-timeline": "2000:10",
+}
+# Riot rate-limits each regional routing cluster separately, so every cluster
+# gets its own client/limiter ("lane"). Platform = where the account plays.
+PLATFORM_ROUTING = {
+    "na1": "americas", "br1": "americas", "la1": "americas", "la2": "americas",
+    "euw1": "europe", "eun1": "europe", "tr1": "europe", "ru": "europe", "me1": "europe",
+    "kr": "asia", "jp1": "asia",
+    "oc1": "sea", "ph2": "sea", "sg2": "sea", "th2": "sea", "tw2": "sea", "vn2": "sea",
+}
+ROUTINGS = ("americas", "europe", "asia", "sea")
+# account-v1 is only served by americas/europe/asia; any of them works for any account
+ACCOUNT_ROUTING = {"sea": "asia"}
+# `{routing}` is filled per client; point RIOT_API_BASE at a local stand-in
+# (e.g. http://127.0.0.1:8080/{routing}, see benchmarks/mock_riot.py) to test offline.
+DEFAULT_API_BASE = "https://{routing}.api.riotgames.com"
+# Extra slack added to every window so request/arrival jitter can't push
+# Riot's server-side count over the limit.
+WINDOW_PADDING_S = 0.1
+
+
+def parse_rate_limit(spec: str | None) -> list[tuple[int, float]]:
+    """'20:1,100:120' -> [(20, 1.0), (100, 120.0)]"""
+    out = []
+    for part in (spec or "").split(","):
+        if ":" not in part:
+            continue
+        count, seconds = part.split(":", 1)
+        try:
+            out.append((int(count), float(seconds)))
+        except ValueError:
+            continue
+    return out
+
+def routing_for_platform(platform: str | None, default: str = "americas") -> str:
+    """'EUW1' -> 'europe'; also accepts a routing name itself. Unknown/empty -> default."""
+    key = (platform or "").strip().lower()
+    if key in ROUTINGS:
+        return key
+    return PLATFORM_ROUTING.get(key, default)
+
+
+def routing_for_match(match_id: str, default: str = "americas") -> str:
+    """Match IDs carry their platform ('EUW1_6612345678'), which fixes where the detail lives."""
+    return routing_for_platform(match_id.split("_", 1)[0], default)
+
+# ---------- scheduler ----------
+class RateWindow:
+    """At most `limit` request starts inside any `seconds`-long interval."""
+
+    def __init__(self, limit: int, seconds: float):
+        self.limit = limit
+        self.seconds = seconds
+        self.stamps = deque()
+
+    def _expire(self, now: float):
+        horizon = now - self.seconds - WINDOW_PADDING_S
+        while self.stamps and self.stamps[0] <= horizon:
+            self.stamps.popleft()
+
+    def delay(self, now: float) -> float:
+        self._expire(now)
+        if len(self.stamps) < self.limit:
+            return 0.0
+        return self.stamps[-self.limit] + self.seconds + WINDOW_PADDING_S - now
+
+    def record(self, now: float, n: int = 1):
+        self.stamps.extend([now] * n)
+
+
+class RateLimiter:
+    """
+    Shared budget for one API key on one routing host.
+
+    Each request draws from the app scope and from its method scope; a worker
+    only proceeds once every window in both scopes has room, so the pipe stays
+    full right up to the limit instead of discovering it through 429s.
+    """
+
+    def __init__(self, app_limits: str = DEFAULT_APP_LIMITS, method_limits: dict | None = None):
+        self._cond = threading.Condition()
+        self._windows: dict[str, list[RateWindow]] = {}
+        self._blocked_until: dict[str, float] = {}
+        self.set_limits("app", app_limits)
+        for method, spec in (method_limits or DEFAULT_METHOD_LIMITS).items():
+            self.set_limits(method, spec)
+
+    def set_limits(self, scope: str, spec: str):
+        """Replace a scope's windows, carrying over the requests already in flight."""
+        parsed = parse_rate_limit(spec)
+        if not parsed:
+            return
+        with self._cond:
+            old = self._windows.get(scope, [])
+            if [(w.limit, w.seconds) for w in old] == parsed:
+                return
+            history = max((w.stamps for w in old), key=len, default=deque())
+            windows = []
+            for limit, seconds in parsed:
+                w = RateWindow(limit, seconds)
+                w.stamps.extend(history)
+                windows.append(w)
+            self._windows[scope] = windows
+            self._cond.notify_all()
+
+    def _delay(self, scope: str, now: float) -> float:
+        wait = self._blocked_until.get(scope, 0.0) - now
+        for w in self._windows.get(scope, []):
+            wait = max(wait, w.delay(now))
+        return wait
+
+    def acquire(self, method: str):
+        """Block until one request on `method` fits every app and method window."""
+        scopes = ("app", method)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = max(self._delay(s, now) for s in scopes)
+                if wait <= 0:
+                    for s in scopes:
+                        for w in self._windows.get(s, []):
+                            w.record(now)
+                    return
+                self._cond.wait(wait)
+
+    def update_from_headers(self, method: str, headers):
+        """Adopt the limits Riot reports and catch up with usage we didn't see locally."""
+        for scope, prefix in (("app", "X-App-Rate-Limit"), (method, "X-Method-Rate-Limit")):
+            spec = headers.get(prefix)
+            if spec:
+                self.set_limits(scope, spec)
+            counts = dict((s, c) for c, s in parse_rate_limit(headers.get(f"{prefix}-Count")))
+            if not counts:
+                continue
+            with self._cond:
+                now = time.monotonic()
+                for w in self._windows.get(scope, []):
+                    w._expire(now)
+                    missing = counts.get(w.seconds, 0) - len(w.stamps)
+                    if missing > 0:
+                        w.record(now, missing)
+
+    def penalize(self, scope: str, seconds: float):
+        """Hold every request on a scope back for `seconds` (used after a 429)."""
+        with self._cond:
+            until = time.monotonic() + seconds
+            self._blocked_until[scope] = max(self._blocked_until.get(scope, 0.0), until)
+            self._cond.notify_all()
+
+# ---------- client ----------
+class RiotClient:
+    """Keep-alive session + rate limiter for one routing host; safe to share across threads."""
+
+    def __init__(self, api_key: str, routing: str, limiter: RateLimiter | None = None,
+                 pool_size: int = 16, max_retries: int = 5, timeout: float = 20,
+                 base_url: str = DEFAULT_API_BASE, telemetry=None):
+        self.routing = routing
+        self.telemetry = telemetry   # src.telemetry.Telemetry, optional
+        self.base = base_url.format(routing=routing).rstrip("/")
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["X-Riot-Token"] = api_key
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base}{path}"
+
+    def get(self, path: str, method: str, params=None):
+        """GET with Riot API key; scheduled by the limiter, 429/5xx and network errors retried."""
+        return self._request(path, method, params).json()
+
+    def get_bytes(self, path: str, method: str, params=None) -> bytes:
+        """Like get(), but the raw body, for callers that parse large payloads incrementally."""
+        return self._request(path, method, params).content
+
+    def _request(self, path: str, method: str, params=None) -> requests.Response:
+        url = self.url(path)
+        tel = self.telemetry
+        key = f"{self.routing}/{method}"   # telemetry endpoint key, one series per regional lane
+        last = None
+        for attempt in range(self.max_retries):
+            t0 = time.perf_counter()
+            self.limiter.acquire(method)
+            t1 = time.perf_counter()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                # timeout / connection reset: transient, same backoff as a 5xx
+                last = e
+                wait = 1.5 * (attempt + 1)
+                if tel:
+                    tel.observe_wait(key, t1 - t0)
+                    tel.observe_backoff(key, "network", wait)
+                time.sleep(wait)
+                continue
+            if tel:
+                tel.observe_wait(key, t1 - t0)
+                tel.observe_request(key, r.status_code, time.perf_counter() - t1, len(r.content))
+            self.limiter.update_from_headers(method, r.headers)
+            if r.status_code == 200:
+                return r
+            if r.status_code == 429:
+                wait = float(r.headers.get("Retry-After", "2"))
+                kind = r.headers.get("X-Rate-Limit-Type", "method")
+                self.limiter.penalize("app" if kind == "application" else method, wait)
+                if tel:
+                    tel.observe_backoff(key, "rate_limit", wait)
+                continue
+            if 500 <= r.status_code < 600:
+                # transient
+                wait = 1.5 * (attempt + 1)
+                if tel:
+                    tel.observe_backoff(key, "server_error", wait)
+                time.sleep(wait)
+                continue
+            # hard error
+            if tel:
+                tel.observe_error(key)
+            raise RuntimeError(f"GET {url} -> {r.status_code} {r.text}")
+        if tel:
+            tel.observe_error(key)
+        raise RuntimeError(f"GET {url} failed after {self.max_retries} retries") from last
+
+    def close(self):
+        self.session.close()
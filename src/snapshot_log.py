@@ -0,0 +1,218 @@
+# src/snapshot_log.py
+# Versioned matches/participants tables: each ETL run appends a delta file and a manifest version
+#
+#   python -m src.snapshot_log                          # list versions
+#   python -m src.snapshot_log --compact                # merge the current files, then apply retention
+#   python -m src.snapshot_log --compact --keep-versions 5 --keep-days 30
+#
+# A version is the list of parquet files that make up each table at that
+# point; readers open exactly those files as one pyarrow dataset, so the
+# latest view and any retained earlier version are read in place, never copied.
+
+import argparse, json, os, time
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SNAPSHOT_DIR = Path("data/snapshots")
+TABLES = ("matches", "participants")
+KEEP_VERSIONS = 20           # retention applied by compact(); the current version is always kept
+TARGET_ROWS = 2_000_000      # rows per compacted file
+
+
+class SnapshotLog:
+    """
+    Layout:
+        data/snapshots/manifest.json                     every retained version (atomic rewrite)
+        data/snapshots/<table>/delta-<version>.parquet   rows a run added
+        data/snapshots/<table>/part-<version>-<n>.parquet  output of a compaction
+
+    Files are immutable and written before the manifest version that lists
+    them, so an interrupted run leaves at most unreferenced files, which the
+    next compaction removes.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        self._manifest = self._load()
+
+    def _load(self) -> dict:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {"versions": []}
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._manifest, indent=1))
+        os.replace(tmp, self.manifest_path)
+
+    def exists(self) -> bool:
+        return bool(self._manifest["versions"])
+
+    # ---------- versions ----------
+    def versions(self) -> list[dict]:
+        return list(self._manifest["versions"])
+
+    @property
+    def current(self) -> int | None:
+        v = self._manifest["versions"]
+        return v[-1]["version"] if v else None
+
+    def version(self, version: int | None = None, as_of: datetime | str | None = None) -> dict:
+        """A version by number, the last one created at or before `as_of`, or the current one."""
+        vs = self._manifest["versions"]
+        if not vs:
+            raise FileNotFoundError(f"no snapshot versions in {self.root}")
+        if version is not None:
+            for v in vs:
+                if v["version"] == version:
+                    return v
+            raise KeyError(f"version {version} not retained (have {vs[0]['version']}..{vs[-1]['version']})")
+        if as_of is not None:
+            ts = pd.Timestamp(as_of)
+            ts = ts.timestamp() if ts.tzinfo else time.mktime(ts.timetuple())   # naive = local, like "created"
+            older = [v for v in vs if int(v["created_ts"]) <= ts]
+            if not older:
+                raise KeyError(f"no retained version as of {as_of}")
+            return older[-1]
+        return vs[-1]
+
+    def _commit(self, op: str, files: dict, added: dict) -> dict:
+        prev = self._manifest["versions"][-1] if self._manifest["versions"] else None
+        now = int(time.time())
+        entry = {
+            "version": prev["version"] + 1 if prev else 1,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+            "created_ts": now,
+            "op": op,
+            "files": files,
+            "added": added,
+            "rows": {t: (prev["rows"][t] if prev else 0) + added.get(t, 0) for t in TABLES},
+        }
+        self._manifest["versions"].append(entry)
+        self._save()
+        return entry
+
+    # ---------- reading ----------
+    def files(self, table: str, version: int | None = None, as_of=None) -> list[Path]:
+        return [self.root / f for f in self.version(version, as_of)["files"][table]]
+
+    def dataset(self, table: str, version: int | None = None, as_of=None) -> ds.Dataset:
+        return ds.dataset([str(p) for p in self.files(table, version, as_of)], format="parquet")
+
+    def read(self, table: str, version: int | None = None, as_of=None, columns=None) -> pd.DataFrame:
+        return self.dataset(table, version, as_of).to_table(columns=columns).to_pandas()
+
+    def logged(self, match_ids, version: int | None = None) -> set:
+        """Which of `match_ids` the version already holds; filtered in the scan, never the whole ID column."""
+        match_ids = list(match_ids)
+        if not self.exists() or not match_ids:
+            return set()
+        hits = self.dataset("matches", version).to_table(columns=["match_id"],
+                                                         filter=ds.field("match_id").isin(match_ids))
+        return set(hits.column(0).to_pylist())
+
+    # ---------- writing ----------
+    def append(self, write_delta) -> dict | None:
+        """
+        write_delta(matches_path, participants_path) -> (n_matches, n_participants)
+        writes this run's new rows; they become a new version on top of the
+        current files. Nothing is committed for an empty delta.
+        """
+        version = (self.current or 0) + 1
+        paths = {t: self.root / t / f"delta-{version:06d}.parquet" for t in TABLES}
+        for p in paths.values():
+            p.parent.mkdir(parents=True, exist_ok=True)
+        n_m, n_p = write_delta(paths["matches"], paths["participants"])
+        if not n_m:
+            for p in paths.values():
+                p.unlink(missing_ok=True)
+            return None
+        prev = self._manifest["versions"][-1]["files"] if self.exists() else {t: [] for t in TABLES}
+        files = {t: prev[t] + [str(paths[t].relative_to(self.root))] for t in TABLES}
+        return self._commit("append", files, {"matches": n_m, "participants": n_p})
+
+    def compact(self, target_rows: int = TARGET_ROWS, keep_versions: int | None = KEEP_VERSIONS,
+                keep_days: float | None = None) -> dict:
+        """Rewrite the current version's files as few large ones (same rows), then expire old versions."""
+        cur = self.version()
+        out = {"compacted": None}
+        if any(len(cur["files"][t]) > 1 for t in TABLES):
+            version = cur["version"] + 1
+            files = {t: self._rewrite(t, cur, version, target_rows) for t in TABLES}
+            out["compacted"] = self._commit("compact", files, {})["version"]
+        out.update(self.expire(keep_versions, keep_days))
+        return out
+
+    def _rewrite(self, table: str, cur: dict, version: int, target_rows: int) -> list[str]:
+        if len(cur["files"][table]) <= 1:
+            return list(cur["files"][table])
+        src = self.dataset(table, cur["version"])
+        names, writer, rows, n = [], None, 0, 0
+        for batch in src.to_batches():
+            if writer is None or rows >= target_rows:
+                if writer is not None:
+                    writer.close()
+                name = f"{table}/part-{version:06d}-{n:03d}.parquet"
+                writer, rows, n = pq.ParquetWriter(self.root / name, src.schema), 0, n + 1
+                names.append(name)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is not None:
+            writer.close()
+        return names
+
+    def expire(self, keep_versions: int | None = KEEP_VERSIONS, keep_days: float | None = None) -> dict:
+        """
+        Drop versions outside the retention window (the current one always
+        stays) and delete files no retained version references.
+        """
+        vs = self._manifest["versions"]
+        keep = set(range(len(vs)))
+        if keep_versions is not None:
+            keep &= set(range(max(0, len(vs) - keep_versions), len(vs)))
+        if keep_days is not None:
+            cutoff = time.time() - keep_days * 86400
+            keep &= {i for i, v in enumerate(vs) if v["created_ts"] >= cutoff}
+        keep.add(len(vs) - 1)
+        dropped = [v["version"] for i, v in enumerate(vs) if i not in keep]
+        if dropped:
+            self._manifest["versions"] = [v for i, v in enumerate(vs) if i in keep]
+            self._save()
+
+        live = {f for v in self._manifest["versions"] for t in TABLES for f in v["files"][t]}
+        removed = 0
+        for t in TABLES:
+            for p in (self.root / t).glob("*.parquet"):
+                if str(p.relative_to(self.root)) not in live:
+                    p.unlink()
+                    removed += 1
+        return {"expired_versions": dropped, "removed_files": removed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or compact the versioned match tables.")
+    ap.add_argument("--compact", action="store_true", help="merge the current files and apply retention")
+    ap.add_argument("--keep-versions", type=int, default=KEEP_VERSIONS)
+    ap.add_argument("--keep-days", type=float, default=None)
+    ap.add_argument("--target-rows", type=int, default=TARGET_ROWS)
+    args = ap.parse_args()
+
+    log = SnapshotLog()
+    if not log.exists():
+        print(f"No versions in {log.root} yet; run the ETL first.")
+        return
+    if args.compact:
+        print(log.compact(args.target_rows, args.keep_versions, args.keep_days))
+    for v in log.versions():
+        n_files = {t: len(v["files"][t]) for t in TABLES}
+        print(f"v{v['version']:<5}{v['created']}  {v['op']:<8}"
+              f"+{v['added'].get('matches', 0):>7,} matches  {v['rows']['matches']:>9,} total  files={n_files}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# src/synergy.py
+# Duo / champion-pair synergy from a sparse team × item incidence matrix:
+# games and wins together for every pair at once, no per-pair filtering.
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# what one "item" on a team is, per analysis
+PAIR_KINDS = {
+    "players": ["player_label"],
+    "player_champions": ["player_label", "champion"],
+    "champions": ["champion"],
+}
+
+
+def _item_labels(sub: pd.DataFrame, cols: list[str]) -> pd.Series:
+    if len(cols) == 1:
+        return sub[cols[0]].astype("object")
+    parts = [sub[c].astype("object") for c in cols]
+    label = parts[0].astype(str).str.cat([p.astype(str) for p in parts[1:]], sep=" · ")
+    return label.where(pd.concat(parts, axis=1).notna().all(axis=1))
+
+
+def pair_table(sub: pd.DataFrame, kind: str = "players", min_games: int = 1) -> pd.DataFrame:
+    """
+    Every pair of items seen on the same team: games and wins together, and
+    the lift of their joint win rate over what their own win rates predict.
+
+    A team is (match_id, win); T[t, i] = 1 if item i played on team t. Then
+    TᵀT holds games together and Tᵀ diag(win) T wins together, with each
+    item's own games/wins on the diagonal. expected is the mean of the two
+    items' own win rates, so a duo of strong players needs to beat their
+    individual records, not the global 50%.
+    """
+    cols = PAIR_KINDS[kind]
+    cols_out = ["item_1", "item_2", "games", "wins", "winrate", "base_1", "base_2", "expected", "lift"]
+    items = _item_labels(sub, cols)
+    keep = items.notna().to_numpy()
+    if not keep.any():
+        return pd.DataFrame(columns=cols_out)
+
+    team_codes, teams = pd.factorize(pd.MultiIndex.from_arrays([sub["match_id"].to_numpy()[keep],
+                                                                sub["win"].to_numpy()[keep]]))
+    item_codes, names = pd.factorize(items[keep], sort=True)
+    T = sparse.csr_matrix((np.ones(len(item_codes)), (team_codes, item_codes)), shape=(len(teams), len(names)))
+    T.data[:] = 1.0                                          # duplicates on a team count once
+    team_win = np.asarray(teams.get_level_values(1), dtype=np.float64)
+
+    G = (T.T @ T).tocsr()
+    W = (T.T @ sparse.diags(team_win) @ T).tocsr()
+    own_games, own_wins = G.diagonal(), W.diagonal()
+
+    upper = sparse.triu(G, k=1).tocoo()
+    i, j, games = upper.row, upper.col, upper.data
+    ok = games >= int(min_games)
+    i, j, games = i[ok], j[ok], games[ok]
+    wins = np.asarray(W[i, j]).ravel()
+
+    base = own_wins / np.maximum(own_games, 1)
+    out = pd.DataFrame({
+        "item_1": np.asarray(names)[i],
+        "item_2": np.asarray(names)[j],
+        "games": games.astype(int),
+        "wins": wins.astype(int),
+        "winrate": wins / games,
+        "base_1": base[i],
+        "base_2": base[j],
+    })
+    out["expected"] = (out["base_1"] + out["base_2"]) / 2
+    out["lift"] = out["winrate"] - out["expected"]
+    return out.sort_values(["lift", "games"], ascending=[False, False]).reset_index(drop=True)[cols_out]
+
+
+def main():
+    from src.build_group_view import GROUP_LATEST
+    sub = pd.read_parquet(GROUP_LATEST, columns=["match_id", "win", "player_label", "champion"])
+    reports = Path("reports")
+    reports.mkdir(exist_ok=True)
+    for kind in PAIR_KINDS:
+        tbl = pair_table(sub, kind, min_games=5)
+        path = reports / f"synergy_{kind}.csv"
+        tbl.to_csv(path, index=False)
+        print(f"Saved {path} ({len(tbl):,} pairs with >= 5 games)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# src/tables.py
+# Paths of the ETL outputs + the participants⋈matches frame every downstream step starts from
+
+import pandas as pd
+from pathlib import Path
+from src.snapshot_log import SnapshotLog
+
+DATA = Path("data")
+PARTICIPANTS_LATEST = DATA / "participants_latest.parquet"
+MATCHES_LATEST = DATA / "matches_latest.parquet"
+ROSTER = DATA / "roster.csv"
+SNAPSHOT_MANIFEST = SnapshotLog().manifest_path   # versioned tables written by the ETL
+
+MATCH_COLS = ["match_id", "game_creation", "game_version", "queue"]
+
+
+def load_roster() -> pd.DataFrame:
+    # columns: riot_id, puuid (and maybe platform)
+    return pd.read_csv(ROSTER)
+
+
+def load_merged(version: int | None = None, as_of=None) -> pd.DataFrame:
+    """
+    Participants with their match's creation time, patch and queue attached.
+
+    Reads the ETL's snapshot log (the current version, or an earlier one via
+    `version` / `as_of`); trees without one fall back to the *_latest files.
+    """
+    log = SnapshotLog()
+    if log.exists():
+        pp = log.read("participants", version, as_of)
+        pm = log.read("matches", version, as_of, columns=MATCH_COLS)
+    else:
+        pp = pd.read_parquet(PARTICIPANTS_LATEST)
+        pm = pd.read_parquet(MATCHES_LATEST, columns=MATCH_COLS)
+    df = pp.merge(pm, on="match_id", how="left")
+    df["game_creation"] = pd.to_datetime(df["game_creation"], errors="coerce", utc=True)
+    return df
@@ -0,0 +1,245 @@
+# src/telemetry.py
+# Run metrics for the ETL: per-endpoint latency histograms, status counts, backoff, bytes, stage timings.
+#
+# One Telemetry object is shared by every worker thread of a run. At the end the
+# ETL writes it out twice: a JSON run report (latest + one line appended to a
+# history file) and a Prometheus textfile for node_exporter's textfile collector.
+
+import json, os, threading, time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+REPORTS = Path("reports")
+RUN_REPORT = REPORTS / "etl_run.json"
+RUN_HISTORY = REPORTS / "etl_runs.jsonl"
+PROM_TEXTFILE = REPORTS / "etl.prom"
+
+# seconds; Riot calls are usually 50-500 ms, the tail is what we tune against
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style (le = upper bound)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank, seen, lower = q * self.count, 0, 0.0
+        for upper, n in zip(self.buckets + (self.max,), self.counts):
+            if n and seen + n >= rank:
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+            lower = upper
+        return self.max
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        out, running = [], 0
+        for upper, n in zip(self.buckets, self.counts):
+            running += n
+            out.append((f"{upper:g}", running))
+        out.append(("+Inf", self.count))
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 4),
+            "mean_s": round(self.sum / self.count, 4) if self.count else None,
+            "p50_s": _round(self.quantile(0.5)),
+            "p95_s": _round(self.quantile(0.95)),
+            "p99_s": _round(self.quantile(0.99)),
+            "max_s": round(self.max, 4),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+def _round(x, nd=4):
+    return None if x is None else round(x, nd)
+
+
+def _ep_labels(key: str) -> dict:
+    region, _, endpoint = key.rpartition("/")
+    return {"region": region, "endpoint": endpoint} if region else {"endpoint": endpoint}
+
+
+def _fmt_labels(labels: dict) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in labels.items())
+
+
+class Telemetry:
+    """
+    Thread-safe counters for one ETL run.
+
+    backoff_seconds is time deliberately spent not calling Riot: the
+    Retry-After imposed by a 429 (reason=rate_limit) or the sleep before
+    retrying a 5xx (reason=server_error) or a timeout / dropped connection
+    (reason=network). limiter_wait is the time workers
+    sat blocked in RateLimiter.acquire, which includes ordinary pacing.
+
+    Endpoint keys are "<routing>/<method>" (e.g. "europe/match-detail") so
+    each regional lane is reported separately; the textfile splits them
+    into region and endpoint labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.latency: dict[str, Histogram] = defaultdict(Histogram)
+        self.limiter_wait: dict[str, float] = defaultdict(float)
+        self.status: dict[tuple[str, int], int] = defaultdict(int)
+        self.backoff: dict[tuple[str, str], float] = defaultdict(float)
+        self.bytes: dict[str, int] = defaultdict(int)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    # ---------- recording ----------
+    def observe_request(self, endpoint: str, status: int, seconds: float, n_bytes: int):
+        with self._lock:
+            self.latency[endpoint].observe(seconds)
+            self.status[(endpoint, status)] += 1
+            self.bytes[endpoint] += n_bytes
+
+    def observe_wait(self, endpoint: str, seconds: float):
+        with self._lock:
+            self.limiter_wait[endpoint] += seconds
+
+    def observe_backoff(self, endpoint: str, reason: str, seconds: float):
+        with self._lock:
+            self.backoff[(endpoint, reason)] += seconds
+
+    def observe_error(self, endpoint: str):
+        """A call that gave up (hard error or retries exhausted)."""
+        with self._lock:
+            self.errors[endpoint] += 1
+
+    def count(self, name: str, n: int):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    # ---------- export ----------
+    def to_dict(self, **meta) -> dict:
+        with self._lock:
+            endpoints = sorted({e for e, _ in self.status} | set(self.latency))
+            by_endpoint = {}
+            for e in endpoints:
+                codes = {str(s): n for (ep, s), n in sorted(self.status.items()) if ep == e}
+                by_endpoint[e] = {
+                    "requests": sum(codes.values()),
+                    "status": codes,
+                    "429": codes.get("429", 0),
+                    "5xx": sum(n for s, n in codes.items() if s.startswith("5")),
+                    "failed_calls": self.errors.get(e, 0),
+                    "bytes": self.bytes.get(e, 0),
+                    "limiter_wait_s": round(self.limiter_wait.get(e, 0.0), 3),
+                    "backoff_s": {r: round(s, 3) for (ep, r), s in self.backoff.items() if ep == e},
+                    "latency": self.latency[e].to_dict(),
+                }
+            wall = time.time() - self.started
+            requests = sum(v["requests"] for v in by_endpoint.values())
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "wall_s": round(wall, 3),
+                **meta,
+                "totals": {
+                    "requests": requests,
+                    "requests_per_s": round(requests / wall, 2) if wall > 0 else None,
+                    "429": sum(v["429"] for v in by_endpoint.values()),
+                    "5xx": sum(v["5xx"] for v in by_endpoint.values()),
+                    "bytes": sum(self.bytes.values()),
+                    "backoff_s": round(sum(self.backoff.values()), 3),
+                    "limiter_wait_s": round(sum(self.limiter_wait.values()), 3),
+                    **self.counters,
+                },
+                "stages_s": {k: round(v, 3) for k, v in self.stages.items()},
+                "endpoints": by_endpoint,
+            }
+
+    def to_prometheus(self, prefix: str = "lol_etl") -> str:
+        d = self.to_dict()
+        lines = []
+
+        def metric(name, kind, help_, samples):
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                lab = _fmt_labels(labels)
+                lines.append(f"{prefix}_{name}{{{lab}}} {value}" if lab else f"{prefix}_{name} {value}")
+
+        eps = d["endpoints"]
+        metric("requests_total", "counter", "HTTP responses by endpoint and status.",
+               [({**_ep_labels(e), "code": c}, n) for e, v in eps.items() for c, n in v["status"].items()])
+        metric("failed_calls_total", "counter", "Calls that gave up after a hard error or exhausted retries.",
+               [(_ep_labels(e), v["failed_calls"]) for e, v in eps.items()])
+        metric("response_bytes_total", "counter", "Response body bytes downloaded.",
+               [(_ep_labels(e), v["bytes"]) for e, v in eps.items()])
+        metric("backoff_seconds_total", "counter", "Seconds spent backing off after 429 / 5xx.",
+               [({**_ep_labels(e), "reason": r}, s) for e, v in eps.items() for r, s in v["backoff_s"].items()])
+        metric("limiter_wait_seconds_total", "counter", "Seconds workers were blocked by the rate limiter.",
+               [(_ep_labels(e), v["limiter_wait_s"]) for e, v in eps.items()])
+
+        lines.append(f"# HELP {prefix}_request_duration_seconds Riot API request latency.")
+        lines.append(f"# TYPE {prefix}_request_duration_seconds histogram")
+        with self._lock:
+            hists = dict(self.latency)
+        for e, h in sorted(hists.items()):
+            lab = _fmt_labels(_ep_labels(e))
+            for le, n in h.cumulative():
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{lab},le="{le}"}} {n}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{{lab}}} {h.sum:.6f}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{{lab}}} {h.count}')
+
+        metric("stage_duration_seconds", "gauge", "Wall time of each ETL stage in the last run.",
+               [({"stage": s}, v) for s, v in d["stages_s"].items()])
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.", [({}, d["wall_s"])])
+        metric("last_run_timestamp_seconds", "gauge", "Unix time the last run started.", [({}, int(self.started))])
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path: Path = RUN_REPORT, prom_path: Path = PROM_TEXTFILE,
+              history_path: Path | None = RUN_HISTORY, **meta) -> dict:
+        report = self.to_dict(**meta)
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(report_path).write_text(json.dumps(report, indent=2))
+        if history_path:
+            with open(history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        # node_exporter may read at any moment: write aside, then rename
+        tmp = Path(prom_path).with_suffix(".prom.tmp")
+        tmp.write_text(self.to_prometheus())
+        os.replace(tmp, prom_path)
+        return report
+
+    def summary(self) -> str:
+        d = self.to_dict()
+        t = d["totals"]
+        stages = "  ".join(f"{k}={v:.1f}s" for k, v in d["stages_s"].items())
+        return (f"{t['requests']} requests ({t['requests_per_s']}/s), 429={t['429']} 5xx={t['5xx']}, "
+                f"backoff={t['backoff_s']}s, limiter wait={t['limiter_wait_s']}s, "
+                f"{t['bytes'] / 2**20:.1f} MB | {stages}")
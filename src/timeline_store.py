@@ -0,0 +1,258 @@
+# src/timeline_store.py
+# Optional timeline stage: match-v5 timelines -> per-minute participant metrics in a memory-mapped int32 store
+#
+#   python -m src.timeline_store              # timelines for every cached match not ingested yet
+#   TIMELINE_MAX_MATCHES=2000 python -m src.timeline_store
+#
+# Timelines are ~30x the size of match details, so they are never kept as JSON
+# and never held as dict trees: each body is parsed incrementally (ijson, events
+# skipped) into a (participants, frames, fields) int32 block and appended to one
+# flat file. A small parquet index maps (match_id, participant) to its rows, so
+# readers memory-map the file and gather only the rows they ask for.
+
+import os, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import ijson
+except ImportError:  # falls back to json.loads, one timeline at a time
+    ijson = None
+
+TIMELINE_DIR = Path("data/timelines")
+TIMELINE_INDEX = TIMELINE_DIR / "index.parquet"   # default store's index; the app keys its cache on it
+
+# (stored field, participantFrame key path); one int32 column each, one row per participant-minute
+FRAME_FIELDS = [
+    ("total_gold", ("totalGold",)),
+    ("current_gold", ("currentGold",)),
+    ("xp", ("xp",)),
+    ("level", ("level",)),
+    ("cs", ("minionsKilled",)),
+    ("jungle_cs", ("jungleMinionsKilled",)),
+    ("damage_to_champions", ("damageStats", "totalDamageDoneToChampions")),
+]
+FIELD_NAMES = [name for name, _ in FRAME_FIELDS]
+
+INDEX_SCHEMA = pa.schema([
+    ("match_id", pa.string()),
+    ("participant_id", pa.int8()),
+    ("puuid", pa.string()),
+    ("row", pa.int64()),        # first row of this participant's frames in frames.i32
+    ("n_frames", pa.int16()),
+])
+
+# ---------- parsing ----------
+def _frame_values(pf: dict) -> list[int]:
+    out = []
+    for _, path in FRAME_FIELDS:
+        v = pf
+        for k in path:
+            v = v.get(k) if isinstance(v, dict) else None
+        out.append(int(v or 0))
+    return out
+
+
+def parse_timeline(blob: bytes) -> tuple[str, list[str], np.ndarray]:
+    """Timeline body -> (match_id, puuids by participantId, int32 array [participant, frame, field])."""
+    per_pid: dict[int, list[list[int]]] = {}
+    if ijson is not None:
+        import io
+        # metadata comes first in the body, so this stops after a few hundred bytes
+        meta = next(ijson.items(io.BytesIO(blob), "metadata"), None) or {}
+        match_id, puuids = meta.get("matchId"), meta.get("participants", [])
+        # kvitems walks frames in order; events are tokenized but never materialized
+        for pid, pf in ijson.kvitems(io.BytesIO(blob), "info.frames.item.participantFrames", use_float=True):
+            per_pid.setdefault(int(pid), []).append(_frame_values(pf))
+    else:
+        import json
+        tl = json.loads(blob)
+        match_id = tl.get("metadata", {}).get("matchId")
+        puuids = tl.get("metadata", {}).get("participants", [])
+        for frame in tl.get("info", {}).get("frames", []):
+            for pid, pf in frame.get("participantFrames", {}).items():
+                per_pid.setdefault(int(pid), []).append(_frame_values(pf))
+        del tl
+    if not per_pid:
+        return match_id, puuids, np.zeros((0, 0, len(FRAME_FIELDS)), dtype=np.int32)
+    n_frames = max(len(v) for v in per_pid.values())
+    arr = np.zeros((max(per_pid), n_frames, len(FRAME_FIELDS)), dtype=np.int32)
+    for pid, rows in per_pid.items():
+        arr[pid - 1, :len(rows)] = rows
+    return match_id, puuids, arr
+
+# ---------- store ----------
+class TimelineStore:
+    """
+    Append-only per-minute metrics.
+
+    Layout:
+        data/timelines/frames.i32       int32 rows of FIELD_NAMES, one per participant-minute
+        data/timelines/index.parquet    match_id, participant_id, puuid, row, n_frames
+
+    Frames are written before the index that points at them, so an
+    interrupted run only leaves unreferenced rows at the end of the file.
+    """
+
+    def __init__(self, root: Path = TIMELINE_DIR):
+        self.root = Path(root)
+        self.frames_path = self.root / "frames.i32"
+        self.index_path = self.root / "index.parquet"
+        self._lock = threading.Lock()
+        self._pending: list[dict] = []
+        self._index = self._load_index()
+        self._ids = set(self._index["match_id"].unique())
+        self._mm = None
+
+    def _load_index(self) -> pd.DataFrame:
+        if self.index_path.exists():
+            return pq.read_table(self.index_path).to_pandas()
+        return INDEX_SCHEMA.empty_table().to_pandas()
+
+    def __contains__(self, match_id: str) -> bool:
+        return match_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def n_rows(self) -> int:
+        size = self.frames_path.stat().st_size if self.frames_path.exists() else 0
+        return size // (4 * len(FRAME_FIELDS))
+
+    # ---------- writing ----------
+    def append(self, match_id: str, puuids: list[str], arr: np.ndarray):
+        """Add one parsed timeline ([participant, frame, field] int32); visible to readers after flush()."""
+        if arr.size == 0:
+            return
+        with self._lock:
+            if match_id in self._ids:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            start = self.n_rows
+            with open(self.frames_path, "ab") as f:
+                f.seek(start * 4 * len(FRAME_FIELDS))   # drop a torn tail row from a crashed run
+                f.truncate()
+                np.ascontiguousarray(arr, dtype=np.int32).tofile(f)
+            n_frames = arr.shape[1]
+            for j in range(arr.shape[0]):
+                self._pending.append({
+                    "match_id": match_id,
+                    "participant_id": j + 1,
+                    "puuid": puuids[j] if j < len(puuids) else None,
+                    "row": start + j * n_frames,
+                    "n_frames": n_frames,
+                })
+            self._ids.add(match_id)
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            new = pd.DataFrame(self._pending)
+            self._index = pd.concat([self._index, new], ignore_index=True) if len(self._index) else new
+            table = pa.Table.from_pandas(self._index, schema=INDEX_SCHEMA, preserve_index=False)
+            tmp = self.index_path.with_suffix(".tmp")
+            pq.write_table(table, tmp)
+            os.replace(tmp, self.index_path)
+            self._pending = []
+            self._mm = None
+
+    # ---------- reading ----------
+    def frames(self) -> np.memmap:
+        """The whole store as a read-only [row, field] memmap; pages load only when touched."""
+        if self._mm is None:
+            self._mm = np.memmap(self.frames_path, dtype=np.int32, mode="r", shape=(self.n_rows, len(FRAME_FIELDS)))
+        return self._mm
+
+    def index(self, match_ids=None, puuids=None) -> pd.DataFrame:
+        idx = self._index
+        if match_ids is not None:
+            idx = idx[idx["match_id"].isin(match_ids)]
+        if puuids is not None:
+            idx = idx[idx["puuid"].isin(puuids)]
+        return idx.reset_index(drop=True)
+
+    def curves(self, metric: str, match_ids=None, puuids=None, minutes: int | None = None):
+        """
+        (keys, values) for every selected participant-game: keys is the index
+        slice, values a float32 [game, minute] array padded with NaN after the
+        game ended. Only the selected rows of the memmap are read.
+        """
+        col = FIELD_NAMES.index(metric)
+        keys = self.index(match_ids, puuids)
+        if keys.empty:
+            return keys, np.zeros((0, minutes or 0), dtype=np.float32)
+        n = keys["n_frames"].to_numpy()
+        width = int(minutes or n.max())
+        offs = np.arange(width)
+        rows = keys["row"].to_numpy()[:, None] + offs[None, :]
+        valid = offs[None, :] < n[:, None]
+        out = np.full(rows.shape, np.nan, dtype=np.float32)
+        out[valid] = self.frames()[rows[valid], col]
+        return keys, out
+
+    def at_minute(self, metric: str, minute: int, match_ids=None, puuids=None) -> pd.DataFrame:
+        """One value per participant-game at `minute` (NaN if the game was shorter)."""
+        keys, vals = self.curves(metric, match_ids, puuids, minutes=minute + 1)
+        out = keys[["match_id", "participant_id", "puuid"]].copy()
+        out[f"{metric}_at_{minute}"] = vals[:, minute] if len(vals) else np.nan
+        return out
+
+# ---------- ingest ----------
+def ingest(match_ids, store: "TimelineStore", fetch, workers: int = 8, flush_every: int = 500) -> int:
+    """fetch(match_id) -> timeline body bytes; parsed on the worker, appended, index flushed periodically."""
+    def _one(mid):
+        match_id, puuids, arr = parse_timeline(fetch(mid))
+        store.append(match_id or mid, puuids, arr)
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futs = {pool.submit(_one, mid): mid for mid in match_ids}
+        for fut in as_completed(futs):
+            try:
+                fut.result()
+                done += 1
+            except Exception as e:
+                print(f"[warn] timeline {futs[fut]} failed: {e}")
+            if done and done % flush_every == 0:
+                store.flush()
+    store.flush()
+    return done
+
+
+def main():
+    # the fetch side needs the ETL's clients (and RIOT_API_KEY); readers don't
+    from src import etl_http_riot as etl
+    from src.raw_store import RawMatchStore
+    from src.riot_client import routing_for_match
+    from src.telemetry import REPORTS
+
+    raw = RawMatchStore()
+    store = TimelineStore()
+    todo = [mid for mid in raw.ids() if mid not in store]
+    # newest first, so a capped run covers the games people are looking at
+    todo.sort(key=lambda mid: (raw.entry(mid) or {}).get("game_start") or 0, reverse=True)
+    cap = int(os.getenv("TIMELINE_MAX_MATCHES", "0"))
+    if cap:
+        todo = todo[:cap]
+    print(f"[timelines] {len(store)} stored, fetching {len(todo)}" + ("" if ijson else " (ijson missing: json fallback)"))
+
+    def fetch(mid):
+        client = etl.get_client(routing_for_match(mid, etl.ROUTING))
+        return client.get_bytes(f"/lol/match/v5/matches/{mid}/timeline", "match-timeline")
+
+    with etl.telemetry.stage("timelines"):
+        n = ingest(todo, store, fetch, workers=etl.MAX_WORKERS)
+    etl.telemetry.count("timelines", n)
+    etl.telemetry.write(REPORTS / "timeline_run.json", REPORTS / "timeline.prom", history_path=None)
+    print(f"[timelines] +{n} -> {len(store)} matches, {store.n_rows:,} participant-minutes in {store.frames_path}")
+    print(f"[telemetry] {etl.telemetry.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,205 @@
 # src/train_win_model.py
 
-import json, joblib
+import argparse, json, joblib
+import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
+import scipy.sparse as sp
 from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.feature_extraction import FeatureHasher
 from sklearn.metrics import roc_auc_score, accuracy_score, brier_score_loss
+from src.features import MODEL_TABLE
 
-Path("artifacts").mkdir(exist_ok=True)
-Path("reports").mkdir(exist_ok=True)
-
-df = pd.read_parquet("data/model_table_simple.parquet")
-# simple filter: only SR queues if you want (400/420/430/440)
-df = df[df["champion"].notna()].copy()
-
-X = df[["champion","role_clean","patch_minor","hour"]]
-y = df["win"].astype(int)
-
-pre = ColumnTransformer([
-    ("cat", OneHotEncoder(handle_unknown="ignore"), ["champion","role_clean"]),
-    ("num", "passthrough", ["patch_minor","hour"])
-])
-
-clf = Pipeline([
-    ("prep", pre),
-    ("model", LogisticRegression(max_iter=600))
-])
-
-Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.25, random_state=42, stratify=y)
-clf.fit(Xtr, ytr)
-probs = clf.predict_proba(Xte)[:,1]
-metrics = {
-    "auc": float(roc_auc_score(yte, probs)),
-    "acc@0.5": float(accuracy_score(yte, (probs>0.5).astype(int))),
-    "brier": float(brier_score_loss(yte, probs)),
-    "n_test": int(len(yte))
-}
-print(metrics)
-
-joblib.dump(clf, "artifacts/win_model.joblib")
-Path("reports/metrics.json").write_text(json.dumps(metrics, indent=2))
+MODEL_PATH = Path("artifacts/win_model.joblib")
+METRICS_PATH = Path("reports/metrics.json")
+ONLINE_MODEL_PATH = Path("artifacts/win_model_online.joblib")
+ONLINE_METRICS_PATH = Path("reports/metrics_online.json")
+
+FEATURES = ["champion","role_clean","patch_minor","hour"]
+
+HASH_FEATURES = 2**18      # champion/role tokens; collisions are negligible at ~170 x 6 values
+HOLDOUT_ROWS = 20_000      # rolling window the online metrics are computed on
+BATCH_ROWS = 65_536        # record batch read from parquet
+STEP_ROWS = 4_096          # test-then-train granularity inside a batch
+
+def make_model() -> Pipeline:
+    pre = ColumnTransformer([
+        ("cat", OneHotEncoder(handle_unknown="ignore"), ["champion","role_clean"]),
+        ("num", "passthrough", ["patch_minor","hour"])
+    ])
+    return Pipeline([
+        ("prep", pre),
+        ("model", LogisticRegression(max_iter=600))
+    ])
+
+def train(df: pd.DataFrame) -> tuple[Pipeline, dict]:
+    # simple filter: only SR queues if you want (400/420/430/440)
+    df = df[df["champion"].notna()]
+
+    X = df[FEATURES]
+    y = df["win"].astype(int)
+
+    clf = make_model()
+    Xtr, Xte, ytr, yte = train_test_split(X, y, test_size=0.25, random_state=42, stratify=y)
+    clf.fit(Xtr, ytr)
+    probs = clf.predict_proba(Xte)[:,1]
+    return clf, metrics(yte, probs)
+
+def metrics(y, probs) -> dict:
+    return {
+        "auc": float(roc_auc_score(y, probs)) if len(np.unique(y)) == 2 else None,
+        "acc@0.5": float(accuracy_score(y, (probs>0.5).astype(int))),
+        "brier": float(brier_score_loss(y, probs)),
+        "n_test": int(len(y))
+    }
+
+# ---------- incremental mode ----------
+class OnlineWinModel:
+    """
+    Same features as make_model(), but hashed (no vocabulary to refit when a
+    champion is released) and fitted with SGD partial_fit on new rows only.
+
+    Each batch is scored before it is learned from (test-then-train), and the
+    last HOLDOUT_ROWS of those out-of-sample predictions are the rolling
+    holdout the metrics are computed on.
+
+    "New" means not trained on yet, not newer than some game time: trained
+    (match_id, puuid) keys are kept as a sorted array of 64-bit hashes, so
+    rows a backfill or the crawl adds with older timestamps are still learned.
+    That array is never pruned: it costs 8 bytes per trained row in memory
+    and in the pickle (~80 MB at 10M rows); --rebuild resets it.
+    """
+
+    def __init__(self, n_features: int = HASH_FEATURES, holdout_rows: int = HOLDOUT_ROWS):
+        self.hasher = FeatureHasher(n_features=n_features, input_type="string", alternate_sign=False)
+        # averaged SGD with a small constant step: calibrated like the batch model after one pass
+        self.clf = SGDClassifier(loss="log_loss", alpha=1e-4, learning_rate="constant", eta0=0.01,
+                                 average=True, random_state=42)
+        self.holdout_rows = holdout_rows
+        self.holdout_y = np.zeros(0, dtype=np.int8)
+        self.holdout_p = np.zeros(0, dtype=np.float32)
+        self.watermark = None   # newest game_creation trained on (UTC Timestamp), for reporting
+        self.trained_keys = np.zeros(0, dtype=np.uint64)   # sorted row_keys() of every row learned
+        self.n_seen = 0
+        self.updates = 0
+
+    @property
+    def fitted(self) -> bool:
+        return hasattr(self.clf, "coef_")
+
+    def transform(self, df: pd.DataFrame):
+        champ = "champion=" + df["champion"].astype(str)
+        role = "role=" + df["role_clean"].astype(str)
+        cat = self.hasher.transform(zip(champ, role))
+        # numeric features scaled to ~[0, 1] for SGD
+        num = np.column_stack([df["patch_minor"].to_numpy(float) / 24, df["hour"].to_numpy(float) / 23])
+        return sp.hstack([cat, sp.csr_matrix(num)], format="csr")
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        return self.clf.predict_proba(self.transform(df))
+
+    def update(self, df: pd.DataFrame):
+        """Score each STEP_ROWS slice for the rolling holdout, then learn from it."""
+        X, y = self.transform(df), df["win"].to_numpy(np.int8)
+        for i in range(0, len(y), STEP_ROWS):
+            Xs, ys = X[i:i + STEP_ROWS], y[i:i + STEP_ROWS]
+            if self.fitted:
+                p = self.clf.predict_proba(Xs)[:, 1].astype(np.float32)
+                self.holdout_y = np.concatenate([self.holdout_y, ys])[-self.holdout_rows:]
+                self.holdout_p = np.concatenate([self.holdout_p, p])[-self.holdout_rows:]
+            self.clf.partial_fit(Xs, ys, classes=np.array([0, 1]))
+        self.n_seen += len(df)
+        newest = df["game_creation"].max()
+        if pd.notna(newest) and (self.watermark is None or newest > self.watermark):
+            self.watermark = newest
+
+    def metrics(self) -> dict:
+        out = metrics(self.holdout_y, self.holdout_p) if len(self.holdout_y) else {"n_test": 0}
+        out.update({
+            "holdout": "rolling test-then-train",
+            "n_seen": self.n_seen,
+            "updates": self.updates,
+            "watermark": self.watermark.isoformat() if self.watermark is not None else None,
+        })
+        return out
+
+
+def load_online(path: Path = ONLINE_MODEL_PATH) -> OnlineWinModel:
+    return joblib.load(path) if Path(path).exists() else OnlineWinModel()
+
+
+def row_keys(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of each row's (match_id, puuid)."""
+    return pd.util.hash_pandas_object(df[["match_id", "puuid"]], index=False).to_numpy(np.uint64)
+
+
+def _in_sorted(keys: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=bool)
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[pos] == keys
+
+
+def train_incremental(path: Path = MODEL_TABLE, model: OnlineWinModel | None = None,
+                      batch_rows: int = BATCH_ROWS) -> tuple[OnlineWinModel, int]:
+    """
+    Stream the model table in record batches and partial_fit on the rows
+    whose (match_id, puuid) the model hasn't learned yet, whatever their game
+    time. Only the feature and key columns are read.
+    """
+    model = model or load_online()
+    known = model.trained_keys
+    dataset = ds.dataset(str(path), format="parquet")
+    columns = FEATURES + ["win", "game_creation", "match_id", "puuid"]
+    added, n_new = [], 0
+    for batch in dataset.to_batches(columns=columns, filter=ds.field("champion").is_valid(), batch_size=batch_rows):
+        if batch.num_rows == 0:
+            continue
+        df = batch.to_pandas()
+        df["game_creation"] = pd.to_datetime(df["game_creation"], utc=True)
+        keys = row_keys(df)
+        new = ~_in_sorted(keys, known)
+        if new.any():
+            model.update(df[new])
+            added.append(keys[new])
+            n_new += int(new.sum())
+    model.trained_keys = np.union1d(known, np.concatenate(added)) if added else known
+    if n_new:
+        model.updates += 1
+    return model, n_new
+
+
+def save_online(model: OnlineWinModel):
+    ONLINE_MODEL_PATH.parent.mkdir(exist_ok=True)
+    ONLINE_METRICS_PATH.parent.mkdir(exist_ok=True)
+    joblib.dump(model, ONLINE_MODEL_PATH)
+    ONLINE_METRICS_PATH.write_text(json.dumps(model.metrics(), indent=2))
+
+def save(clf: Pipeline, scores: dict):
+    MODEL_PATH.parent.mkdir(exist_ok=True)
+    METRICS_PATH.parent.mkdir(exist_ok=True)
+    joblib.dump(clf, MODEL_PATH)
+    METRICS_PATH.write_text(json.dumps(scores, indent=2))
+
+def main():
+    ap = argparse.ArgumentParser(description="Train the win model.")
+    ap.add_argument("--incremental", action="store_true",
+                    help=f"update {ONLINE_MODEL_PATH} with the rows it hasn't learned yet")
+    ap.add_argument("--rebuild", action="store_true", help="with --incremental: start from an empty model")
+    args = ap.parse_args()
+    if args.incremental:
+        model, n_new = train_incremental(model=OnlineWinModel() if args.rebuild else None)
+        print(f"{n_new} new rows", model.metrics())
+        save_online(model)
+        return
+    clf, scores = train(pd.read_parquet(MODEL_TABLE))
+    print(scores)
+    save(clf, scores)
+
+if __name__ == "__main__":
+    main()
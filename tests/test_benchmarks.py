@@ -0,0 +1,17 @@
+# tests/test_benchmarks.py
+import multiprocessing as mp, os, signal, threading, time
+from benchmarks import run as bench
+
+
+def test_killed_stage_is_recorded_as_failed(tmp_path):
+    result = {}
+    t = threading.Thread(target=lambda: result.update(bench.run_stage("generate", tmp_path, (10_000_000, 14, 0))))
+    t.start()
+    deadline = time.monotonic() + 30
+    while not mp.active_children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    for child in mp.active_children():
+        os.kill(child.pid, signal.SIGKILL)       # what the OOM killer does at large --sizes
+    t.join(timeout=30)
+    assert not t.is_alive(), "run_stage kept waiting on a dead child"
+    assert result["ok"] is False and "SIGKILL" in result["error"]
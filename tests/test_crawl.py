@@ -0,0 +1,48 @@
+# tests/test_crawl.py
+import os, subprocess, sys
+from pathlib import Path
+import pytest
+from benchmarks.synthetic import SyntheticRiot
+from src.crawl import CrawlState, publish
+from src.raw_store import RawMatchStore
+from src.snapshot_log import SnapshotLog
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RIOT_API_KEY", "test")
+    return tmp_path
+
+
+def test_publish_in_chunks_without_duplicates(workdir):
+    world = SyntheticRiot(roster_size=4, population=200, seed=2)
+    store, state = RawMatchStore(index=False), CrawlState()
+    assert len(store) == 0
+    for i in range(25):
+        store.put(world.match_id(i), world.match(i))
+        state.mark_fetched(world.match_id(i))
+    state.commit()
+    assert world.match_id(3) in store and world.match_id(99) not in store
+    assert len(store) == len(RawMatchStore(index=False)) == 25
+
+    versions = publish(state, store, chunk=10)
+    assert [v["added"]["matches"] for v in versions] == [10, 10, 5]
+    assert state.status()["unpublished"] == 0
+
+    # a chunk re-offered after an interrupted publish is already logged
+    for i in range(5, 15):
+        state.mark_fetched(world.match_id(i))
+    assert publish(state, store, chunk=10) == []
+    ids = SnapshotLog().read("matches", columns=["match_id"])["match_id"]
+    assert len(ids) == ids.nunique() == 25
+
+
+def test_status_works_without_api_key(workdir):
+    env = {k: v for k, v in os.environ.items() if k != "RIOT_API_KEY"}
+    env["PYTHONPATH"] = str(ROOT)
+    out = subprocess.run([sys.executable, "-m", "src.crawl", "--status"], env=env,
+                         capture_output=True, text=True, check=True)
+    assert "'frontier': 0" in out.stdout
@@ -0,0 +1,46 @@
+# tests/test_etl_lanes.py
+import importlib
+import pytest
+from benchmarks.mock_riot import METHOD_LIMITS, MockRiot, serve
+from benchmarks.synthetic import SyntheticRiot
+from src.raw_store import RawMatchStore
+
+LIMIT = "100000:1"
+
+
+@pytest.fixture
+def etl(tmp_path, monkeypatch):
+    """etl_http_riot pointed at an in-process mock API; data paths under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RIOT_API_KEY", "test")
+    mod = importlib.import_module("src.etl_http_riot")
+    world = SyntheticRiot(roster_size=4, population=300, seed=3)
+    server = serve(MockRiot(world, 1500, LIMIT, {m: LIMIT for m in METHOD_LIMITS}), "127.0.0.1", 0, report_every=0)
+    monkeypatch.setattr(mod, "API_BASE", f"http://127.0.0.1:{server.server_address[1]}/{{routing}}")
+    monkeypatch.setattr(mod, "APP_RATE_LIMIT", LIMIT)
+    monkeypatch.setattr(mod, "MAX_MATCHES", 40)
+    monkeypatch.setattr(mod, "BACKFILL", False)
+    monkeypatch.setattr(mod, "_clients", {})
+    yield mod, world
+    server.shutdown()
+
+
+def _run(mod, riot_ids, store):
+    players = [{"id": rid, "routing": "americas"} for rid in riot_ids]
+    return mod.run_lane("americas", players, store, mod.Claims())
+
+
+def test_shared_cached_games_do_not_cut_off_other_players(etl):
+    mod, world = etl
+    store = RawMatchStore()
+    first, rest = world.roster[0].riot_id, [p.riot_id for p in world.roster[1:]]
+    # one lane caches Roster0's games first; many of them are premades with the others
+    assert len(_run(mod, [first], store)["ids_by_player"][first]) == 40
+    res = _run(mod, rest, store)
+    assert {rid: len(ids) for rid, ids in res["ids_by_player"].items()} == {rid: 40 for rid in rest}
+    assert all(mid in store for ids in res["ids_by_player"].values() for mid in ids)
+
+    # a second run stops at every player's own watermark
+    again = _run(mod, [first] + rest, store)
+    assert all(ids == [] for ids in again["ids_by_player"].values())
+    assert not again["fetched"]
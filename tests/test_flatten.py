@@ -0,0 +1,20 @@
+# tests/test_flatten.py
+import pandas as pd
+from benchmarks.synthetic import SyntheticRiot
+from src.flatten import replay_store
+from src.raw_store import RawMatchStore
+
+
+def test_replay_writes_each_match_once(tmp_path):
+    world = SyntheticRiot(roster_size=4, population=100, seed=4)
+    store = RawMatchStore(tmp_path / "raw")
+    for i in range(30):
+        store.put(world.match_id(i), world.match(i))
+    store.put(world.match_id(0), world.match(0))        # re-cached: listed twice in the manifest
+    ids = [world.match_id(i) for i in range(30)]
+
+    for workers, match_ids in [(0, None), (0, ids + ids[:10]), (2, ids[::-1] + ids)]:
+        m_path, p_path = tmp_path / "m.parquet", tmp_path / "p.parquet"
+        n_matches, n_participants = replay_store(store, m_path, p_path, match_ids=match_ids, workers=workers, chunk=8)
+        assert n_matches == 30 and n_participants == 300
+        assert pd.read_parquet(m_path)["match_id"].is_unique
@@ -0,0 +1,29 @@
+# tests/test_group_store.py
+import json
+import pytest
+from benchmarks.schema_report import legacy_frame
+from src.group_store import SUMMARY_FILE, write_group_dataset
+
+
+def test_rewrite_never_leaves_the_dataset_missing(tmp_path, monkeypatch):
+    root = tmp_path / "participants_group"
+    write_group_dataset(legacy_frame(2_000, 20), root)
+
+    # crash between moving the old dataset aside and renaming the new one in
+    real_rename = type(root).rename
+    def rename(self, target):
+        if self.name.endswith(".tmp"):
+            raise OSError("simulated crash")
+        return real_rename(self, target)
+    monkeypatch.setattr(type(root), "rename", rename)
+    with pytest.raises(OSError):
+        write_group_dataset(legacy_frame(3_000, 20), root)
+    assert (tmp_path / "participants_group.old" / SUMMARY_FILE).exists()
+    monkeypatch.undo()
+
+    # the next write recovers it first, then swaps the new one in
+    summary = write_group_dataset(legacy_frame(3_000, 20), root)
+    assert summary["rows"] == 3_000
+    assert json.loads((root / SUMMARY_FILE).read_text())["rows"] == 3_000
+    assert not (tmp_path / "participants_group.old").exists()
+    assert not (tmp_path / "participants_group.tmp").exists()
@@ -0,0 +1,78 @@
+# tests/test_pick_scoring.py
+import json, threading, urllib.error, urllib.request
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from src.pick_scoring import PickScorer, serve
+from src.train_win_model import FEATURES, make_model
+
+
+def fit(path, champions, roles, seed=0):
+    rng = np.random.default_rng(seed)
+    n = 2000
+    df = pd.DataFrame({"champion": rng.choice(champions, n), "role_clean": rng.choice(roles, n),
+                       "patch_minor": rng.integers(1, 20, n), "hour": rng.integers(0, 24, n)})
+    y = (rng.random(n) < 0.5 + 0.1 * (df["champion"] == champions[0])).astype(int)
+    joblib.dump(make_model().fit(df[FEATURES], y), path)
+
+
+@pytest.fixture
+def scorer(tmp_path):
+    fit(tmp_path / "win_model.joblib", ["Ahri", "Zed", "Lulu"], ["SOLO", "SUPPORT"])
+    return PickScorer(tmp_path / "win_model.joblib", tmp_path / "missing.parquet")
+
+
+def test_lookup_matches_model(scorer):
+    t = scorer.table(hour=5)
+    model = joblib.load(scorer.model_path)
+    X = pd.DataFrame({"champion": t["champion"], "role_clean": t["role"], "patch_minor": 0, "hour": 5})
+    assert np.allclose(model.predict_proba(X)[:, 1], t["win_prob"])
+    picks = scorer.suggest("SUPPORT", top=2, hour=5, exclude=["Zed"])
+    assert [p["champion"] for p in picks] == (
+        t[(t["role"] == "SUPPORT") & (t["champion"] != "Zed")].sort_values("win_prob", ascending=False)["champion"].tolist())
+    with pytest.raises(ValueError):
+        scorer.suggest(top=-1)
+
+
+def test_readers_never_mix_snapshots(scorer, tmp_path):
+    # two artifacts with different vocabularies; readers race refreshes between them
+    vocab = {"a": (["Ahri", "Zed", "Lulu"], ["SOLO", "SUPPORT"]), "b": (["Garen"], ["SOLO", "SUPPORT", "DUO", "CARRY"])}
+    paths = {k: tmp_path / f"{k}.joblib" for k in vocab}
+    for k, (c, r) in vocab.items():
+        fit(paths[k], c, r)
+    errors, stop = [], threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                t = scorer.table(hour=3)
+                assert any(set(t["champion"]) == set(c) and len(t) == len(c) * len(r) for c, r in vocab.values())
+                scorer.suggest(top=3, hour=3)
+            except Exception as e:       # noqa: BLE001 - surface anything the race produces
+                errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(40):
+        scorer.model_path = paths["ab"[i % 2]]
+        scorer.refresh(force=True)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_http_rejects_negative_top(scorer):
+    server = serve(scorer, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/picks?role=SOLO&top=2") as r:
+            assert len(json.loads(r.read())["picks"]) == 2
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(f"{base}/picks?top=-1")
+        assert e.value.code == 400
+    finally:
+        server.shutdown()
@@ -0,0 +1,43 @@
+# tests/test_pipeline.py
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from benchmarks.synthetic import SyntheticRiot
+from src import features, pipeline
+from src.flatten import flatten_batches
+from src.snapshot_log import SnapshotLog
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # every data path in src/ is relative to the repo root
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def publish(world: SyntheticRiot, start: int, stop: int) -> dict:
+    """Matches start..stop-1 of `world` as a new snapshot version, like one ETL run."""
+    def write_delta(m_path, p_path):
+        mb, pb = flatten_batches(world.match(i) for i in range(start, stop))
+        pq.write_table(pa.Table.from_batches([mb]), m_path)
+        pq.write_table(pa.Table.from_batches([pb]), p_path)
+        return mb.num_rows, pb.num_rows
+    return SnapshotLog().append(write_delta)
+
+
+def statuses(report: list[dict]) -> dict:
+    return {r["stage"]: r["status"] for r in report}
+
+
+def test_new_snapshot_version_reruns_form(workdir):
+    world = SyntheticRiot(roster_size=4, population=200, seed=1)
+    publish(world, 0, 100)
+    assert statuses(pipeline.run(["form", "features"])) == {"form": "ran", "features": "ran"}
+    assert statuses(pipeline.run(["form", "features"])) == {"form": "skipped", "features": "skipped"}
+
+    publish(world, 100, 150)
+    assert statuses(pipeline.run(["form", "features"])) == {"form": "ran", "features": "ran"}
+    table = pd.read_parquet(features.MODEL_TABLE)
+    assert len(table) == 150 * 10
+    assert table["games_before"].notna().all()
@@ -0,0 +1,35 @@
+# tests/test_riot_client.py
+import requests
+from benchmarks.mock_riot import METHOD_LIMITS, MockRiot, serve
+from benchmarks.synthetic import SyntheticRiot
+from src import riot_client
+from src.riot_client import RiotClient
+from src.telemetry import Telemetry
+
+LIMIT = "100000:1"
+
+
+def test_network_errors_are_retried_and_counted(monkeypatch):
+    world = SyntheticRiot(roster_size=2, population=50, seed=5)
+    server = serve(MockRiot(world, 100, LIMIT, {m: LIMIT for m in METHOD_LIMITS}), "127.0.0.1", 0, report_every=0)
+    monkeypatch.setattr(riot_client.time, "sleep", lambda s: None)
+    tel = Telemetry()
+    client = RiotClient("test", "americas", base_url=f"http://127.0.0.1:{server.server_address[1]}/{{routing}}",
+                        telemetry=tel)
+    real_get, failures = client.session.get, iter([requests.Timeout("read timed out"), requests.ConnectionError("reset")])
+
+    def flaky_get(*args, **kwargs):
+        e = next(failures, None)
+        if e is not None:
+            raise e
+        return real_get(*args, **kwargs)
+
+    monkeypatch.setattr(client.session, "get", flaky_get)
+    try:
+        match_id = world.match(0)["metadata"]["matchId"]
+        assert client.get(f"/lol/match/v5/matches/{match_id}", "match-detail")["metadata"]["matchId"] == match_id
+        assert tel.backoff[("americas/match-detail", "network")] == 1.5 + 3.0
+        assert not tel.errors
+    finally:
+        client.close()
+        server.shutdown()
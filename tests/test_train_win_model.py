@@ -0,0 +1,43 @@
+# tests/test_train_win_model.py
+import numpy as np
+import pandas as pd
+from src.train_win_model import OnlineWinModel, train_incremental
+
+
+def games(start: str, n_matches: int, prefix: str, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = n_matches * 10
+    return pd.DataFrame({
+        "match_id": np.repeat([f"{prefix}_{i}" for i in range(n_matches)], 10),
+        "puuid": np.tile([f"p{j}" for j in range(10)], n_matches),
+        "win": np.tile([1] * 5 + [0] * 5, n_matches),
+        "champion": rng.choice(["Ahri", "Zed", "Lulu", "Garen"], n),
+        "role_clean": rng.choice(["SOLO", "SUPPORT", "CARRY"], n),
+        "patch_minor": 3,
+        "hour": rng.integers(0, 24, n),
+        "game_creation": pd.date_range(start, periods=n_matches, freq="h", tz="UTC").repeat(10),
+    })
+
+
+def write(path, *frames):
+    pd.concat(frames).sort_values("game_creation", kind="stable").to_parquet(path, index=False)
+
+
+def test_late_older_batch_is_still_learned(tmp_path):
+    table = tmp_path / "model_table.parquet"
+    recent = games("2024-06-01", 200, "NA1", 0)
+    write(table, recent)
+    model, n_new = train_incremental(table, OnlineWinModel())
+    assert n_new == len(recent)
+
+    # a backfill lands games from before the model's newest one
+    late = games("2024-01-01", 50, "EUW1", 1)
+    assert late["game_creation"].max() < model.watermark
+    write(table, recent, late)
+    model, n_new = train_incremental(table, model)
+    assert n_new == len(late)
+    assert model.n_seen == len(recent) + len(late)
+
+    model, n_new = train_incremental(table, model)
+    assert n_new == 0
+